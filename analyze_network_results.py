@@ -1,70 +1,202 @@
 """
 Analyze and compare network simulation results across all three conditions
 """
+import itertools
 import json
 import numpy as np
 import pandas as pd
 import os
 
+import columnar_io
+import network_metrics
+import spike_stats
+
 def load_simulation(json_file):
-    """Load simulation data from JSON file"""
+    """
+    Load simulation data from a JSON file, or only the spikes (memory-mapped)
+    from a columnar output folder (see columnar_io.py)
+    """
+    if columnar_io.is_columnar(json_file):
+        spkt, spkid = columnar_io.load_spikes(json_file)
+        return {'simData': {'spkt': spkt, 'spkid': spkid}, 'meta': columnar_io.load_meta(json_file)}
+
     with open(json_file) as f:
         data = json.load(f)
     return data
 
-def analyze_population_activity(data, duration_ms=2000):
-    """Extract population-level firing statistics"""
+# Spikes per chunk in the streaming analysis (bounds memory independently of run length)
+CHUNK_SIZE = 1_000_000
 
-    # Get spike data
-    spike_times = np.array(data['simData']['spkt'])
-    spike_gids = np.array(data['simData']['spkid'])
+def index_from_pops(pops, analysis_window):
+    """Run index from [{'name', 'start', 'stop'}] population gid ranges"""
+    gid_pop = np.full(max([pop['stop'] for pop in pops], default=0), len(pops), dtype=np.int32)
+    for i, pop in enumerate(pops):
+        gid_pop[pop['start']:pop['stop']] = i
+    return {'pops': [pop['name'] for pop in pops], 'gid_pop': gid_pop,
+            'analysis_window': tuple(analysis_window)}
 
-    # Duration in seconds
-    duration_s = duration_ms / 1000.0
+def _data_metadata(data):
+    """simConfig, netParams.popParams/scale and net.cells (gid, pop) of loaded NetPyNE data"""
+    net_params = data.get('netParams', {})
+    cells = [(cell['gid'], cell['tags']['pop']) for cell in data.get('net', {}).get('cells', [])]
+    return data.get('simConfig', {}), net_params.get('popParams'), net_params.get('scale', 1), cells
 
-    # Population GID ranges (from cfg.py)
-    pop_ranges = {
-        'HL23PYR': (0, 80),
-        'HL23SST': (80, 88),
-        'HL23PV': (88, 94),
-        'HL23VIP': (94, 100)
-    }
+def _json_metadata(json_file):
+    """_data_metadata of a NetPyNE JSON file, streamed with ijson if installed"""
+    try:
+        import ijson
+    except ImportError:
+        return _data_metadata(load_simulation(json_file))
 
-    results = {}
+    def first(prefix):
+        with open(json_file, 'rb') as f:
+            return next(ijson.items(f, prefix, use_float=True), None)
+
+    sim_config = first('simConfig') or {}
+    pop_params = first('netParams.popParams')
+    scale = first('netParams.scale') or 1
+    cells = []
+    if not pop_params:
+        with open(json_file, 'rb') as f:
+            for cell in ijson.items(f, 'net.cells.item', use_float=True):
+                cells.append((cell['gid'], cell['tags']['pop']))
+    return sim_config, pop_params, scale, cells
+
+def load_run_index(source):
+    """
+    Population of every gid and the analysis window of a run, from (first found):
+      - the meta.json of a columnar output folder
+      - the <simLabel>_index.json sidecar next to a NetPyNE JSON file
+      - the netParams.popParams / simConfig saved in the JSON file
+      - the gid and pop tag of every saved cell (net.cells)
+
+    Returns {'pops': [name], 'gid_pop': int array (pop index per gid; len(pops)
+    for gids outside every pop), 'analysis_window': (start, stop) in ms}
+    """
+    if isinstance(source, dict):
+        if 'meta' in source:
+            return index_from_pops(source['meta']['pops'], source['meta']['analysisWindow'])
+        sim_config, pop_params, scale, cells = _data_metadata(source)
+    elif columnar_io.is_columnar(source):
+        meta = columnar_io.load_meta(source)
+        return index_from_pops(meta['pops'], meta['analysisWindow'])
+    else:
+        sidecar = source.replace('_data.json', '_index.json')
+        if sidecar != source and os.path.exists(sidecar):
+            with open(sidecar) as f:
+                index = json.load(f)
+            return index_from_pops(index['pops'], index['analysisWindow'])
+        sim_config, pop_params, scale, cells = _json_metadata(source)
+
+    source = source if isinstance(source, str) else 'data'
+    warmup = sim_config.get('warmupDuration', 0) if sim_config.get('useCheckpoint') else 0
+    if 'duration' not in sim_config:
+        raise ValueError(f"{source}: no simConfig.duration saved, cannot compute rates")
+    window = (warmup, sim_config['duration'])
+
+    if pop_params:
+        # NetPyNE assigns consecutive gids per population in popParams order
+        pops, start = [], 0
+        for name, params in pop_params.items():
+            stop = start + int(scale * params['numCells'])
+            pops.append({'name': name, 'start': start, 'stop': stop})
+            start = stop
+        return index_from_pops(pops, window)
 
-    for pop_name, (gid_start, gid_end) in pop_ranges.items():
-        # Get spikes for this population
-        pop_mask = (spike_gids >= gid_start) & (spike_gids < gid_end)
-        pop_spikes = spike_times[pop_mask]
-        pop_gids = spike_gids[pop_mask]
-
-        # Calculate statistics
-        n_cells = gid_end - gid_start
-        total_spikes = len(pop_spikes)
-        avg_rate = total_spikes / (n_cells * duration_s) if n_cells > 0 else 0
-
-        # Per-cell firing rates
-        cell_rates = []
-        for gid in range(gid_start, gid_end):
-            cell_spikes = np.sum(spike_gids == gid)
-            cell_rate = cell_spikes / duration_s
-            cell_rates.append(cell_rate)
-
-        # Synchrony measure (coefficient of variation of ISIs)
-        if len(pop_spikes) > 1:
-            isis = np.diff(np.sort(pop_spikes))
-            cv_isi = np.std(isis) / np.mean(isis) if np.mean(isis) > 0 else 0
+    if not cells:
+        raise ValueError(f"{source}: no population metadata (netParams or net.cells) saved")
+    names = list(dict.fromkeys(pop for _, pop in cells))
+    gids = np.array([gid for gid, _ in cells], dtype=np.int64)
+    gid_pop = np.full(gids.max() + 1, len(names), dtype=np.int32)
+    gid_pop[gids] = [names.index(pop) for _, pop in cells]
+    return {'pops': names, 'gid_pop': gid_pop, 'analysis_window': window}
+
+def iter_spike_chunks(source, chunk_size=CHUNK_SIZE):
+    """
+    Yield time-ordered (spkt, spkid) chunks from a columnar output folder,
+    a NetPyNE JSON file (streamed with ijson if installed) or loaded data
+    """
+    if isinstance(source, dict):
+        spkt, spkid = source['simData']['spkt'], source['simData']['spkid']
+    elif columnar_io.is_columnar(source):
+        spkt, spkid = columnar_io.load_spikes(source)
+    else:
+        try:
+            import ijson
+        except ImportError:
+            print("  (ijson not installed, loading the whole JSON file)")
+            data = load_simulation(source)
+            spkt, spkid = data['simData']['spkt'], data['simData']['spkid']
         else:
-            cv_isi = 0
+            # Two parsers over the same file, one per array, read in lock-step
+            with open(source, 'rb') as ft, open(source, 'rb') as fi:
+                times = ijson.items(ft, 'simData.spkt.item', use_float=True)
+                gids = ijson.items(fi, 'simData.spkid.item', use_float=True)
+                while True:
+                    t = np.fromiter(itertools.islice(times, chunk_size), dtype=float)
+                    g = np.fromiter(itertools.islice(gids, chunk_size), dtype=np.int64)
+                    if not len(t):
+                        return
+                    yield t, g
+            return
+
+    for i in range(0, len(spkt), chunk_size):
+        yield np.asarray(spkt[i:i + chunk_size]), np.asarray(spkid[i:i + chunk_size])
+
+def analyze_population_activity(source, index=None, chunk_size=CHUNK_SIZE, bin_ms=5.0, metrics=False):
+    """
+    Extract population-level firing and synchrony statistics, streaming the
+    spikes in chunks
+
+    source:  columnar output folder, NetPyNE JSON file or data loaded with load_simulation
+    index:   run index (see load_run_index), read from the saved metadata if not given
+    metrics: also bin the spikes for rate_t, count_corr, fano and golomb_chi
+             (see network_metrics.py)
+    """
+    index = index or load_run_index(source)
+    pops = index['pops']
+    gid_pop = index['gid_pop']
+    t_start, t_stop = index['analysis_window']
+    duration_ms = t_stop - t_start
+
+    acc = spike_stats.SpikeAccumulator(gid_pop, len(pops) + 1)    # last bucket: gids outside every pop
+    binner = network_metrics.SpikeBinner(gid_pop, t_start, t_stop, bin_ms) if metrics else None
+    for spkt, spkid in iter_spike_chunks(source, chunk_size):
+        keep = (spkt >= t_start) & (spkt <= t_stop)
+        acc.add(spkt[keep], spkid[keep])
+        if binner:
+            binner.add(spkt[keep], spkid[keep])
 
+    summary = acc.summarize(pops + ['_other'], duration_ms)
+    binned = binner.metrics(pops) if binner else {}
+
+    # Per-population std of the single-cell rates, grouped with the same lookup table
+    cell_rates = summary['cellRate']
+    n_cells = np.bincount(gid_pop, minlength=len(pops) + 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(gid_pop, weights=cell_rates, minlength=len(pops) + 1) / n_cells
+        var = np.bincount(gid_pop, weights=cell_rates ** 2, minlength=len(pops) + 1) / n_cells - mean ** 2
+    rate_std = np.sqrt(np.maximum(np.nan_to_num(var), 0))
+
+    results = {}
+    for i, pop_name in enumerate(pops):
+        stats = summary['pops'][pop_name]
         results[pop_name] = {
-            'n_cells': n_cells,
-            'total_spikes': total_spikes,
-            'avg_rate_hz': avg_rate,
-            'rate_std': np.std(cell_rates),
-            'cv_isi': cv_isi,
-            'active_cells': np.sum(np.array(cell_rates) > 0)
+            'n_cells': stats['cells'],
+            'total_spikes': stats['spikes'],
+            'avg_rate_hz': stats['rate'],
+            'rate_std': float(rate_std[i]),
+            'cv_isi': stats['poolCV'],        # Synchrony measure (CV of the pooled population ISIs)
+            'cv_isi_cell': stats['cv'],       # Mean single-cell ISI CV
+            'active_cells': stats['active'],
         }
+        if binner:
+            results[pop_name].update({
+                'rate_t': binned[pop_name]['rate_t'],            # Population rate per bin (Hz)
+                'count_corr': binned[pop_name]['count_corr'],    # Mean pairwise spike-count correlation
+                'fano': binned[pop_name]['fano'],
+                'golomb_chi': binned[pop_name]['golomb_chi']     # Synchrony (Golomb chi)
+            })
 
     return results
 
@@ -83,10 +215,13 @@ def main():
     all_results = {}
 
     for condition, filepath in files.items():
+        # Prefer the columnar output of the same run when present
+        columnar = filepath.replace('_data.json', '_columnar')
+        if columnar_io.is_columnar(columnar):
+            filepath = columnar
         if os.path.exists(filepath):
             print(f"\n[Loading] {condition}...")
-            data = load_simulation(filepath)
-            results = analyze_population_activity(data)
+            results = analyze_population_activity(filepath, metrics=True)
             all_results[condition] = results
             print(f"✓ {condition} loaded successfully")
         else:
@@ -95,7 +230,8 @@ def main():
 
     # Create comparison table for HL23PYR (pyramidal neurons)
     print("\n" + "="*80)
-    print("HL23PYR POPULATION COMPARISON (80 pyramidal neurons)")
+    n_pyr = next((results['HL23PYR']['n_cells'] for results in all_results.values() if results), 0)
+    print(f"HL23PYR POPULATION COMPARISON ({n_pyr} pyramidal neurons)")
     print("="*80)
 
     pyr_data = []
@@ -107,7 +243,7 @@ def main():
                 'Total Spikes': pyr_stats['total_spikes'],
                 'Avg Rate (Hz)': f"{pyr_stats['avg_rate_hz']:.2f}",
                 'Std Dev (Hz)': f"{pyr_stats['rate_std']:.2f}",
-                'Active Cells': f"{pyr_stats['active_cells']}/80",
+                'Active Cells': f"{pyr_stats['active_cells']}/{pyr_stats['n_cells']}",
                 'CV ISI': f"{pyr_stats['cv_isi']:.3f}"
             })
 
@@ -147,10 +283,11 @@ def main():
     for condition in ['Healthy', 'AD Stage 1', 'AD Stage 3']:
         if all_results[condition] is not None:
             print(f"\n[{condition}]")
-            for pop in ['HL23PYR', 'HL23SST', 'HL23PV', 'HL23VIP']:
-                stats = all_results[condition][pop]
+            for pop, stats in all_results[condition].items():
                 print(f"  {pop:10s}: {stats['avg_rate_hz']:6.2f} Hz "
-                      f"({stats['active_cells']}/{stats['n_cells']} active)")
+                      f"({stats['active_cells']}/{stats['n_cells']} active), "
+                      f"chi {stats['golomb_chi']:.3f}, corr {stats['count_corr']:.3f}, "
+                      f"Fano {stats['fano']:.2f}")
 
     # Save summary
     summary_file = 'output/network_comparison_summary.txt'
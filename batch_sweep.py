@@ -0,0 +1,288 @@
+"""
+batch_sweep.py
+Parameter sweeps over AD stage, E/I gains and background drive
+
+Expands a grid or random design over the cfg parameters in SWEEP, runs every
+point as its own init.py process (cfg overrides, key=value) on local workers,
+and collects the per-population statistics of each run into one results
+store indexed by an automatically generated label:
+
+    output/sweeps/<name>/
+        jobs.sqlite         job table (see job_scheduler.py)
+        results.json        {'sweep', 'design', 'points': {label: {params, status, wall, results}}}
+        results.csv         one row per completed point (params + per-population metrics)
+        <label>_*           output and log of each run (columnar spikes, index, metrics)
+
+Points are jobs keyed by the hash of their cfg, the model files and the code
+they run (RUN_MODULES): jobs already done are skipped, crashed or timed-out runs
+are retried, so an interrupted sweep is continued by running the same command
+again (retry=True also reruns the points that failed for good).
+
+Sweep parameters are cfg attributes. A scalar value for a per-population dict
+(backgroundRate, backgroundWeight) sets every population; 'backgroundRate.HL23PV'
+sets one population.
+
+Usage:
+    python batch_sweep.py                                    # grid over SWEEP
+    python batch_sweep.py design=random samples=20 seed=1
+    python batch_sweep.py name=ei workers=8 ranks=2 duration=1000
+    python batch_sweep.py timeout=3600 memoryMB=8000          # per-job limits
+    python batch_sweep.py retry=True                         # rerun failed points
+"""
+
+import ast
+import itertools
+import json
+import os
+import shutil
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cache_utils import hash_params
+from job_scheduler import JobScheduler, job_key
+
+# Grid values (design=grid) or [low, high] ranges of the random design (design=random);
+# ADstage is always sampled from its listed values
+SWEEP = {
+    'ADstage': [1, 2, 3],
+    'EEGain': [0.8, 1.0, 1.2],
+    'EIGain': [1.0],
+    'IEGain': [0.8, 1.0, 1.2],
+    'IIGain': [1.0],
+    'backgroundRate': [80.0, 100.0, 120.0],
+}
+DISCRETE = ['ADstage']
+
+# Short names used in the generated labels
+ABBREV = {'ADstage': 'AD', 'EEGain': 'EE', 'EIGain': 'EI', 'IEGain': 'IE', 'IIGain': 'II',
+          'backgroundRate': 'bg', 'backgroundWeight': 'bgw'}
+
+SWEEP_DIR = 'output/sweeps'
+MPIEXEC = os.environ.get('MPIEXEC', 'mpiexec')
+POP_DICT_PARAMS = ['backgroundRate', 'backgroundWeight']
+
+# Code run by every point (init.py and the modules it uses), hashed into the job keys
+RUN_MODULES = ['init.py', 'cache_utils.py', 'recording.py', 'spike_stats.py', 'checkpoint.py',
+               'live_stats.py', 'load_balance.py', 'partition_utils.py', 'multisplit.py',
+               'multithread.py', 'coreneuron_support.py', 'columnar_io.py', 'network_metrics.py']
+
+# Sweep runs record spikes only and skip plotting (see recording.py)
+BASE_OVERRIDES = {'recordingProfile': 'spikes-only', 'analysis': {}, 'saveJson': False,
+                  'saveColumnar': True, 'networkMetrics': True}
+
+
+def grid_design(sweep):
+    """Every combination of the values in sweep"""
+    keys = list(sweep)
+    return [dict(zip(keys, values)) for values in itertools.product(*sweep.values())]
+
+
+def random_design(sweep, samples, seed=0):
+    """samples points drawn uniformly from [min, max] of each parameter (DISCRETE: from the values)"""
+    rng = np.random.default_rng(seed)
+    points = []
+    for _ in range(samples):
+        point = {}
+        for key, values in sweep.items():
+            if key in DISCRETE:
+                point[key] = values[rng.integers(len(values))]
+            else:
+                point[key] = round(float(rng.uniform(min(values), max(values))), 4)
+        points.append(point)
+    return points
+
+
+def point_label(name, params):
+    """Readable, unique label: <name>_AD2_EE1.2_..._<hash>"""
+    parts = [f"{ABBREV.get(key, key)}{value:g}" if isinstance(value, (int, float)) else f"{key}"
+             for key, value in params.items()]
+    return f"{name}_{'_'.join(parts)}_{hash_params(params)[:8]}".replace('.', 'p')
+
+
+def cfg_overrides(params):
+    """cfg overrides of one point (per-population dicts expanded)"""
+    from cfg import cfg
+
+    overrides = {}
+    for key, value in params.items():
+        base, _, pop = key.partition('.')
+        if base in POP_DICT_PARAMS:
+            current = dict(overrides.get(base, getattr(cfg, base)))
+            for p in ([pop] if pop else current):
+                current[p] = value
+            overrides[base] = current
+        else:
+            overrides[key] = value
+    return overrides
+
+
+def point_overrides(label, params, folder, extra=None):
+    """All cfg overrides of one point; extra overrides must not set a swept parameter"""
+    swept = {key.partition('.')[0] for key in params}
+    clash = sorted(key for key in (extra or {}) if key.partition('.')[0] in swept)
+    if clash:
+        raise ValueError(f"Overrides {clash} collide with the swept parameters {sorted(swept)}")
+    overrides = dict(BASE_OVERRIDES, simLabel=label, saveFolder=folder, **cfg_overrides(params))
+    overrides.update(extra or {})
+    return overrides
+
+
+def point_key(overrides):
+    """Job key of a point: hash of cfg.py with the overrides applied, the model files and RUN_MODULES"""
+    from cfg import cfg
+
+    return job_key(dict(cfg.__dict__, **overrides), modules=RUN_MODULES)
+
+
+def point_job(label, overrides, folder, ranks=1):
+    """Job payload running init.py for one point"""
+    cmd = [sys.executable, 'init.py'] + [f'{key}={value!r}' for key, value in overrides.items()]
+    if ranks > 1:
+        cmd = [MPIEXEC, '-n', str(ranks)] + cmd
+    return {'cmd': cmd, 'log': os.path.join(folder, label + '.log')}
+
+
+def collect_point(label, params, folder, job):
+    """Store entry of one point from its job and its columnar output"""
+    entry = {'params': params, 'key': job['key'], 'attempts': job['attempts']}
+    columnar = os.path.join(folder, label + '_columnar')
+    if job['status'] != 'done' or not os.path.isdir(columnar):
+        entry.update({'status': 'failed', 'error': job['error'] or 'no output'})
+        return entry
+
+    from analyze_network_results import analyze_population_activity
+    results = analyze_population_activity(columnar, metrics=True)
+    entry['wall'] = json.loads(job['result'])['wall']
+    entry['results'] = {pop: {key: (float(value) if np.isscalar(value) else None)
+                              for key, value in stats.items() if key != 'rate_t'}
+                        for pop, stats in results.items()}
+    entry['status'] = 'done'
+    return entry
+
+
+def load_store(folder):
+    path = os.path.join(folder, 'results.json')
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {'points': {}}
+
+
+def save_store(folder, store):
+    """Write results.json atomically and the flat results.csv table"""
+    path = os.path.join(folder, 'results.json')
+    with open(path + '.tmp', 'w') as f:
+        json.dump(store, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+    rows = []
+    for label, entry in store['points'].items():
+        if entry.get('status') != 'done':
+            continue
+        row = {'label': label, **entry['params'], 'wall': entry.get('wall')}
+        for pop, stats in entry['results'].items():
+            for key, value in stats.items():
+                row[f'{pop}_{key}'] = value
+        rows.append(row)
+    if rows:
+        pd.DataFrame(rows).set_index('label').to_csv(os.path.join(folder, 'results.csv'))
+
+
+def run_sweep(points, name='sweep', workers=None, ranks=1, extra=None, design='grid', limits=None,
+              retry=False):
+    """
+    Run all points not yet done through the job table of the sweep
+    (output/sweeps/<name>/jobs.sqlite, see job_scheduler.py); returns the results store.
+    Each point is added to the store (and the store saved) as soon as its job finishes.
+    With retry=True, points that failed in earlier runs are run again.
+    """
+    folder = os.path.join(SWEEP_DIR, name)
+    os.makedirs(folder, exist_ok=True)
+    store = load_store(folder)
+    store.update({'sweep': name, 'design': design, 'overrides': extra or {}})
+
+    jobs = JobScheduler(os.path.join(folder, 'jobs.sqlite'))
+    labels = {}
+    for params in points:
+        label = point_label(name, params)
+        overrides = point_overrides(label, params, folder, extra)
+        key = point_key(overrides)
+        jobs.submit(key, point_job(label, overrides, folder, ranks), label=label, limits=limits)
+        labels[key] = (label, params)
+    if retry:
+        jobs.retry_failed(list(labels))
+
+    counts = jobs.counts()
+    print(f"Sweep '{name}': {len(labels)} points, {counts.get('done', 0)} already done, "
+          f"{counts.get('pending', 0) + counts.get('running', 0)} to run")
+
+    lock = threading.Lock()     # workers finish jobs concurrently
+
+    def collect(job):
+        if job['key'] not in labels:     # other points in the same job table
+            return
+        label, params = labels[job['key']]
+        entry = collect_point(label, params, folder, job)
+        with lock:
+            store['points'][label] = entry
+            save_store(folder, store)
+
+    # Points finished by earlier runs, then every job as it finishes
+    for job in jobs.jobs():
+        label = labels.get(job['key'], (None,))[0]
+        if job['status'] in ('done', 'failed') and store['points'].get(label, {}).get('status') != job['status']:
+            collect(job)
+    save_store(folder, store)
+
+    workers = workers or max(1, (os.cpu_count() or 1) // ranks)
+    jobs.run_workers(workers, onFinished=collect)
+    return store
+
+
+def main():
+    args = {}
+    for arg in sys.argv[1:]:
+        key, _, value = arg.partition('=')
+        try:
+            args[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            args[key] = value
+
+    design = args.pop('design', 'grid')
+    name = args.pop('name', design)
+    workers = args.pop('workers', None)
+    ranks = args.pop('ranks', 1)
+    samples = args.pop('samples', 20)
+    seed = args.pop('seed', 0)
+    retry = args.pop('retry', False)
+    limits = {key: args.pop(key) for key in ['timeout', 'memoryMB', 'cpuSeconds'] if key in args}
+    # Remaining key=value arguments are cfg overrides shared by all points (e.g. duration=1000)
+
+    if ranks > 1 and shutil.which(MPIEXEC) is None:
+        print(f"✗ ERROR: {MPIEXEC} not found (set MPIEXEC to your launcher)")
+        sys.exit(1)
+
+    if design == 'random':
+        points = random_design(SWEEP, samples, seed)
+    else:
+        points = grid_design(SWEEP)
+
+    print("="*70)
+    print("PARAMETER SWEEP")
+    print("="*70)
+    try:
+        store = run_sweep(points, name=name, workers=workers, ranks=ranks, extra=args, design=design,
+                          limits=limits, retry=retry)
+    except ValueError as e:
+        print(f"✗ ERROR: {e}")
+        sys.exit(1)
+
+    done = sum(entry.get('status') == 'done' for entry in store['points'].values())
+    print(f"\n✓ {done}/{len(store['points'])} points done, results in {SWEEP_DIR}/{name}/results.json (.csv)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+benchmark_scaling.py
+Strong and weak MPI scaling benchmark for the Yao L2/3 microcircuit
+
+Strong scaling: fixed network (STRONG_SCALE x 100 cells) on 1..N ranks
+Weak scaling:   CELLS_PER_RANK_WEAK x 100 cells per rank on 1..N ranks
+
+Each point runs init.py under mpiexec with cfg overrides and reads the
+NetPyNE timing dict written by rank 0 (cfg.timingFile).
+
+Usage:
+    python benchmark_scaling.py
+    python benchmark_scaling.py 1 2 4 8 16     # custom rank counts
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+RANKS = [1, 2, 4, 8]
+STRONG_SCALE = 10           # 1k cells
+CELLS_PER_RANK_WEAK = 1     # scale per rank: 100 cells per rank
+DURATION = 500.0            # ms
+MPIEXEC = os.environ.get('MPIEXEC', 'mpiexec')
+OUTPUT_DIR = 'output/scaling'
+
+# Keep benchmark runs free of I/O and plotting
+BASE_OVERRIDES = ['saveJson=False', 'analysis={}', 'recordTraces={}', f'duration={DURATION}']
+
+
+def run_point(nranks, scale, label, nthreads=1, output_dir=OUTPUT_DIR, mpi=True):
+    """
+    Run init.py on nranks (under MPIEXEC, or as a plain process with mpi=False)
+    with nthreads threads per rank and the given scale; return the timing dict
+    """
+    timing_file = os.path.join(output_dir, f'timing_{label}_n{nranks}.json')
+    cmd = [sys.executable, 'init.py', f'scale={scale}', f'timingFile={timing_file!r}'] + BASE_OVERRIDES
+    if nthreads > 1:
+        cmd.append(f'nthreads={nthreads}')
+    if mpi:
+        cmd = [MPIEXEC, '-n', str(nranks)] + cmd
+
+    t0 = time.time()
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    wall = time.time() - t0
+
+    if proc.returncode != 0 or not os.path.exists(timing_file):
+        print(f"  ✗ {label} n={nranks} failed (exit {proc.returncode})")
+        print(proc.stdout[-2000:])
+        return None
+
+    with open(timing_file) as f:
+        result = json.load(f)
+    result['wall'] = wall
+    return result
+
+
+def print_table(title, results, weak=False, axis='ranks'):
+    """
+    Print runtime, speedup and parallel efficiency relative to the smallest run
+    (results: [(n, timing dict)], n = ranks or threads as named by axis)
+    """
+    print("\n" + "="*70)
+    print(title)
+    print("="*70)
+    print(f"{axis:>6} {'cells':>7} {'create (s)':>11} {'run (s)':>9} {'total (s)':>10} "
+          f"{'speedup':>8} {'eff':>6}")
+    print("-"*70)
+
+    valid = [(n, r) for n, r in results if r is not None]
+    if not valid:
+        print("  (no successful runs)")
+        return
+    n0, r0 = valid[0]
+    t0 = r0['timing'].get('runTime', r0['wall'])
+
+    for n, r in valid:
+        timing = r['timing']
+        t_run = timing.get('runTime', r['wall'])
+        t_create = timing.get('create', float('nan'))
+        t_total = timing.get('totalTime', r['wall'])
+        if weak:
+            speedup = t0 / t_run * (n / n0)     # scaled speedup
+            eff = t0 / t_run
+        else:
+            speedup = t0 / t_run
+            eff = speedup * n0 / n
+        print(f"{n:>6} {r['numCells']:>7} {t_create:>11.2f} {t_run:>9.2f} {t_total:>10.2f} "
+              f"{speedup:>8.2f} {eff:>6.0%}")
+
+
+def main():
+    ranks = [int(n) for n in sys.argv[1:]] or RANKS
+
+    if shutil.which(MPIEXEC) is None:
+        print(f"✗ ERROR: {MPIEXEC} not found (set MPIEXEC to your launcher)")
+        sys.exit(1)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    ncores = os.cpu_count() or 1
+    print(f"Scaling benchmark: ranks {ranks}, {ncores} cores, {DURATION} ms simulated")
+    if max(ranks) > ncores:
+        print(f"⚠ WARNING: more ranks than cores ({max(ranks)} > {ncores}), results will be oversubscribed")
+
+    print(f"\nStrong scaling ({STRONG_SCALE * 100} cells)...")
+    strong = []
+    for n in ranks:
+        print(f"  n={n}")
+        strong.append((n, run_point(n, STRONG_SCALE, 'strong')))
+
+    print(f"\nWeak scaling ({CELLS_PER_RANK_WEAK * 100} cells per rank)...")
+    weak = []
+    for n in ranks:
+        print(f"  n={n}")
+        weak.append((n, run_point(n, CELLS_PER_RANK_WEAK * n, 'weak')))
+
+    print_table(f"STRONG SCALING ({STRONG_SCALE * 100} cells)", strong)
+    print_table(f"WEAK SCALING ({CELLS_PER_RANK_WEAK * 100} cells per rank)", weak, weak=True)
+
+    summary = {'ranks': ranks, 'duration': DURATION,
+               'strong': dict((str(n), r) for n, r in strong),
+               'weak': dict((str(n), r) for n, r in weak)}
+    with open(os.path.join(OUTPUT_DIR, 'scaling_summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"\n✓ Saved {OUTPUT_DIR}/scaling_summary.json")
+
+
+if __name__ == '__main__':
+    main()
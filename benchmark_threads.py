@@ -0,0 +1,46 @@
+"""
+benchmark_threads.py
+Multithreaded vs single-thread benchmark for the Yao L2/3 microcircuit
+
+Runs init.py (single process, no MPI) with cfg.nthreads = 1, 2, 4, ... on the
+same network and compares the NetPyNE run time against the 1-thread baseline.
+The runs and the table are those of benchmark_scaling.py, with threads as axis.
+
+Usage:
+    python benchmark_threads.py
+    python benchmark_threads.py 1 2 4 8 16     # custom thread counts
+"""
+
+import json
+import os
+import sys
+
+from benchmark_scaling import DURATION, print_table, run_point
+
+THREADS = [1, 2, 4, 8]
+SCALE = 10                  # 1k cells
+OUTPUT_DIR = 'output/threads'
+
+
+def main():
+    threads = [int(n) for n in sys.argv[1:]] or THREADS
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    ncores = os.cpu_count() or 1
+    print(f"Thread benchmark: threads {threads}, {ncores} cores, {SCALE * 100} cells, {DURATION} ms simulated")
+
+    results = []
+    for n in threads:
+        print(f"  nthreads={n}")
+        results.append((n, run_point(1, SCALE, f't{n}', nthreads=n, output_dir=OUTPUT_DIR, mpi=False)))
+
+    print_table(f"MULTITHREADED vs SINGLE-THREAD ({SCALE * 100} cells)", results, axis='threads')
+
+    with open(os.path.join(OUTPUT_DIR, 'threads_summary.json'), 'w') as f:
+        json.dump({'threads': threads, 'scale': SCALE, 'duration': DURATION,
+                   'results': dict((str(n), r) for n, r in results)}, f, indent=2)
+    print(f"\n✓ Saved {OUTPUT_DIR}/threads_summary.json")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+cache_utils.py
+Shared helpers for the on-disk caches kept under .cache/
+(content hashes of input files and parameter sets, cache paths)
+"""
+
+import hashlib
+import json
+import os
+import glob
+
+# Root folder for all caches (safe to delete at any time)
+CACHE_DIR = '.cache'
+
+# Python sources that shape an instantiated cell: the loader, the channel densities
+# set from the HOC templates and the cached morphology geometry. Part of every
+# key of a cache or job whose result depends on the cell models.
+CELL_SOURCES = ['cellwrapper.py', 'channel_distribution.py', 'morphology_cache.py']
+
+
+def hash_bytes(*chunks):
+    """SHA-256 hex digest of the concatenated byte strings"""
+
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_files(paths):
+    """SHA-256 hex digest of the contents of several files (order matters, names do not)"""
+
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def hash_params(params):
+    """SHA-256 hex digest of a JSON-serializable parameter structure (key order independent)"""
+
+    text = json.dumps(params, sort_keys=True, default=str)
+    return hash_bytes(text.encode('utf-8'))
+
+
+def hash_mod_files(mod_dir='mod'):
+    """Hash of all NMODL files, so caches are invalidated when mechanisms change"""
+
+    return hash_files(sorted(glob.glob(os.path.join(mod_dir, '*.mod'))))
+
+
+def cache_path(subdir, filename):
+    """Path of a cache file in CACHE_DIR/subdir, creating the folder if needed"""
+
+    folder = os.path.join(CACHE_DIR, subdir)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, filename)
@@ -6,6 +6,39 @@ Fernando's exact approach - expects cell-specific template files
 import sys
 import os
 
+# Rebuild cells from the compiled morphology cache (.cache/morphologies) instead of
+# parsing the SWC files with Import3d on every import
+USE_MORPH_CACHE = True
+
+
+def _instantiateTemplate(templateName, templatepath, morphpath):
+    """Create a template instance, through the morphology cache if enabled"""
+    from neuron import h
+
+    if USE_MORPH_CACHE:
+        import morphology_cache
+        return morphology_cache.instantiate(templateName, templatepath, morphpath)
+    return getattr(h, templateName)(morphpath)
+
+
+def cellFiles(cellName, ad=False, ad_stage=None):
+    """
+    Template, biophysics and morphology files used by loadCell_<cellName>.
+
+    Returns:
+        tuple: (templatepath, biophysics, morphpath)
+    """
+    templatepath = 'models/NeuronTemplate_' + cellName + '.hoc'
+    morphpath = 'morphologies/' + cellName + '.swc'
+    if ad:
+        # Default to Stage 1 if ad=True but no valid stage specified
+        stage = ad_stage if ad_stage in (1, 2, 3) else 1
+        biophysics = 'models/biophys_' + cellName + '_AD_Stage' + str(stage) + '.hoc'
+    else:
+        biophysics = 'models/biophys_' + cellName + '.hoc'
+    return templatepath, biophysics, morphpath
+
+
 def loadCell_HL23PYR(cellName, ad=False, ad_stage=None):
     """
     Load HL23PYR cell with optional AD staging support.
@@ -18,26 +51,19 @@ def loadCell_HL23PYR(cellName, ad=False, ad_stage=None):
     Returns:
         NEURON cell object
     """
-    templatepath = 'models/NeuronTemplate_HL23PYR.hoc'
-    morphpath = 'morphologies/' + cellName + '.swc'
+    templatepath, biophysics, morphpath = cellFiles(cellName, ad=ad, ad_stage=ad_stage)
 
-    # Select biophysics file based on AD flag and stage
+    # Report which biophysics file was selected
     if ad:
         if ad_stage == 1:
-            biophysics = 'models/biophys_' + cellName + '_AD_Stage1.hoc'
             print(f"[AD] Loading {cellName} with Stage 1 (Early Hyperexcitability) biophysics")
         elif ad_stage == 2:
-            biophysics = 'models/biophys_' + cellName + '_AD_Stage2.hoc'
             print(f"[AD] Loading {cellName} with Stage 2 (Intermediate Transition) biophysics")
         elif ad_stage == 3:
-            biophysics = 'models/biophys_' + cellName + '_AD_Stage3.hoc'
             print(f"[AD] Loading {cellName} with Stage 3 (Late Hypoexcitability) biophysics")
         else:
-            # Default to Stage 1 if ad=True but no stage specified
-            biophysics = 'models/biophys_' + cellName + '_AD_Stage1.hoc'
             print(f"[AD] Loading {cellName} with Stage 1 (Early Hyperexcitability, default) biophysics")
     else:
-        biophysics = 'models/biophys_' + cellName + '.hoc'
         print(f"[HEALTHY] Loading {cellName} with healthy baseline biophysics")
 
     from neuron import h
@@ -50,7 +76,7 @@ def loadCell_HL23PYR(cellName, ad=False, ad_stage=None):
     except:
         pass
 
-    cell = getattr(h, 'NeuronTemplate_HL23PYR')(morphpath)
+    cell = _instantiateTemplate('NeuronTemplate_HL23PYR', templatepath, morphpath)
     print(cell)
     h.biophys_HL23PYR(cell)
 
@@ -77,7 +103,7 @@ def loadCell_HL23VIP(cellName):
     except:
         pass
     
-    cell = getattr(h, 'NeuronTemplate_HL23VIP')(morphpath)
+    cell = _instantiateTemplate('NeuronTemplate_HL23VIP', templatepath, morphpath)
     print(cell)
     h.biophys_HL23VIP(cell)
     return cell
@@ -98,7 +124,7 @@ def loadCell_HL23PV(cellName):
     except:
         pass
     
-    cell = getattr(h, 'NeuronTemplate_HL23PV')(morphpath)
+    cell = _instantiateTemplate('NeuronTemplate_HL23PV', templatepath, morphpath)
     print(cell)
     h.biophys_HL23PV(cell)
     return cell
@@ -119,7 +145,7 @@ def loadCell_HL23SST(cellName):
     except:
         pass
     
-    cell = getattr(h, 'NeuronTemplate_HL23SST')(morphpath)
+    cell = _instantiateTemplate('NeuronTemplate_HL23SST', templatepath, morphpath)
     print(cell)
     h.biophys_HL23SST(cell)
     return cell
\ No newline at end of file
@@ -15,7 +15,8 @@ cfg = specs.SimConfig()
 # SIMULATION CONFIGURATION
 #------------------------------------------------------------------------------
 cfg.simType = 'Yao_L23_100cell'
-cfg.coreneuron = False
+cfg.coreneuron = False          # Run on CoreNEURON (CPU); falls back to NEURON if blocked (see coreneuron_support.py)
+cfg.coredatFolder = None        # If set with cfg.coreneuron, also export the model as CoreNEURON data to this folder
 
 #------------------------------------------------------------------------------
 # AD (Alzheimer's Disease) Configuration
@@ -32,12 +33,28 @@ cfg.dt = 0.025                  # Internal integration timestep
 cfg.seeds = {'conn': 4321, 'stim': 1234, 'loc': 4321}
 cfg.hParams = {'celsius': 34, 'v_init': -80}
 cfg.verbose = False
+cfg.logLevel = 1                # netParams console output: 0 = errors only, 1 = summaries, 2 = full detail
 cfg.createNEURONObj = True
 cfg.createPyStruct = True
 cfg.cvode_active = False
 cfg.cache_efficient = True
+cfg.nthreads = 1                # NEURON threads per rank (cells split across threads by compartment count, see multithread.py)
+cfg.loadBalance = False         # MPI gid distribution: False = NetPyNE round-robin, 'segmech' or 'loadbal' (see load_balance.py)
+cfg.multisplit = False          # Split the largest cells across ranks with ParallelContext.multisplit (see multisplit.py)
+cfg.multisplitPops = ['HL23PV', 'HL23SST']
+cfg.multisplitPieces = 2        # Pieces per split cell (owner + helper ranks)
 cfg.printRunTime = 0.1
 
+# Warm-up checkpoint (see checkpoint.py): restore the network state at warmupDuration
+# from .cache/checkpoints instead of re-simulating the transient. Recorded data starts
+# at warmupDuration when enabled.
+cfg.useCheckpoint = False
+cfg.warmupDuration = 500.0      # ms
+
+# Cell rule cache: load netParams.cellParams from .cache/cellParams instead of
+# instantiating the HOC cells through importCellParams (see netParams.py)
+cfg.useCellParamsCache = True
+
 cfg.includeParamsLabel = False
 cfg.printPopAvgRates = True
 cfg.checkErrors = False
@@ -45,25 +62,37 @@ cfg.checkErrors = False
 #------------------------------------------------------------------------------
 # Network size
 #------------------------------------------------------------------------------
-cfg.scale = 1.0
+cfg.scale = 1.0                 # Network size multiplier: 1 = 100 cells, 10 = 1k, 100 = 10k
 cfg.sizeY = 3300.0              # Column height (um)
 cfg.sizeX = 250.0               # Column radius (um)
 cfg.sizeZ = 250.0
 
 #------------------------------------------------------------------------------
-# Cell populations (100 cells total, matching Yao et al. proportions)
+# Cell populations (100 cells x cfg.scale, matching Yao et al. proportions)
 #------------------------------------------------------------------------------
 cfg.allpops = ['HL23PYR', 'HL23SST', 'HL23PV', 'HL23VIP']
 
-# Population sizes (total = 100)
 # Yao ratios: PYR ~80%, SST ~8%, PV ~6%, VIP ~6%
-cfg.cellNumber = {
-    'HL23PYR': 80,      # Excitatory pyramidal
-    'HL23SST': 8,       # Somatostatin interneurons
-    'HL23PV': 6,        # Parvalbumin interneurons
-    'HL23VIP': 6        # VIP interneurons
+cfg.baseCellNumber = 100
+cfg.cellFractions = {
+    'HL23PYR': 0.80,    # Excitatory pyramidal
+    'HL23SST': 0.08,    # Somatostatin interneurons
+    'HL23PV': 0.06,     # Parvalbumin interneurons
+    'HL23VIP': 0.06     # VIP interneurons
 }
 
+
+def scaleCellNumbers(cfg):
+    """Set cfg.cellNumber from the Yao proportions, cfg.baseCellNumber and cfg.scale"""
+    cfg.cellNumber = {
+        pop: max(1, int(round(cfg.baseCellNumber * cfg.scale * cfg.cellFractions[pop])))
+        for pop in cfg.allpops
+    }
+
+
+# Population sizes (scale = 1: 80/8/6/6, total = 100)
+scaleCellNumbers(cfg)
+
 #------------------------------------------------------------------------------
 # Recording
 #------------------------------------------------------------------------------
@@ -73,6 +102,22 @@ cfg.recordTraces = {
     'V_soma': {'sec': 'soma_0', 'loc': 0.5, 'var': 'v'},
 }
 
+# Recording profile (see recording.py): 'full-debug' = the settings above,
+# 'sparse-soma' = soma envelopes of a few cells per pop, 'spikes-only'
+cfg.recordingProfile = 'full-debug'
+cfg.recordCellsPerPop = 1       # sparse-soma: cells recorded per population
+cfg.recordEnvelopeStep = 1.0    # sparse-soma: min/max envelope bin (ms), or sample interval of 'decimate' traces
+
+# Online spike statistics (see live_stats.py): accumulate rates/ISI moments during
+# the run and print live population rates every liveStatsInterval ms
+cfg.liveStats = False
+cfg.liveStatsInterval = 100.0   # ms
+cfg.keepSpikes = True           # False: drop the spike list after each interval (statistics only)
+
+# Windowed rates and synchrony metrics after the run (see network_metrics.py)
+cfg.networkMetrics = True
+cfg.metricsBinSize = 5.0        # ms
+
 cfg.recordStim = False
 cfg.recordTime = False
 cfg.recordStep = 0.1
@@ -80,15 +125,24 @@ cfg.recordStep = 0.1
 #------------------------------------------------------------------------------
 # Saving
 #------------------------------------------------------------------------------
-cfg.simLabel = 'Yao_L23_100cell_AD_Stage2'
+
+
+def defaultSimLabel(cfg):
+    """Output label from the AD settings: Yao_L23_100cell or Yao_L23_100cell_AD_Stage<n>"""
+    return 'Yao_L23_100cell' + (f'_AD_Stage{cfg.ADstage}' if cfg.ADmodel else '')
+
+
+cfg.simLabel = defaultSimLabel(cfg)    # 'Yao_L23_100cell_AD_Stage2'; follows ADmodel/ADstage overrides in init.py
 cfg.saveFolder = 'output'
 cfg.savePickle = False
 cfg.saveJson = True
+cfg.saveColumnar = False        # Also write spikes/traces/conns as memory-mappable .npy columns (see columnar_io.py)
 cfg.saveDataInclude = ['simData', 'simConfig', 'netParams']
 cfg.backupCfgFile = None
 cfg.gatherOnlySimData = False
 cfg.saveCellSecs = True
 cfg.saveCellConns = True
+cfg.timingFile = None            # If set, rank 0 writes sim.timingData here as JSON (see benchmark_scaling.py)
 
 #------------------------------------------------------------------------------
 # Analysis and plotting
@@ -0,0 +1,91 @@
+"""
+channel_distribution.py
+Vectorized replacement for NeuronTemplate.distribute_channels()
+
+The HOC version loops over every segment, builds a "mech(x) = value" string with
+sprint() and runs it through execute(). Here all segment distances of the
+section group are computed in one pass, calculate_distribution() is evaluated on
+NumPy arrays and the values are assigned directly to the segments.
+
+The templates call distribute_channels() below through a PythonObject and fall
+back to their HOC loop when this module cannot be imported.
+"""
+
+import re
+
+import numpy as np
+from neuron import h
+
+_SEC_NAME = re.compile(r'\.(\w+\[\d+\])$')
+
+
+def calculate_distribution(dist_type, dist, a, b, c, d, base):
+    """
+    Channel density at (normalized or absolute) distances `dist`, as in the HOC
+    calculate_distribution():
+        0 linear, 1/5 sigmoid, 2/4 exponential, 3 step for absolute distance (um)
+    """
+
+    dist = np.asarray(dist, dtype=float)
+    if dist_type == 0:
+        value = a + dist * b
+    elif dist_type in (1, 5):
+        value = a + b / (1 + np.exp((dist - c) / d))
+    elif dist_type in (2, 4):
+        value = a + d * np.exp(b * (dist - c))
+    elif dist_type == 3:
+        value = np.where((dist > c) & (dist < d), a, b)
+    else:
+        value = np.zeros_like(dist)
+    return value * base
+
+
+def _matching_sections(cell, pattern):
+    """Sections of `cell` whose template-local name matches `pattern` (like forsec "pattern")"""
+
+    return [sec for sec in cell.all if re.search(pattern, _SEC_NAME.search(sec.name()).group(1))]
+
+
+def distribute_channels(cell, secName, mech, dist_type, a, b, c, d, base):
+    """
+    Set range variable `mech` on every segment of the `secName` sections.
+
+    Distances are measured from secName[0](0), or axon[0](1) for the axon (the
+    origins of the HOC getLongestBranch()), and normalized by the longest branch
+    for types 0-2.
+    As in the HOC for(x) loop, whose last assignment (x=1) lands on the last
+    segment, the last segment of each section gets the value at its 1 end.
+    """
+
+    dist_type = int(dist_type)
+    secs = _matching_sections(cell, secName)
+
+    if mech == 'Ra':
+        for sec in secs:
+            sec.Ra = base
+        return
+
+    origin = getattr(cell, secName)[0](1 if secName == 'axon' else 0)
+
+    # Longest path to a terminal section (getLongestBranch)
+    maxLength = max([h.distance(origin, sec(1)) for sec in secs
+                     if h.SectionRef(sec=sec).nchild() == 0] + [0])
+    if maxLength == 0:
+        maxLength = secs[0].L
+
+    # All segment distances in one pass
+    xs = [np.array([seg.x for seg in sec] + [1.0]) for sec in secs]
+    dist = np.array([h.distance(origin, sec(x)) for sec, sec_xs in zip(secs, xs) for x in sec_xs])
+    if dist_type not in (3, 4, 5):
+        dist = dist / maxLength
+
+    # The HOC version sprint()s values with %.10f before execute()
+    values = np.round(calculate_distribution(dist_type, dist, a, b, c, d, base), 10)
+
+    i = 0
+    for sec, sec_xs in zip(secs, xs):
+        sec_values = values[i:i + len(sec_xs)]
+        sec_values[-2] = sec_values[-1]   # x=1 overrides the last segment
+        for seg, value in zip(sec, sec_values[:-1]):
+            setattr(seg, mech, value)
+        i += len(sec_xs)
@@ -0,0 +1,94 @@
+"""
+check_multisplit.py
+Check that a multisplit run reproduces the spike times of a single-rank run
+
+Runs init.py on one rank without multisplit and on NRANKS ranks with
+cfg.multisplit = True (same network, spikes only), then compares the spike
+trains cell by cell. Multisplit changes only the order of the tree matrix
+solve, so every cell must have the same number of spikes at the same times
+within TOLERANCE ms.
+
+Usage:
+    python check_multisplit.py
+    python check_multisplit.py 4            # number of ranks of the multisplit run
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+
+from columnar_io import load_spikes
+
+NRANKS = 2
+SCALE = 1                   # 100 cells
+DURATION = 500.0            # ms
+TOLERANCE = 0.05            # ms (2 time steps)
+MPIEXEC = os.environ.get('MPIEXEC', 'mpiexec')
+OUTPUT_DIR = 'output/multisplit_check'
+
+# Spikes only, no plots, no JSON; fixed-step (multisplit does not support CVode)
+BASE_OVERRIDES = [f'scale={SCALE}', f'duration={DURATION}', f'saveFolder={OUTPUT_DIR!r}',
+                  "recordingProfile='spikes-only'", 'analysis={}', 'saveJson=False',
+                  'saveColumnar=True', 'networkMetrics=False', 'cvode_active=False']
+
+
+def run(label, nranks, multisplit):
+    """Run init.py; returns (spkt, spkid) of the run, or None on failure"""
+    cmd = [MPIEXEC, '-n', str(nranks), sys.executable, 'init.py', f'simLabel={label!r}',
+           f'multisplit={multisplit}'] + BASE_OVERRIDES
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if proc.returncode != 0:
+        print(f"  ✗ {label} failed (exit {proc.returncode})")
+        print(proc.stdout[-2000:])
+        return None
+    spkt, spkid = load_spikes(os.path.join(OUTPUT_DIR, label + '_columnar'), mmap=False)
+    return np.asarray(spkt, dtype=float), np.asarray(spkid)
+
+
+def compare(reference, split):
+    """Per-cell comparison; returns (cells with a different spike count, max time difference)"""
+    mismatched = []
+    maxDiff = 0.0
+    for gid in np.union1d(reference[1], split[1]):
+        t0 = np.sort(reference[0][reference[1] == gid])
+        t1 = np.sort(split[0][split[1] == gid])
+        if len(t0) != len(t1):
+            mismatched.append(int(gid))
+        elif len(t0):
+            maxDiff = max(maxDiff, float(np.max(np.abs(t0 - t1))))
+    return mismatched, maxDiff
+
+
+def main():
+    nranks = int(sys.argv[1]) if len(sys.argv) > 1 else NRANKS
+
+    if shutil.which(MPIEXEC) is None:
+        print(f"✗ ERROR: {MPIEXEC} not found (set MPIEXEC to your launcher)")
+        sys.exit(1)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    print("="*70)
+    print(f"MULTISPLIT CHECK ({SCALE * 100} cells, {DURATION} ms, 1 rank vs {nranks} ranks)")
+    print("="*70)
+    print("  single rank...")
+    reference = run('single', 1, False)
+    print(f"  {nranks} ranks with multisplit...")
+    split = run(f'multisplit_n{nranks}', nranks, True)
+    if reference is None or split is None:
+        sys.exit(1)
+
+    mismatched, maxDiff = compare(reference, split)
+    print(f"\nSpikes: {len(reference[0])} single rank, {len(split[0])} multisplit")
+    print(f"Max spike time difference: {maxDiff:.4f} ms (tolerance {TOLERANCE} ms)")
+    if mismatched or maxDiff > TOLERANCE:
+        print(f"✗ multisplit run differs: {len(mismatched)} cells with a different spike count "
+              f"{mismatched[:10]}")
+        sys.exit(1)
+    print("✓ multisplit reproduces the single-rank spike times")
+
+
+if __name__ == '__main__':
+    main()
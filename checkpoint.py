@@ -0,0 +1,169 @@
+"""
+checkpoint.py
+Steady-state checkpoint cache for the network warm-up
+
+The network starts from v_init and needs cfg.warmupDuration ms to relax into the
+background-driven regime. The first run with a given set of dynamics parameters
+integrates the warm-up and stores a NEURON SaveState (membrane states and event
+queue) plus the Random123 stream positions of the NetStims and of the stochastic
+synapses and noise sources (ProbAMPANMDA, ProbUDFsyn, Gfluct2, via their
+rngSeq()/setRngSeq()); later runs with the same parameters restore it and
+integrate only from cfg.warmupDuration to cfg.duration.
+
+Streams that are not per-instance Random123 (a hoc Random passed to setRNG or
+noiseFromRandom, or the global exprand/normrand fallback) are not saved, so a
+restored run only continues them exactly when the model does not use them.
+
+Recorded data (spikes and traces) always starts at cfg.warmupDuration, on both
+the first and the restored runs, so results do not depend on whether the cache
+was hit.
+"""
+
+import json
+import os
+
+from neuron import h
+
+from cache_utils import cache_path, hash_params, hash_mod_files
+
+# cfg entries that change the simulated dynamics (everything in netParams does too)
+DYNAMICS_CFG_KEYS = ['dt', 'hParams', 'seeds', 'cvode_active', 'cache_efficient',
+                     'ADmodel', 'ADstage', 'ADpopulations', 'warmupDuration']
+
+
+def checkpoint_key(cfg, netParams, nhost=1):
+    """
+    Hash of everything that determines the warm-up state: the netParams (cell rules,
+    populations, gains folded into weights, background rates), the dynamics-related
+    cfg entries, the compiled mechanisms and the number of ranks.
+
+    The key does not cover random streams outside Random123 (hoc Random objects,
+    the global exprand/normrand stream): their positions are not part of the
+    checkpoint, see the module docstring.
+    """
+
+    params = {
+        'netParams': netParams.todict(),
+        'cfg': {key: getattr(cfg, key, None) for key in DYNAMICS_CFG_KEYS},
+        'mod': hash_mod_files(),
+        'nhost': nhost
+    }
+    return hash_params(params)[:16]
+
+
+def _stim_randoms(sim):
+    """(label, Random) pairs for every NetStim Random123 stream on this rank"""
+
+    randoms = []
+    for cell in sim.net.cells:
+        if getattr(cell, 'hRandom', None) is not None:
+            randoms.append((f'{cell.gid}', cell.hRandom))
+        for i, stim in enumerate(cell.stims):
+            if stim.get('hRandom') is not None:
+                randoms.append((f'{cell.gid}_{i}', stim['hRandom']))
+    return randoms
+
+
+def _mech_streams(sim):
+    """(label, point process) pairs for every mechanism with a Random123 stream (rngSeq()) on this rank"""
+
+    streams = []
+    for cell in sim.net.cells:
+        for secName, sec in cell.secs.items():
+            for i, synMech in enumerate(sec.get('synMechs', [])):
+                streams.append((f'{cell.gid}_{secName}_{synMech.get("label")}_{i}', synMech.get('hObj')))
+            for name, pointp in sec.get('pointps', {}).items():
+                streams.append((f'{cell.gid}_{secName}_{name}', pointp.get('hObj')))
+        for i, stim in enumerate(cell.stims):
+            streams.append((f'{cell.gid}_stim{i}', stim.get('hObj')))
+    return [(label, obj) for label, obj in streams if hasattr(obj, 'rngSeq')]
+
+
+def save_checkpoint(sim, path):
+    """
+    Write this rank's SaveState and Random123 stream positions. Both files go
+    to temp names first; the sidecar is moved in before the state file, so an
+    existing state file always comes with a complete sidecar.
+    """
+
+    tmpPath = f'{path}.{os.getpid()}.tmp'
+    state = h.SaveState()
+    state.save()
+    f = h.File()
+    f.wopen(tmpPath)
+    state.fwrite(f)             # closes the file
+
+    seqs = {label: rand.seq() for label, rand in _stim_randoms(sim)}
+    mechSeqs = {label: obj.rngSeq() for label, obj in _mech_streams(sim)}
+    with open(tmpPath + '.json', 'w') as f:
+        json.dump({'t': h.t, 'seq': seqs, 'mechSeq': mechSeqs}, f)
+
+    os.replace(tmpPath + '.json', path + '.json')
+    os.replace(tmpPath, path)
+
+
+def restore_checkpoint(sim, path):
+    """Restore this rank's SaveState and Random123 stream positions (after finitialize)"""
+
+    state = h.SaveState()
+    f = h.File()
+    f.ropen(path)
+    state.fread(f)
+    state.restore()
+
+    with open(path + '.json') as f:
+        data = json.load(f)
+    for label, rand in _stim_randoms(sim):
+        rand.seq(data['seq'][label])
+    for label, obj in _mech_streams(sim):
+        obj.setRngSeq(data['mechSeq'][label])
+
+
+def simulate(sim, netParams, gather=True, onRestore=None, skipPreRun=False):
+    """
+    Replacement for sim.simulate() (runSim + gatherData) that skips the warm-up
+    transient when a matching checkpoint exists. Call after sim.create().
+    With gather=False, only runs (the caller calls sim.gatherData()).
+    onRestore() is called after a checkpoint restore, which clears the event
+    queue (e.g. to reschedule CVode.event hooks). skipPreRun as in sim.runSim(),
+    for callers that already ran sim.preRun().
+    """
+
+    cfg = sim.cfg
+    key = checkpoint_key(cfg, netParams, nhost=sim.nhost)
+    path = cache_path(os.path.join('checkpoints', key), f'rank{sim.rank}.dat')
+
+    # Only restore if every rank has its part of the checkpoint (state file written last)
+    found = int(sim.pc.allreduce(int(os.path.exists(path)), 3))
+
+    sim.pc.barrier()
+    sim.timing('start', 'runTime')
+    if not skipPreRun:
+        sim.preRun()
+    h.finitialize(float(cfg.hParams['v_init']))
+
+    if found:
+        if sim.rank == 0:
+            print(f"\nRestoring warm-up checkpoint {key} (t = {cfg.warmupDuration} ms)")
+        restore_checkpoint(sim, path)
+        if onRestore:
+            onRestore()
+    else:
+        if sim.rank == 0:
+            print(f"\nNo warm-up checkpoint found, integrating {cfg.warmupDuration} ms warm-up...")
+        sim.pc.psolve(cfg.warmupDuration)
+        save_checkpoint(sim, path)
+        if sim.rank == 0:
+            print(f"Saved warm-up checkpoint {key}")
+
+    # Restart recording at the warm-up time in both cases
+    sim.simData['spkt'].resize(0)
+    sim.simData['spkid'].resize(0)
+    h.frecord_init()
+
+    sim.pc.psolve(cfg.duration)
+    sim.pc.barrier()
+    sim.timing('stop', 'runTime')
+
+    if gather:
+        sim.gatherData()
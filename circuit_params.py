@@ -0,0 +1,124 @@
+"""
+circuit_params.py
+Cached loader for the connectivity matrices in Circuit_param.xls
+
+Parsing the .xls through pandas/xlrd is slow, so the seven sheets are converted
+once into a compact .npz file under .cache/circuit_params/, keyed by the SHA-256
+of the .xls contents. Later loads read the .npz directly (no pandas import) and
+return ParamMatrix objects that support the DataFrame-style `.at[pre, post]`
+lookups used in netParams.py.
+"""
+
+import os
+
+import numpy as np
+
+from cache_utils import cache_path, hash_files
+
+SHEETS = ['conn_probs', 'syn_cond', 'n_cont', 'Depression', 'Facilitation', 'Use', 'Syn_pos']
+
+
+class ParamMatrix:
+    """Labelled 2D matrix (pre x post) with DataFrame-like `.at[row, col]` access"""
+
+    def __init__(self, values, index, columns):
+        self.values = np.asarray(values)
+        self.index = [str(label) for label in index]
+        self.columns = [str(label) for label in columns]
+        self._row = {label: i for i, label in enumerate(self.index)}
+        self._col = {label: j for j, label in enumerate(self.columns)}
+        self.at = _AtIndexer(self)
+
+    @classmethod
+    def full(cls, value, index, columns):
+        """Matrix with every entry set to `value` (like pd.DataFrame(value, index, columns))"""
+        return cls(np.full((len(index), len(columns)), value), index, columns)
+
+    def __getitem__(self, key):
+        row, col = key
+        value = self.values[self._row[row], self._col[col]]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def __repr__(self):
+        width = max(len(label) for label in self.index + self.columns + ['']) + 2
+        lines = [' ' * width + ''.join(f'{col:>{width}}' for col in self.columns)]
+        for i, row in enumerate(self.index):
+            lines.append(f'{row:<{width}}' + ''.join(f'{str(v):>{width}}' for v in self.values[i]))
+        return '\n'.join(lines)
+
+
+class _AtIndexer:
+    """Implements matrix.at[row, col]"""
+
+    def __init__(self, matrix):
+        self._matrix = matrix
+
+    def __getitem__(self, key):
+        return self._matrix[key]
+
+
+def _parse_xls(xls_path):
+    """Read the circuit sheets with pandas; returns {sheet: ParamMatrix}"""
+
+    import pandas as pd
+
+    sheets = pd.read_excel(xls_path, sheet_name=None, index_col=0)
+    params = {}
+    for name in SHEETS:
+        if name not in sheets:
+            continue
+        df = sheets[name]
+        try:
+            values = df.to_numpy(dtype=float)
+        except (TypeError, ValueError):
+            values = df.to_numpy().astype(str)
+        params[name] = ParamMatrix(values, df.index, df.columns)
+    return params
+
+
+def _save_npz(params, path):
+    """Write {sheet: ParamMatrix} to .npz atomically (safe with concurrent workers)"""
+
+    arrays = {}
+    for name, matrix in params.items():
+        arrays[name + '__values'] = matrix.values
+        arrays[name + '__index'] = np.array(matrix.index)
+        arrays[name + '__columns'] = np.array(matrix.columns)
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def _load_npz(path):
+    """Read {sheet: ParamMatrix} back from .npz"""
+
+    params = {}
+    with np.load(path, allow_pickle=False) as data:
+        for name in SHEETS:
+            if name + '__values' in data:
+                params[name] = ParamMatrix(data[name + '__values'],
+                                           data[name + '__index'],
+                                           data[name + '__columns'])
+    return params
+
+
+def load_circuit_params(xls_path='Circuit_param.xls'):
+    """
+    Load the circuit parameter sheets, using the .npz cache when it matches
+    the current contents of the .xls file.
+
+    Returns:
+        dict: {sheet name: ParamMatrix}
+    """
+
+    key = hash_files([xls_path])[:16]
+    path = cache_path('circuit_params', f'circuit_params_{key}.npz')
+
+    if os.path.exists(path):
+        return _load_npz(path)
+
+    params = _parse_xls(xls_path)
+    _save_npz(params, path)
+    return params
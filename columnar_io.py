@@ -0,0 +1,202 @@
+"""
+columnar_io.py
+Columnar binary output for spikes, traces and connectivity
+
+Instead of one large JSON file, a run is saved as a folder of .npy arrays
+(float32/int32) grouped by kind, plus a small meta.json:
+
+    output/<simLabel>_columnar/
+        meta.json                   run index (see run_index), dt/recordStep, trace and synMech names,
+                                    time base of recording.py traces (traceTimes)
+        spikes/spkt.npy             float32 spike times (ms), sorted by time
+        spikes/spkid.npy            int32 spike gids
+        traces/<name>.npy           float32 [nRecordedCells, nSteps]
+        traces/<name>_gids.npy      int32 gid of each row
+        conns/pre.npy, post.npy     int32 (pre = -1 for NetStim inputs; only with cfg.saveCellConns)
+        conns/weight.npy, delay.npy float32
+        conns/synMech.npy           int16 index into meta['synMechs']
+
+Plain .npy files (rather than a compressed .npz archive) can be memory-mapped,
+so reading only the spikes of a 10k-cell run costs milliseconds.
+
+For the JSON output, save_index() writes the same run index (population gid
+ranges, analysis window) as a small <simLabel>_index.json sidecar.
+
+Usage:
+    save_columnar(sim, netParams)                   # rank 0, after sim.gatherData/analyze
+    save_index(cfg, netParams)
+    spkt, spkid = load_spikes('output/Yao_L23_100cell_columnar')
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def columnar_path(cfg):
+    """Output folder of the columnar data for cfg"""
+    return os.path.join(cfg.saveFolder, cfg.simLabel + '_columnar')
+
+
+def is_columnar(path):
+    """True if path is a columnar output folder"""
+    return os.path.isfile(os.path.join(path, 'meta.json'))
+
+
+def index_path(cfg):
+    """Sidecar index written next to the NetPyNE output files"""
+    return os.path.join(cfg.saveFolder, cfg.simLabel + '_index.json')
+
+
+def run_index(cfg, netParams):
+    """
+    Small description of a run needed to analyze its spikes: population gid
+    ranges (NetPyNE assigns consecutive gids per population in popParams
+    order) and the analysis window
+    """
+    pops = []
+    start = 0
+    for pop, popParams in netParams.popParams.items():
+        stop = start + int(netParams.scale * popParams['numCells'])
+        pops.append({'name': pop, 'start': start, 'stop': stop})
+        start = stop
+
+    warmup = cfg.warmupDuration if getattr(cfg, 'useCheckpoint', False) else 0.0
+    return {
+        'simLabel': cfg.simLabel,
+        'duration': cfg.duration,
+        'analysisWindow': [warmup, cfg.duration],
+        'numCells': start,
+        'pops': pops,
+    }
+
+
+def save_index(cfg, netParams, path=None):
+    """Write the run index sidecar (rank 0)"""
+    path = path or index_path(cfg)
+    with open(path, 'w') as f:
+        json.dump(run_index(cfg, netParams), f, indent=2)
+    return path
+
+
+def _save(folder, group, name, array):
+    os.makedirs(os.path.join(folder, group), exist_ok=True)
+    np.save(os.path.join(folder, group, name + '.npy'), array)
+
+
+def _trace_arrays(traceData):
+    """{'cell_<gid>': values} -> (gids int32, float32 [nCells, nSteps])"""
+    keys = sorted(traceData, key=lambda key: int(key.split('_')[-1]))
+    gids = np.array([int(key.split('_')[-1]) for key in keys], dtype=np.int32)
+    values = np.array([np.asarray(traceData[key], dtype=np.float32) for key in keys], dtype=np.float32)
+    return gids, values
+
+
+def _conn_arrays(allCells, synMechs):
+    """Connectivity columns from NetPyNE allCells (dict conn format)"""
+    pre, post, weight, delay, mech = [], [], [], [], []
+    for cell in allCells:
+        for conn in cell.get('conns', []):
+            if not isinstance(conn, dict):
+                continue    # compactConnFormat lists are not supported
+            preGid = conn.get('preGid')
+            pre.append(preGid if isinstance(preGid, int) else -1)
+            post.append(cell['gid'])
+            weight.append(conn.get('weight', 0.0))
+            delay.append(conn.get('delay', 0.0))
+            label = conn.get('synMech')
+            if label not in synMechs:
+                synMechs.append(label)
+            mech.append(synMechs.index(label))
+    return {
+        'pre': np.array(pre, dtype=np.int32),
+        'post': np.array(post, dtype=np.int32),
+        'weight': np.array(weight, dtype=np.float32),
+        'delay': np.array(delay, dtype=np.float32),
+        'synMech': np.array(mech, dtype=np.int16),
+    }
+
+
+def save_columnar(sim, netParams, path=None):
+    """Write gathered spikes, traces and connectivity of sim as columnar arrays (rank 0)"""
+    cfg = sim.cfg
+    path = path or columnar_path(cfg)
+    tmpPath = f'{path}.{os.getpid()}.tmp'
+    if os.path.exists(tmpPath):
+        shutil.rmtree(tmpPath)
+    os.makedirs(tmpPath)
+
+    simData = sim.allSimData
+    spkt = np.asarray(simData.get('spkt', []), dtype=np.float32)
+    spkid = np.asarray(simData.get('spkid', []), dtype=np.int32)
+    order = np.argsort(spkt, kind='stable')
+    _save(tmpPath, 'spikes', 'spkt', spkt[order])
+    _save(tmpPath, 'spikes', 'spkid', spkid[order])
+
+    # NetPyNE traces and the decimated/envelope traces of recording.py
+    traces = []
+    for name in list(cfg.recordTraces) + list(simData.get('recordingTimes', {})):
+        if name in simData and len(simData[name]):
+            gids, values = _trace_arrays(simData[name])
+            _save(tmpPath, 'traces', name, values)
+            _save(tmpPath, 'traces', name + '_gids', gids)
+            traces.append(name)
+
+    synMechs = []
+    if cfg.saveCellConns and getattr(sim.net, 'allCells', None):
+        for name, array in _conn_arrays(sim.net.allCells, synMechs).items():
+            _save(tmpPath, 'conns', name, array)
+
+    meta = {'format': 'columnar', 'version': FORMAT_VERSION}
+    meta.update(run_index(cfg, netParams))
+    meta.update({
+        'dt': cfg.dt,
+        'recordStep': cfg.recordStep,
+        'traces': traces,
+        'traceTimes': dict(simData.get('recordingTimes', {})),
+        'synMechs': synMechs,
+    })
+    with open(os.path.join(tmpPath, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmpPath, path)
+    print(f"✓ Saved columnar data to {path}/")
+    return path
+
+
+def load_meta(path):
+    """Run metadata of a columnar output folder"""
+    with open(os.path.join(path, 'meta.json')) as f:
+        return json.load(f)
+
+
+def load_spikes(path, mmap=True):
+    """(spkt, spkid) arrays, memory-mapped by default"""
+    mode = 'r' if mmap else None
+    spkt = np.load(os.path.join(path, 'spikes', 'spkt.npy'), mmap_mode=mode)
+    spkid = np.load(os.path.join(path, 'spikes', 'spkid.npy'), mmap_mode=mode)
+    return spkt, spkid
+
+
+def load_traces(path, name, mmap=True):
+    """(gids, values [nCells, nSteps]) of one recorded trace"""
+    mode = 'r' if mmap else None
+    gids = np.load(os.path.join(path, 'traces', name + '_gids.npy'))
+    values = np.load(os.path.join(path, 'traces', name + '.npy'), mmap_mode=mode)
+    return gids, values
+
+
+def load_conns(path, mmap=True):
+    """Connectivity columns: {'pre', 'post', 'weight', 'delay', 'synMech'}"""
+    mode = 'r' if mmap else None
+    folder = os.path.join(path, 'conns')
+    if not os.path.isdir(folder):
+        return {}
+    return {name[:-4]: np.load(os.path.join(folder, name), mmap_mode=mode)
+            for name in sorted(os.listdir(folder)) if name.endswith('.npy')}
@@ -0,0 +1,197 @@
+"""
+coreneuron_support.py
+CoreNEURON execution path for the Yao L2/3 microcircuit, with automatic
+fallback to plain NEURON
+
+CoreNEURON (CPU only here) runs the network built by NetPyNE/NEURON after an
+in-memory or on-disk (coredat) transfer. It needs:
+    - mechanisms compiled with CoreNEURON support: nrnivmodl -coreneuron mod/
+    - mods without NEURON-only constructs (plain POINTERs, hoc Random objects,
+      scop random functions) outside #ifndef CORENEURON_BUILD guards
+    - fixed-step integration and cache-efficient memory layout
+
+The HOC cell templates are not a problem: cells are instantiated in NEURON and
+only the resulting model is transferred.
+
+configure(cfg) checks all of this before the run. If anything blocks the fast
+path, cfg.coreneuron is switched off and the reasons are stored in
+cfg.coreneuronStatus (saved with the simConfig in the output file).
+
+Usage (from init.py, with cfg.coreneuron = True):
+    import coreneuron_support
+    coreneuron_support.configure(cfg)
+    ...
+    sim.preRun()
+    coreneuron_support.export_coredat(sim, cfg.coredatFolder)   # optional
+    sim.runSim(skipPreRun=True)
+"""
+
+import glob
+import os
+import re
+
+from neuron import h
+
+MOD_DIR = 'mod'
+MECH_DIR = 'x86_64'
+
+# NMODL random functions backed by the global hoc generator (not available in CoreNEURON)
+NMODL_RANDOM_CALLS = re.compile(r'\b(normrand|exprand|unirand|scop_random|set_seed)\s*\(')
+
+# C APIs in VERBATIM blocks that only exist in NEURON
+NEURON_ONLY_API = re.compile(r'\b(nrn_random_pick|nrn_random_arg|vector_arg|hoc_obj_\w+|nrn_threads)\b')
+
+
+def _strip_comments(text):
+    """Remove COMMENT ... ENDCOMMENT blocks and ':' line comments outside VERBATIM"""
+    text = re.sub(r'^\s*COMMENT\b.*?^\s*ENDCOMMENT\b', lambda m: '\n' * m.group(0).count('\n'),
+                  text, flags=re.S | re.M)
+    lines = []
+    in_verbatim = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped == 'VERBATIM':
+            in_verbatim = True
+        elif stripped == 'ENDVERBATIM':
+            in_verbatim = False
+        elif not in_verbatim:
+            line = line.split(':', 1)[0]
+        lines.append(line)
+    return lines
+
+
+def scan_mod_file(path):
+    """
+    Return the list of CoreNEURON blockers found in one mod file
+
+    VERBATIM code inside #ifndef CORENEURON_BUILD (or the #else branch of
+    #ifdef CORENEURON_BUILD) is NEURON-only and is not reported.
+    """
+    with open(path) as f:
+        lines = _strip_comments(f.read())
+
+    blockers = []
+    in_verbatim = False
+    guards = []     # preprocessor stack: True = NEURON-only, False = CoreNEURON-only, None = other
+
+    for lineno, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if stripped == 'VERBATIM':
+            in_verbatim = True
+            continue
+        if stripped == 'ENDVERBATIM':
+            in_verbatim = False
+            continue
+
+        if in_verbatim:
+            if stripped.startswith('#ifndef CORENEURON_BUILD'):
+                guards.append(True)
+            elif stripped.startswith('#ifdef CORENEURON_BUILD'):
+                guards.append(False)
+            elif stripped.startswith('#if'):
+                guards.append(None)
+            elif stripped.startswith('#else') and guards:
+                if guards[-1] is not None:
+                    guards[-1] = not guards[-1]
+            elif stripped.startswith('#endif') and guards:
+                guards.pop()
+            elif True not in guards:
+                match = NEURON_ONLY_API.search(line)
+                if match:
+                    blockers.append(f"line {lineno}: {match.group(1)} in VERBATIM (NEURON-only API)")
+        else:
+            if re.match(r'^\s*POINTER\b', line):
+                blockers.append(f"line {lineno}: POINTER variable (use BBCOREPOINTER)")
+            match = NMODL_RANDOM_CALLS.search(line)
+            if match:
+                blockers.append(f"line {lineno}: {match.group(1)}() uses the global hoc random generator")
+
+    return blockers
+
+
+def check_mods(mod_dir=MOD_DIR):
+    """Scan every mod file; return {mod name: [blockers]} for the incompatible ones"""
+    results = {}
+    for path in sorted(glob.glob(os.path.join(mod_dir, '*.mod'))):
+        blockers = scan_mod_file(path)
+        if blockers:
+            results[os.path.basename(path)] = blockers
+    return results
+
+
+def check_runtime(cfg, mech_dir=MECH_DIR):
+    """Return the list of configuration/build features that block a CoreNEURON run"""
+    blockers = []
+
+    try:
+        from neuron import coreneuron  # noqa: F401
+    except ImportError:
+        blockers.append("this NEURON build has no CoreNEURON support (neuron.coreneuron not importable)")
+
+    if not glob.glob(os.path.join(mech_dir, '*corenrnmech*')):
+        blockers.append(f"mechanisms not compiled for CoreNEURON (run: nrnivmodl -coreneuron {MOD_DIR}/)")
+
+    if cfg.cvode_active:
+        blockers.append("cfg.cvode_active: CoreNEURON supports fixed-step integration only")
+
+    if getattr(cfg, 'useCheckpoint', False):
+        blockers.append("cfg.useCheckpoint: SaveState checkpoints are NEURON-only")
+
+    if getattr(cfg, 'multisplit', False):
+        blockers.append("cfg.multisplit: multisplit cells are NEURON-only")
+
+    if getattr(cfg, 'recordLFP', None) or getattr(cfg, 'recordDipole', None):
+        blockers.append("cfg.recordLFP/recordDipole: per-step Python LFP callbacks are NEURON-only")
+
+    return blockers
+
+
+def configure(cfg, mod_dir=MOD_DIR, mech_dir=MECH_DIR, log=print):
+    """
+    Enable the CoreNEURON path if possible, otherwise fall back to NEURON
+
+    Sets cfg.coreneuronStatus = {'enabled': bool, 'blockers': [...]} and
+    returns True when the simulation will run on CoreNEURON (CPU).
+    """
+    blockers = check_runtime(cfg, mech_dir)
+    for mod_name, reasons in check_mods(mod_dir).items():
+        blockers.extend(f"{mod_name} {reason}" for reason in reasons)
+
+    if blockers:
+        cfg.coreneuron = False
+        log("⚠ CoreNEURON disabled, falling back to NEURON:")
+        for reason in blockers:
+            log(f"   - {reason}")
+    else:
+        cfg.gpu = False                 # CPU only
+        cfg.cache_efficient = True      # required for the CoreNEURON data transfer
+        cfg.random123 = True            # NetStim streams that CoreNEURON can reproduce
+        if cfg.printRunTime:
+            # printRunTime schedules a Python callback through cvode.event, which CoreNEURON cannot call
+            cfg.printRunTime = False
+        log("✓ CoreNEURON enabled (CPU)")
+
+    cfg.coreneuronStatus = {'enabled': not blockers, 'blockers': blockers}
+    return not blockers
+
+
+def export_coredat(sim, path):
+    """
+    Write the instantiated model to a CoreNEURON data directory (one set of
+    files per rank), e.g. for running special-core directly:
+        x86_64/special-core -d <path> --tstop <duration> --mpi
+    Call after sim.preRun(): the written model must already have NetPyNE's dt,
+    h globals and NetStim Random123 streams.
+    """
+    if sim.rank == 0:
+        os.makedirs(path, exist_ok=True)
+    sim.pc.barrier()
+
+    h.cvode.cache_efficient(1)
+    sim.pc.set_maxstep(10)
+    h.finitialize(float(sim.cfg.hParams['v_init']))
+    sim.pc.nrnbbcore_write(path)
+    sim.pc.barrier()
+
+    if sim.rank == 0:
+        print(f"✓ Exported CoreNEURON model to {path}/")
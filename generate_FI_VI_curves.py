@@ -4,9 +4,12 @@ Systematically inject current steps and measure firing rate and voltage response
 """
 
 from netpyne import specs, sim
+from neuron import h
 import numpy as np
 import matplotlib.pyplot as plt
 import json
+import multiprocessing
+import os
 from datetime import datetime
 
 # Current injection parameters
@@ -17,15 +20,59 @@ I_DUR = 1000     # ms
 I_START = 500    # ms
 SIM_DUR = 2000   # ms
 
-def run_single_FI_point(current_amp, ad_model=False, ad_stage=None):
-    """Run a single simulation with given current injection"""
+# Stop integrating at the end of the measurement window (I_START + I_DUR) instead of
+# SIM_DUR. Off by default: when on, the saved time/voltage traces end at
+# I_START + I_DUR (1500 ms) instead of SIM_DUR (2000 ms).
+EARLY_STOP = False
+
+# In 'reuse'/adaptive runs, integrate the unstimulated cell to I_START once and
+# restart every amplitude from that SaveState. The state is stored in
+# .cache/FI_rest_state (see FI_rest_state()), so later runs and workers skip it too.
+REUSE_REST_STATE = True
+
+# Sweep engine: 'rebuild' = new NetPyNE sim per current step,
+#               'reuse'   = build the cell once per condition, only change IClamp.amp
+#               'batch'   = one unconnected cell per current, all run in one sim.runSim()
+SWEEP_MODE = 'reuse'
+
+# Current sampling: 'grid' = fixed I_MIN:I_STEP:I_MAX grid, 'adaptive' = see adaptive_FI_curve()
+SAMPLING = 'grid'
+RHEOBASE_TOL = 0.002      # nA, bisection resolution of rheobase
+ADAPTIVE_STEP = 0.1       # nA, coarse step above rheobase
+MIN_SPACING = 0.01        # nA, smallest interval the refinement will split
+SLOPE_CHANGE_TOL = 5.0    # Hz, split intervals whose F-I slope change exceeds this
+SATURATION_TOL = 2.0      # Hz, increments below this count as saturated
+SATURATION_STEPS = 2      # consecutive saturated increments before the scan stops
+
+# Parallel sweep: number of worker processes (1 = run sequentially in this process;
+# e.g. os.cpu_count() to run the conditions/currents on all cores)
+N_WORKERS = 1
+
+# Resumable sweeps (see job_scheduler.py): every chunk of JOB_CHUNK currents is a job in
+# JOB_DB, so an interrupted run only recomputes the chunks that had not finished.
+# JOB_RETRY_FAILED gives jobs that failed in an earlier run another set of attempts.
+USE_JOB_SCHEDULER = False
+JOB_DB = 'output/FI_VI_jobs.sqlite'
+JOB_CHUNK = 3
+JOB_LIMITS = {'timeout': 3600}
+JOB_RETRY_FAILED = False
+
+# Conditions: (name, ad_model, ad_stage, file tag, description)
+CONDITIONS = [
+    ('Healthy', False, None, 'Healthy', 'Healthy Baseline'),
+    ('AD Stage 1', True, 1, 'AD_Stage1', 'AD Stage 1 (Early Hyperexcitability)'),
+    ('AD Stage 2', True, 2, 'AD_Stage2', 'AD Stage 2 (Intermediate Transition)'),
+    ('AD Stage 3', True, 3, 'AD_Stage3', 'AD Stage 3 (Late Hypoexcitability)'),
+]
+
+def build_FI_cfg(ad_model=False, ad_stage=None, n_cells=1):
+    """Create the SimConfig used by every F-I run (n_cells > 1 for batched runs)"""
 
-    # Create new config
     cfg = specs.SimConfig()
-    cfg.duration = SIM_DUR
+    cfg.duration = I_START + I_DUR if EARLY_STOP else SIM_DUR
     cfg.dt = 0.025
     cfg.verbose = False
-    cfg.recordCells = [0]  # Record from cell 0
+    cfg.recordCells = list(range(n_cells))  # Record from every cell (cell 0 in single-cell runs)
     cfg.recordTraces = {'V_soma': {'sec': 'soma_0', 'loc': 0.5, 'var': 'v'}}
     cfg.recordStep = 0.1
     cfg.hParams = {'celsius': 34, 'v_init': -80}
@@ -39,13 +86,25 @@ def run_single_FI_point(current_amp, ad_model=False, ad_stage=None):
     cfg.ADstage = ad_stage if ad_stage else 1
     cfg.ADpopulations = ['HL23PYR']
 
-    # Create network params
+    return cfg
+
+
+def build_FI_netParams(current_amp, ad_model=False, ad_stage=None):
+    """
+    Create the HL23PYR netParams with a somatic IClamp.
+
+    `current_amp` may be a single amplitude (one cell) or a sequence of
+    amplitudes, in which case one unconnected cell is created per amplitude,
+    each with its own IClamp targeted through 'cellList'.
+    """
+
+    current_amps = np.atleast_1d(current_amp)
     netParams = specs.NetParams()
 
-    # Single cell population
+    # One unconnected cell per current amplitude
     netParams.popParams['HL23PYR'] = {
         'cellType': 'HL23PYR',
-        'numCells': 1,
+        'numCells': len(current_amps),
         'cellModel': 'HH_full'
     }
 
@@ -65,43 +124,48 @@ def run_single_FI_point(current_amp, ad_model=False, ad_stage=None):
         cellArgs=cellArgs
     )
 
-    # Current clamp
-    netParams.stimSourceParams['IClamp1'] = {
-        'type': 'IClamp',
-        'delay': I_START,
-        'dur': I_DUR,
-        'amp': current_amp
-    }
+    # Current clamps (one per cell)
+    for i, amp in enumerate(current_amps):
+        label = f'IClamp{i+1}'
+        netParams.stimSourceParams[label] = {
+            'type': 'IClamp',
+            'delay': I_START,
+            'dur': I_DUR,
+            'amp': float(amp)
+        }
 
-    netParams.stimTargetParams['IClamp1->HL23PYR'] = {
-        'source': 'IClamp1',
-        'conds': {'pop': 'HL23PYR'},
-        'sec': 'soma_0',
-        'loc': 0.5
-    }
+        netParams.stimTargetParams[label + '->HL23PYR'] = {
+            'source': label,
+            'conds': {'pop': 'HL23PYR', 'cellList': [i]},
+            'sec': 'soma_0',
+            'loc': 0.5
+        }
+
+    return netParams
+
+
+def create_FI_sim(current_amp, ad_model=False, ad_stage=None):
+    """Instantiate the F-I model in NEURON (no run); returns its cfg"""
+
+    cfg = build_FI_cfg(ad_model=ad_model, ad_stage=ad_stage, n_cells=np.size(current_amp))
+    netParams = build_FI_netParams(current_amp, ad_model=ad_model, ad_stage=ad_stage)
 
-    # Create and run simulation
     sim.initialize(netParams, cfg)
     sim.net.createPops()
     sim.net.createCells()
     sim.net.connectCells()
     sim.net.addStims()
     sim.setupRecording()
-    sim.runSim()
 
-    # Extract results
-    spkt = np.array(sim.simData['spkt']) if 'spkt' in sim.simData else np.array([])
+    return cfg
 
-    # Get voltage trace
-    if 'V_soma' in sim.simData:
-        if isinstance(sim.simData['V_soma'], dict) and 'cell_0' in sim.simData['V_soma']:
-            V_soma = np.array(sim.simData['V_soma']['cell_0'])
-        else:
-            V_soma = np.array(list(sim.simData['V_soma'].values())[0])
-    else:
-        V_soma = np.array([])
 
-    t = np.arange(0, len(V_soma)) * cfg.recordStep
+def measure_FI_point(spkt, V_soma, recordStep):
+    """Firing rate, mean voltage and traces of one current step from its spikes and soma trace"""
+
+    spkt = np.asarray(spkt)
+    V_soma = np.asarray(V_soma)
+    t = np.arange(0, len(V_soma)) * recordStep
 
     # Calculate firing rate during injection
     injection_spikes = spkt[(spkt >= I_START) & (spkt < I_START + I_DUR)]
@@ -109,13 +173,40 @@ def run_single_FI_point(current_amp, ad_model=False, ad_stage=None):
 
     # Calculate mean voltage during injection (after 100ms settling)
     settle_time = I_START + 100  # ms
-    settle_idx = int(settle_time / cfg.recordStep)
-    end_idx = int((I_START + I_DUR) / cfg.recordStep)
+    settle_idx = int(settle_time / recordStep)
+    end_idx = int((I_START + I_DUR) / recordStep)
     mean_voltage = np.mean(V_soma[settle_idx:end_idx])
 
-    # Get voltage trace
-    voltage_trace = V_soma
-    time_trace = t
+    return firing_rate, mean_voltage, V_soma, t
+
+
+def _recorded_FI_data(gid=0):
+    """Spike times and soma voltage of one cell from the current (ungathered) sim.simData"""
+
+    spkt = np.array(sim.simData['spkt']) if 'spkt' in sim.simData else np.array([])
+    if len(spkt) > 0:
+        spkt = spkt[np.array(sim.simData['spkid']) == gid]
+
+    if 'V_soma' in sim.simData:
+        if f'cell_{gid}' not in sim.simData['V_soma']:
+            raise KeyError(f"No V_soma trace recorded for cell_{gid}")
+        V_soma = np.array(sim.simData['V_soma'][f'cell_{gid}'])
+    else:
+        V_soma = np.array([])
+
+    return spkt, V_soma
+
+
+def run_single_FI_point(current_amp, ad_model=False, ad_stage=None):
+    """Run a single simulation with given current injection"""
+
+    # Create and run simulation
+    cfg = create_FI_sim(current_amp, ad_model=ad_model, ad_stage=ad_stage)
+    sim.runSim()
+
+    # Extract results
+    spkt, V_soma = _recorded_FI_data()
+    firing_rate, mean_voltage, voltage_trace, time_trace = measure_FI_point(spkt, V_soma, cfg.recordStep)
 
     # Clean up
     sim.clearAll()
@@ -123,38 +214,205 @@ def run_single_FI_point(current_amp, ad_model=False, ad_stage=None):
     return firing_rate, mean_voltage, voltage_trace, time_trace
 
 
-def generate_FI_VI_curves(condition_name, ad_model=False, ad_stage=None):
-    """Generate complete F-I and V-I curves for a condition"""
+def FI_rest_state_key(cfg):
+    """Hash of everything the pre-stimulus state depends on"""
+
+    from glob import glob
+    from cache_utils import CELL_SOURCES, hash_files, hash_mod_files, hash_params
+
+    inputs = [__file__] + CELL_SOURCES + sorted(glob('models/*.hoc')) + sorted(glob('morphologies/*'))
+    return hash_params({
+        'cfg': cfg.__dict__,
+        'I_START': I_START,
+        'inputs': hash_files(inputs),
+        'mod': hash_mod_files(),
+    })[:16]
+
+
+def FI_rest_state(cfg):
+    """
+    State of the unstimulated cell at I_START, integrated once and stored on disk.
+
+    The IClamp only switches on at I_START, so the pre-stimulus period is the
+    same for every amplitude. The state (SaveState, the soma trace and spikes
+    up to I_START) is written to .cache/FI_rest_state/<key>.* and read back by
+    later runs and pool workers with the same cell, cfg and mechanisms. The
+    returned dict also holds a per-time-step soma recorder used after restore.
+    """
+
+    from cache_utils import cache_path
+
+    # Dt-based Vector.record relies on events scheduled at finitialize(), which
+    # do not survive a restore; record every step instead and decimate
+    soma = sim.net.cells[0].secs['soma_0']['hObj']
+    v_step = h.Vector()
+    v_step.record(soma(0.5)._ref_v)
+
+    path = cache_path('FI_rest_state', FI_rest_state_key(cfg))
+    state = h.SaveState()
+    h.finitialize(float(cfg.hParams['v_init']))
+
+    if os.path.exists(path + '.npz'):
+        f = h.File()
+        f.ropen(path + '.dat')
+        state.fread(f)
+        f.close()
+        data = np.load(path + '.npz')
+        return {'state': state, 'spkt': data['spkt'], 'V_rest': data['V_rest'], 'v_step': v_step}
+
+    sim.simData['spkt'].resize(0)
+    sim.simData['spkid'].resize(0)
+    sim.pc.psolve(I_START)
+
+    step = int(round(cfg.recordStep / cfg.dt))
+    V_rest = np.array(v_step)[::step]
+    spkt, _ = _recorded_FI_data()
+    state.save()
+
+    # Written to temporary names and renamed, since pool workers may store the same entry
+    tmp = f'{path}.{os.getpid()}.tmp'
+    f = h.File()
+    f.wopen(tmp + '.dat')
+    state.fwrite(f)
+    f.close()
+    os.replace(tmp + '.dat', path + '.dat')
+    with open(tmp + '.npz', 'wb') as f:
+        np.savez(f, spkt=spkt, V_rest=V_rest)
+    os.replace(tmp + '.npz', path + '.npz')     # renamed last: marks the entry complete
+
+    return {'state': state, 'spkt': spkt, 'V_rest': V_rest, 'v_step': v_step}
+
+
+def run_FI_amplitude(current_amp, cfg, rest_state=None):
+    """
+    Re-run the already instantiated cell with a new IClamp amplitude.
+
+    Only the clamp amplitude changes; the model is reinitialized with
+    finitialize() and integrated again, so the cost is the integration time.
+    With a rest_state from FI_rest_state() the run starts from the saved
+    state at I_START instead of re-simulating the pre-stimulus period.
+    """
+
+    # Spike vectors from pc.spike_record are not cleared by finitialize()
+    sim.simData['spkt'].resize(0)
+    sim.simData['spkid'].resize(0)
+
+    h.finitialize(float(cfg.hParams['v_init']))
+    if rest_state is not None:
+        rest_state['state'].restore()
+
+    for cell in sim.net.cells:
+        for stim in cell.stims:
+            if stim.get('type') == 'IClamp':
+                stim['hObj'].amp = current_amp
+
+    sim.pc.psolve(cfg.duration)
+
+    spkt, V_soma = _recorded_FI_data()
+    if rest_state is not None:
+        # v_step holds v at finitialize, then one sample per dt from I_START on
+        step = int(round(cfg.recordStep / cfg.dt))
+        V_stim = np.array(rest_state['v_step'])[1:][step-1::step]
+        V_soma = np.concatenate([rest_state['V_rest'], V_stim])
+        spkt = np.concatenate([rest_state['spkt'], spkt])
+
+    return measure_FI_point(spkt, V_soma, cfg.recordStep)
+
+
+def run_FI_batch(currents, ad_model=False, ad_stage=None):
+    """
+    Run all currents in one NEURON run, one unconnected HL23PYR copy per current.
+
+    The per-gid spikes and soma traces are split back into one
+    (f_rate, v_mean, v_trace, t_trace) point per current.
+    """
+
+    cfg = create_FI_sim(currents, ad_model=ad_model, ad_stage=ad_stage)
+    sim.runSim()
 
-    print(f"\n{'='*70}")
-    print(f"Generating F-I and V-I curves for: {condition_name}")
-    print(f"{'='*70}")
+    # cellList index i -> gid of the cell that received currents[i]
+    cellGids = sim.net.pops['HL23PYR'].cellGids
+    points = []
+    for gid in cellGids:
+        spkt, V_soma = _recorded_FI_data(gid)
+        points.append(measure_FI_point(spkt, V_soma, cfg.recordStep))
 
-    currents = np.arange(I_MIN, I_MAX + I_STEP, I_STEP)
-    firing_rates = []
-    mean_voltages = []
-    voltage_traces = []
+    sim.clearAll()
+
+    return points
+
+
+def run_FI_sweep(currents, ad_model=False, ad_stage=None, mode=None, verbose=True):
+    """
+    Run every current in `currents` for one condition.
+
+    Args:
+        currents (array): Current amplitudes (nA)
+        ad_model (bool): Use AD biophysics
+        ad_stage (int): AD stage
+        mode (str): 'rebuild' (new sim per point), 'reuse' (build the cell
+            once, only change IClamp.amp between runs) or 'batch' (one cell
+            copy per current, all integrated in one run); defaults to SWEEP_MODE
+        verbose (bool): Print one line per point
+
+    Returns:
+        list: (f_rate, v_mean, v_trace, t_trace) per current
+    """
+
+    mode = mode or SWEEP_MODE
+
+    if mode == 'batch':
+        if verbose:
+            print(f"Running {len(currents)} currents as one batched run...")
+        points = run_FI_batch(currents, ad_model=ad_model, ad_stage=ad_stage)
+        if verbose:
+            for current, point in zip(currents, points):
+                print(f"  I = {current:.3f} nA: F = {point[0]:.1f} Hz, V = {point[1]:.1f} mV")
+        return points
+
+    points = []
+
+    if mode == 'reuse':
+        cfg = create_FI_sim(currents[0], ad_model=ad_model, ad_stage=ad_stage)
+        sim.preRun()
+        rest_state = FI_rest_state(cfg) if REUSE_REST_STATE else None
 
     for i, current in enumerate(currents):
-        print(f"[{i+1}/{len(currents)}] Running I = {current:.3f} nA...", end=' ')
+        if verbose:
+            print(f"[{i+1}/{len(currents)}] Running I = {current:.3f} nA...", end=' ')
+
+        if mode == 'reuse':
+            point = run_FI_amplitude(current, cfg, rest_state)
+        elif mode == 'rebuild':
+            point = run_single_FI_point(current, ad_model=ad_model, ad_stage=ad_stage)
+        else:
+            raise ValueError(f"Unknown F-I sweep mode: {mode}")
+        points.append(point)
 
-        f_rate, v_mean, v_trace, t_trace = run_single_FI_point(
-            current, ad_model=ad_model, ad_stage=ad_stage
-        )
+        if verbose:
+            print(f"F = {point[0]:.1f} Hz, V = {point[1]:.1f} mV")
 
-        firing_rates.append(f_rate)
-        mean_voltages.append(v_mean)
-        voltage_traces.append(v_trace)
+    if mode == 'reuse':
+        sim.clearAll()
 
-        print(f"F = {f_rate:.1f} Hz, V = {v_mean:.1f} mV")
+    return points
+
+
+def assemble_FI_VI_results(condition_name, ad_model, ad_stage, currents, points):
+    """Merge per-current results (f_rate, v_mean, v_trace, t_trace) into the F-I/V-I JSON schema"""
+
+    firing_rates = [p[0] for p in points]
+    mean_voltages = [p[1] for p in points]
+    voltage_traces = [p[2] for p in points]
+    t_trace = points[-1][3]
 
     results = {
         'condition': condition_name,
-        'currents': currents.tolist(),
+        'currents': np.asarray(currents).tolist(),
         'firing_rates': firing_rates,
         'mean_voltages': mean_voltages,
-        'time_trace': t_trace.tolist(),
-        'voltage_traces': [vt.tolist() for vt in voltage_traces],
+        'time_trace': np.asarray(t_trace).tolist(),
+        'voltage_traces': [np.asarray(vt).tolist() for vt in voltage_traces],
         'ad_model': ad_model,
         'ad_stage': ad_stage
     }
@@ -162,6 +420,276 @@ def generate_FI_VI_curves(condition_name, ad_model=False, ad_stage=None):
     return results
 
 
+def generate_FI_VI_curves(condition_name, ad_model=False, ad_stage=None):
+    """Generate complete F-I and V-I curves for a condition"""
+
+    if SAMPLING == 'adaptive':
+        return adaptive_FI_curve(condition_name, ad_model=ad_model, ad_stage=ad_stage)
+
+    print(f"\n{'='*70}")
+    print(f"Generating F-I and V-I curves for: {condition_name}")
+    print(f"{'='*70}")
+
+    currents = np.arange(I_MIN, I_MAX + I_STEP, I_STEP)
+    points = run_FI_sweep(currents, ad_model=ad_model, ad_stage=ad_stage)
+
+    return assemble_FI_VI_results(condition_name, ad_model, ad_stage, currents, points)
+
+
+def adaptive_FI_curve(condition_name, ad_model=False, ad_stage=None, mode=None, verbose=True):
+    """
+    Generate F-I and V-I curves with adaptive current sampling.
+
+    1. Rheobase is bracketed by I_MIN/I_MAX and found by bisection down to RHEOBASE_TOL.
+    2. Above rheobase the curve is scanned every ADAPTIVE_STEP until I_MAX, or until
+       firing saturates (SATURATION_STEPS consecutive increments < SATURATION_TOL Hz).
+    3. Intervals are bisected wherever the F-I slope changes by more than
+       SLOPE_CHANGE_TOL Hz across neighbouring intervals, down to MIN_SPACING.
+
+    Every simulated point (including bisection points) ends up in the output, so the
+    result has the same fields as generate_FI_VI_curves() plus 'rheobase'.
+    """
+
+    mode = mode or SWEEP_MODE
+
+    print(f"\n{'='*70}")
+    print(f"Adaptive F-I and V-I curves for: {condition_name}")
+    print(f"{'='*70}")
+
+    if mode != 'rebuild':
+        cfg = create_FI_sim(I_MIN, ad_model=ad_model, ad_stage=ad_stage)
+        sim.preRun()
+        rest_state = FI_rest_state(cfg) if REUSE_REST_STATE else None
+
+    points = {}
+
+    def evaluate(current):
+        current = round(float(current), 6)
+        if current not in points:
+            if mode == 'rebuild':
+                points[current] = run_single_FI_point(current, ad_model=ad_model, ad_stage=ad_stage)
+            else:
+                points[current] = run_FI_amplitude(current, cfg, rest_state)
+            if verbose:
+                print(f"[{len(points)}] I = {current:.4f} nA: "
+                      f"F = {points[current][0]:.1f} Hz, V = {points[current][1]:.1f} mV")
+        return points[current][0]
+
+    # 1. Rheobase by bisection
+    rheobase = np.nan
+    if evaluate(I_MIN) > 0:
+        rheobase = I_MIN
+    elif evaluate(I_MAX) > 0:
+        lo, hi = I_MIN, I_MAX
+        while hi - lo > RHEOBASE_TOL:
+            mid = 0.5 * (lo + hi)
+            if evaluate(mid) > 0:
+                hi = mid
+            else:
+                lo = mid
+        rheobase = round(hi, 6)
+
+    if not np.isnan(rheobase):
+        # 2. Coarse supra-threshold scan with early stop at saturation
+        current = rheobase
+        flat_steps = 0
+        f_prev = evaluate(current)
+        while current < I_MAX - 1e-9 and flat_steps < SATURATION_STEPS:
+            current = min(current + ADAPTIVE_STEP, I_MAX)
+            f = evaluate(current)
+            flat_steps = flat_steps + 1 if abs(f - f_prev) < SATURATION_TOL else 0
+            f_prev = f
+        I_stop = current
+
+        # 3. Refine where the slope changes
+        refined = True
+        while refined:
+            refined = False
+            currents = np.array(sorted(c for c in points if rheobase <= c <= I_stop))
+            rates = np.array([points[c][0] for c in currents])
+            for k in range(1, len(currents) - 1):
+                slope_left = (rates[k] - rates[k-1]) / (currents[k] - currents[k-1])
+                slope_right = (rates[k+1] - rates[k]) / (currents[k+1] - currents[k])
+                width = max(currents[k] - currents[k-1], currents[k+1] - currents[k])
+                if abs(slope_right - slope_left) * width > SLOPE_CHANGE_TOL:
+                    for a, b in ((currents[k-1], currents[k]), (currents[k], currents[k+1])):
+                        if b - a > 2 * MIN_SPACING and round(0.5 * (a + b), 6) not in points:
+                            evaluate(0.5 * (a + b))
+                            refined = True
+
+    if mode != 'rebuild':
+        sim.clearAll()
+
+    currents = sorted(points)
+    print(f"✓ {condition_name}: {len(points)} simulations, rheobase = {rheobase:.4f} nA")
+
+    results = assemble_FI_VI_results(condition_name, ad_model, ad_stage, currents,
+                                     [points[c] for c in currents])
+    results['rheobase'] = None if np.isnan(rheobase) else float(rheobase)
+    results['n_simulations'] = len(points)
+
+    return results
+
+
+def _FI_sweep_worker(task):
+    """Pool worker: run a chunk of one condition's currents in this worker's NEURON instance"""
+
+    condition_name, indices, currents, ad_model, ad_stage, mode = task
+    points = run_FI_sweep(currents, ad_model=ad_model, ad_stage=ad_stage, mode=mode, verbose=False)
+    return condition_name, indices, points
+
+
+def generate_FI_VI_curves_parallel(conditions, n_workers=N_WORKERS, mode=None):
+    """
+    Generate F-I and V-I curves for several conditions on a process pool.
+
+    Each condition's current grid is split into chunks that run as independent
+    tasks. Workers are spawned (not forked) so each one owns a fresh NEURON
+    instance. In 'rebuild' mode every current is its own task; in 'reuse' mode
+    the chunks are sized so all workers stay busy while each chunk pays for
+    only one cell build ('batch' chunks likewise become one batched run each).
+
+    Args:
+        conditions (list): (name, ad_model, ad_stage, ...) tuples, see CONDITIONS
+        n_workers (int): Number of worker processes
+        mode (str): F-I sweep engine, see run_FI_sweep(); defaults to SWEEP_MODE
+
+    Returns:
+        list: One results dict per condition, same schema as generate_FI_VI_curves()
+    """
+
+    mode = mode or SWEEP_MODE
+
+    if SAMPLING == 'adaptive':
+        # Adaptive sampling is sequential within a condition: one task per condition
+        ctx = multiprocessing.get_context('spawn')
+        with ctx.Pool(processes=min(n_workers, len(conditions))) as pool:
+            return pool.starmap(adaptive_FI_curve,
+                                [(cond[0], cond[1], cond[2], mode, False) for cond in conditions])
+
+    currents = np.arange(I_MIN, I_MAX + I_STEP, I_STEP)
+
+    if mode == 'rebuild':
+        chunk_size = 1
+    else:
+        chunk_size = int(np.ceil(len(conditions) * len(currents) / n_workers))
+        chunk_size = min(max(chunk_size, 1), len(currents))
+
+    tasks = []
+    for cond in conditions:
+        for start in range(0, len(currents), chunk_size):
+            indices = list(range(start, min(start + chunk_size, len(currents))))
+            tasks.append((cond[0], indices, currents[indices], cond[1], cond[2], mode))
+
+    print(f"\n{'='*70}")
+    print(f"Parallel F-I/V-I sweep ({mode}): {len(conditions) * len(currents)} points "
+          f"in {len(tasks)} tasks on {n_workers} workers")
+    print(f"{'='*70}")
+
+    points = {cond[0]: [None] * len(currents) for cond in conditions}
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(processes=n_workers) as pool:
+        for n_done, (condition_name, indices, chunk_points) in enumerate(
+                pool.imap_unordered(_FI_sweep_worker, tasks, chunksize=1), start=1):
+            for i, point in zip(indices, chunk_points):
+                points[condition_name][i] = point
+                print(f"{condition_name}: I = {currents[i]:.3f} nA -> "
+                      f"F = {point[0]:.1f} Hz, V = {point[1]:.1f} mV")
+            print(f"[{n_done}/{len(tasks)}] tasks done")
+
+    return [assemble_FI_VI_results(cond[0], cond[1], cond[2], currents, points[cond[0]])
+            for cond in conditions]
+
+
+def _FI_job(condition_name, indices, currents, ad_model, ad_stage, mode):
+    """Job function (run in a child process by job_scheduler.py): one chunk of one condition"""
+
+    points = run_FI_sweep(np.asarray(currents), ad_model=ad_model, ad_stage=ad_stage,
+                          mode=mode, verbose=False)
+    return {'indices': indices, 'points': points}
+
+
+def _FI_job_key(payload, ad_model, ad_stage):
+    """
+    Job key: the F-I SimConfig, the job function and its arguments, and every file
+    the result depends on (model files and mechanisms, see job_scheduler.job_key,
+    and this script)
+    """
+
+    from job_scheduler import job_key
+
+    cfg = build_FI_cfg(ad_model, ad_stage)
+    netParamsInputs = {
+        'function': payload['function'],
+        'args': payload['args'],
+        'stim': [I_START, I_DUR, EARLY_STOP, REUSE_REST_STATE, SIM_DUR],
+    }
+    return job_key(cfg.__dict__, netParamsInputs, modules=[__file__])
+
+
+def generate_FI_VI_curves_scheduled(conditions, n_workers=N_WORKERS, mode=None, db=JOB_DB, retry=False):
+    """
+    Generate F-I and V-I curves through the resumable job table in db.
+
+    Chunks (or, with adaptive sampling, whole conditions) that are already done
+    are not run again; crashed or timed-out jobs are retried up to their
+    max_attempts, and with retry=True jobs that failed in earlier runs are run
+    again. Same return value as generate_FI_VI_curves_parallel().
+    """
+
+    from job_scheduler import JobScheduler
+
+    mode = mode or SWEEP_MODE
+    jobs = JobScheduler(db)
+    keys = {cond[0]: [] for cond in conditions}
+
+    if SAMPLING == 'adaptive':
+        for cond in conditions:
+            payload = {'module': 'generate_FI_VI_curves', 'function': 'adaptive_FI_curve',
+                       'args': [cond[0], cond[1], cond[2], mode, False]}
+            key = _FI_job_key(payload, cond[1], cond[2])
+            jobs.submit(key, payload, label=cond[0], limits=JOB_LIMITS)
+            keys[cond[0]].append(key)
+    else:
+        currents = np.arange(I_MIN, I_MAX + I_STEP, I_STEP)
+        for cond in conditions:
+            for start in range(0, len(currents), JOB_CHUNK):
+                indices = list(range(start, min(start + JOB_CHUNK, len(currents))))
+                payload = {'module': 'generate_FI_VI_curves', 'function': '_FI_job',
+                           'args': [cond[0], indices, [round(float(c), 6) for c in currents[indices]],
+                                    cond[1], cond[2], mode]}
+                key = _FI_job_key(payload, cond[1], cond[2])
+                jobs.submit(key, payload, label=f"{cond[0]} I[{indices[0]}:{indices[-1] + 1}]",
+                            limits=JOB_LIMITS)
+                keys[cond[0]].append(key)
+
+    if retry:
+        jobs.retry_failed([key for condKeys in keys.values() for key in condKeys])
+
+    counts = jobs.counts()
+    print(f"\n{'='*70}")
+    print(f"Resumable F-I/V-I sweep ({mode}): {sum(len(k) for k in keys.values())} jobs in {db}, "
+          f"{counts.get('done', 0)} already done")
+    print(f"{'='*70}")
+    jobs.run_workers(n_workers)
+
+    all_results = []
+    for cond in conditions:
+        results = jobs.results(keys[cond[0]])
+        if len(results) < len(keys[cond[0]]):
+            raise RuntimeError(f"{cond[0]}: {len(keys[cond[0]]) - len(results)} jobs failed, "
+                               f"see: python job_scheduler.py {db} (--retry to run them again)")
+        if SAMPLING == 'adaptive':
+            all_results.append(results[keys[cond[0]][0]])
+            continue
+        points = [None] * len(currents)
+        for key in keys[cond[0]]:
+            for i, point in zip(results[key]['indices'], results[key]['points']):
+                points[i] = point
+        all_results.append(assemble_FI_VI_results(cond[0], cond[1], cond[2], currents, points))
+    return all_results
+
+
 def plot_FI_VI_curves(all_results):
     """Plot F-I and V-I curves for all conditions"""
 
@@ -244,9 +772,11 @@ def plot_FI_VI_curves(all_results):
         currents = np.array(result['currents'])
         f_rates = np.array(result['firing_rates'])
 
-        # Find rheobase (first current that elicits spiking)
+        # Find rheobase (bisected value if available, else first current that elicits spiking)
         rheobase_idx = np.where(f_rates > 0)[0]
-        if len(rheobase_idx) > 0:
+        if result.get('rheobase') is not None:
+            rheobase = result['rheobase']
+        elif len(rheobase_idx) > 0:
             rheobase_idx = rheobase_idx[0]
             rheobase = currents[rheobase_idx]
         else:
@@ -290,7 +820,7 @@ def plot_FI_VI_curves(all_results):
     print("EXCITABILITY SUMMARY")
     print(f"{'='*70}")
     for condition, gain, rheobase in zip(conditions, gains, rheobase_currents):
-        print(f"{condition:15s}: Gain = {gain:6.1f} Hz/nA, Rheobase = {rheobase:.3f} nA")
+        print(f"{condition:15s}: Gain = {gain:6.1f} Hz/nA, Rheobase = {rheobase:.4f} nA")
     print(f"{'='*70}\n")
 
     return fig
@@ -303,43 +833,26 @@ def main():
     print("="*70)
 
     # Generate curves for all four conditions
-    all_results = []
-
-    # Healthy
-    print("\n[1/4] Healthy Baseline")
-    healthy_results = generate_FI_VI_curves('Healthy', ad_model=False)
-    all_results.append(healthy_results)
-
-    # Save intermediate
-    with open('output/FI_VI_Healthy.json', 'w') as f:
-        json.dump(healthy_results, f, indent=2)
-
-    # AD Stage 1
-    print("\n[2/4] AD Stage 1 (Early Hyperexcitability)")
-    stage1_results = generate_FI_VI_curves('AD Stage 1', ad_model=True, ad_stage=1)
-    all_results.append(stage1_results)
-
-    # Save intermediate
-    with open('output/FI_VI_AD_Stage1.json', 'w') as f:
-        json.dump(stage1_results, f, indent=2)
-
-    # AD Stage 2
-    print("\n[3/4] AD Stage 2 (Intermediate Transition)")
-    stage2_results = generate_FI_VI_curves('AD Stage 2', ad_model=True, ad_stage=2)
-    all_results.append(stage2_results)
-
-    # Save intermediate
-    with open('output/FI_VI_AD_Stage2.json', 'w') as f:
-        json.dump(stage2_results, f, indent=2)
-
-    # AD Stage 3
-    print("\n[4/4] AD Stage 3 (Late Hypoexcitability)")
-    stage3_results = generate_FI_VI_curves('AD Stage 3', ad_model=True, ad_stage=3)
-    all_results.append(stage3_results)
+    if USE_JOB_SCHEDULER:
+        all_results = generate_FI_VI_curves_scheduled(CONDITIONS, n_workers=N_WORKERS, retry=JOB_RETRY_FAILED)
+        for results, (name, ad_model, ad_stage, tag, description) in zip(all_results, CONDITIONS):
+            with open(f'output/FI_VI_{tag}.json', 'w') as f:
+                json.dump(results, f, indent=2)
+    elif N_WORKERS > 1:
+        all_results = generate_FI_VI_curves_parallel(CONDITIONS, n_workers=N_WORKERS)
+        for results, (name, ad_model, ad_stage, tag, description) in zip(all_results, CONDITIONS):
+            with open(f'output/FI_VI_{tag}.json', 'w') as f:
+                json.dump(results, f, indent=2)
+    else:
+        all_results = []
+        for i, (name, ad_model, ad_stage, tag, description) in enumerate(CONDITIONS):
+            print(f"\n[{i+1}/{len(CONDITIONS)}] {description}")
+            results = generate_FI_VI_curves(name, ad_model=ad_model, ad_stage=ad_stage)
+            all_results.append(results)
 
-    # Save intermediate
-    with open('output/FI_VI_AD_Stage3.json', 'w') as f:
-        json.dump(stage3_results, f, indent=2)
+            # Save intermediate
+            with open(f'output/FI_VI_{tag}.json', 'w') as f:
+                json.dump(results, f, indent=2)
 
     # Save combined results
     with open('output/FI_VI_all_conditions.json', 'w') as f:
@@ -354,10 +867,8 @@ def main():
     print("="*70)
     print("\nGenerated files:")
     print("  - output/FI_VI_curves_comparison.png")
-    print("  - output/FI_VI_Healthy.json")
-    print("  - output/FI_VI_AD_Stage1.json")
-    print("  - output/FI_VI_AD_Stage2.json")
-    print("  - output/FI_VI_AD_Stage3.json")
+    for name, ad_model, ad_stage, tag, description in CONDITIONS:
+        print(f"  - output/FI_VI_{tag}.json")
     print("  - output/FI_VI_all_conditions.json")
     print("="*70 + "\n")
 
@@ -5,24 +5,50 @@ COMPLETE Main simulation runner for Yao et al. L2/3 human microcircuit
 
 Usage:
     python init.py
-    
+    python init.py scale=10 duration=1000          # cfg overrides (key=value)
+    python init.py recordingProfile=spikes-only    # see recording.py
+
+    # MPI (cells are distributed round-robin across ranks):
+    mpiexec -n 8 python init.py scale=10           # 1k cells
+    mpiexec -n 8 nrniv -mpi -python init.py scale=100
+
 Output:
     - output/Yao_L23_100cell_data.json
     - output/Yao_L23_100cell_raster.png
     - output/Yao_L23_100cell_traces.png
 """
 
+import ast
+import json
 import os
 import sys
 from neuron import h
 import neuron
 
+# Environment variables set by the common MPI launchers (Open MPI, MPICH/Hydra, PMIx, Slurm)
+MPI_ENV_VARS = ['OMPI_COMM_WORLD_SIZE', 'PMI_SIZE', 'PMIX_RANK', 'SLURM_NTASKS']
+
+# Under mpiexec + python, MPI must be initialized before the first ParallelContext
+if any(var in os.environ for var in MPI_ENV_VARS):
+    h.nrnmpi_init()
+
+pc = h.ParallelContext()
+rank = int(pc.id())
+nhost = int(pc.nhost())
+
+
+def log(msg=''):
+    """Print on rank 0 only"""
+    if rank == 0:
+        print(msg)
+
+
 # Load NEURON mechanisms
-print("\n" + "="*70)
-print("YAO ET AL. L2/3 HUMAN CORTICAL MICROCIRCUIT - 100 CELLS")
-print("="*70)
+log("\n" + "="*70)
+log("YAO ET AL. L2/3 HUMAN CORTICAL MICROCIRCUIT")
+log("="*70)
 
-print("\n[1/6] Checking prerequisites...")
+log("\n[1/6] Checking prerequisites...")
 
 # Check for required files
 required_files = [
@@ -38,10 +64,10 @@ for fname in required_files:
         missing_files.append(fname)
 
 if missing_files:
-    print(f"✗ ERROR: Missing required files: {missing_files}")
+    log(f"✗ ERROR: Missing required files: {missing_files}")
     sys.exit(1)
 
-print("✓ All required Python files present")
+log("✓ All required Python files present")
 
 # Check for cell-specific templates
 required_templates = [
@@ -57,110 +83,215 @@ for template in required_templates:
         missing_templates.append(template)
 
 if missing_templates:
-    print(f"\n✗ ERROR: Missing cell-specific template files!")
-    print(f"   Missing: {missing_templates}")
-    print(f"\n   Run this first: python create_templates.py")
+    log(f"\n✗ ERROR: Missing cell-specific template files!")
+    log(f"   Missing: {missing_templates}")
+    log(f"\n   Run this first: python create_templates.py")
     sys.exit(1)
 
-print("✓ All cell-specific templates present")
+log("✓ All cell-specific templates present")
 
-print("\n[2/6] Loading NEURON mechanisms...")
+log("\n[2/6] Loading NEURON mechanisms...")
 if os.path.exists('x86_64'):
     neuron.load_mechanisms('x86_64')
-    print("✓ Loaded mechanisms from x86_64/")
+    log("✓ Loaded mechanisms from x86_64/")
 elif os.path.exists('mod'):
-    print("✗ ERROR: mod/ folder exists but not compiled!")
-    print("   Run: nrnivmodl mod/")
+    log("✗ ERROR: mod/ folder exists but not compiled!")
+    log("   Run: nrnivmodl mod/")
     sys.exit(1)
 else:
-    print("⚠ WARNING: No mechanism folder found, using default NEURON mechanisms")
+    log("⚠ WARNING: No mechanism folder found, using default NEURON mechanisms")
 
 # Import NetPyNE
-print("\n[3/6] Importing NetPyNE...")
+log("\n[3/6] Importing NetPyNE...")
 from netpyne import sim
+import spike_stats
 
 # Import configuration
-print("\n[4/6] Loading configuration...")
-from cfg import cfg
-print(f"✓ Simulation duration: {cfg.duration} ms")
-print(f"✓ Time step: {cfg.dt} ms")
-print(f"✓ Cell populations: {cfg.allpops}")
-print(f"✓ Total cells: {sum(cfg.cellNumber.values())}")
+log("\n[4/6] Loading configuration...")
+from cfg import cfg, scaleCellNumbers, defaultSimLabel
+
+# Command-line overrides: key=value (values parsed as Python literals)
+overrides = set()
+for arg in sys.argv[1:]:
+    if '=' in arg:
+        key, value = arg.split('=', 1)
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            pass
+        setattr(cfg, key, value)
+        overrides.add(key)
+        log(f"✓ Override: cfg.{key} = {value!r}")
+        if key == 'scale':
+            scaleCellNumbers(cfg)
+if overrides & {'ADmodel', 'ADstage'} and 'simLabel' not in overrides:
+    cfg.simLabel = defaultSimLabel(cfg)
+
+import recording
+recording.apply_profile(cfg)
+
+if cfg.coreneuron:
+    import coreneuron_support
+    coreneuron_support.configure(cfg, log=log)
+
+num_cells = sum(cfg.cellNumber.values())
+log(f"✓ Simulation duration: {cfg.duration} ms")
+log(f"✓ Time step: {cfg.dt} ms")
+log(f"✓ Cell populations: {cfg.allpops}")
+log(f"✓ Total cells: {num_cells} (scale = {cfg.scale})")
+log(f"✓ MPI ranks: {nhost} (~{num_cells / nhost:.1f} cells per rank, round-robin gids)")
+log(f"✓ Threads per rank: {cfg.nthreads}")
+log(f"✓ Recording profile: {cfg.recordingProfile}")
+if nhost > num_cells:
+    log(f"⚠ WARNING: more ranks ({nhost}) than cells ({num_cells}); {nhost - num_cells} ranks will be idle")
 
 # Import network parameters
-print("\n[5/6] Loading network parameters...")
+log("\n[5/6] Loading network parameters...")
 from netParams import netParams
 
 # Create output directory
-if not os.path.exists(cfg.saveFolder):
+if rank == 0 and not os.path.exists(cfg.saveFolder):
     os.makedirs(cfg.saveFolder)
-    print(f"✓ Created output directory: {cfg.saveFolder}/")
+    log(f"✓ Created output directory: {cfg.saveFolder}/")
+pc.barrier()
 
 # Run simulation
-print("\n[6/6] Running simulation...")
-print("-" * 70)
+log("\n[6/6] Running simulation...")
+log("-" * 70)
 
 try:
-    sim.createSimulateAnalyze(netParams=netParams, simConfig=cfg)
+    balancePlan = None
+    if cfg.loadBalance and nhost > 1:
+        import load_balance
+        balancePlan = load_balance.install(netParams, cfg, nhost)
+    try:
+        sim.create(netParams=netParams, simConfig=cfg)
+    finally:
+        if balancePlan:
+            load_balance.uninstall()
+
+    if cfg.multisplit:
+        import multisplit
+        multisplit.setup(sim, netParams, cfg)
+
+    if cfg.nthreads > 1:
+        import multithread
+        multithread.setup_threads(sim, cfg.nthreads)
+
+    recording.setup(sim, cfg)
+
+    live = None
+    if cfg.liveStats:
+        import live_stats
+        live = live_stats.LiveSpikeStats(sim, netParams)
+
+    # The coredat export must come after NetPyNE's preRun, which sets dt, the h globals,
+    # cache_efficient and the NetStim Random123 streams; the run then skips its own preRun
+    preRunDone = bool(cfg.coreneuron and cfg.coredatFolder)
+    if preRunDone:
+        sim.preRun()
+        coreneuron_support.export_coredat(sim, cfg.coredatFolder)
+
+    if cfg.useCheckpoint:
+        import checkpoint
+        checkpoint.simulate(sim, netParams, gather=False, onRestore=live.restart if live else None,
+                            skipPreRun=preRunDone)
+    else:
+        sim.runSim(skipPreRun=preRunDone)
+    recording.finalize(sim)     # reduce profile traces on each rank before gathering
+    sim.gatherData()
+
+    if balancePlan:
+        load_balance.report(sim, balancePlan)
+    sim.analyze()
+
+    if rank == 0:
+        import columnar_io
+        columnar_io.save_index(cfg, netParams)
+        if cfg.saveColumnar:
+            columnar_io.save_columnar(sim, netParams)
+
+    if rank == 0 and getattr(cfg, 'timingFile', None):
+        with open(cfg.timingFile, 'w') as f:
+            json.dump({'nhost': nhost, 'numCells': num_cells, 'timing': dict(sim.timingData)}, f, indent=2)
     
-    print("\n" + "="*70)
-    print("✅ SIMULATION COMPLETE!")
-    print("="*70)
-    print(f"\nResults saved to: {cfg.saveFolder}/")
-    print("\nGenerated files:")
+    log("\n" + "="*70)
+    log("✅ SIMULATION COMPLETE!")
+    log("="*70)
+    log(f"\nResults saved to: {cfg.saveFolder}/")
+    log("\nGenerated files:")
     
     # List generated files
     output_files = []
-    if os.path.exists(cfg.saveFolder):
+    if rank == 0 and os.path.exists(cfg.saveFolder):
         for fname in os.listdir(cfg.saveFolder):
             if fname.startswith(cfg.simLabel):
                 output_files.append(fname)
-                print(f"  ✓ {fname}")
+                log(f"  ✓ {fname}")
     
     if not output_files:
-        print("  (No output files found - check cfg.saveFolder)")
+        log("  (No output files found - check cfg.saveFolder)")
     
-    # Print summary statistics
-    print("\n" + "="*70)
-    print("SUMMARY STATISTICS")
-    print("="*70)
+    # Print summary statistics: per-cell moments from the local spikes of every
+    # rank (or the online accumulators), summed with allreduce (linear in spikes,
+    # no spike gathering needed)
+    log("\n" + "="*70)
+    log("SUMMARY STATISTICS")
+    log("="*70)
     
-    if hasattr(sim, 'allSimData') and 'spkt' in sim.allSimData:
-        total_spikes = len(sim.allSimData['spkt'])
-        duration_sec = cfg.duration / 1000.0
-        num_cells = sum(cfg.cellNumber.values())
-        avg_rate = total_spikes / (duration_sec * num_cells) if num_cells > 0 else 0
-        
-        print(f"Total spikes: {total_spikes}")
-        print(f"Average firing rate: {avg_rate:.2f} Hz")
-        print(f"Simulation time: {cfg.duration} ms")
-        print(f"Number of cells: {num_cells}")
-        
-        # Per-population stats
-        print("\nPer-population firing rates:")
-        for pop in cfg.allpops:
-            pop_spikes = [spk for i, spk in enumerate(sim.allSimData['spkt']) 
-                         if sim.allSimData['spkid'][i] in sim.net.cells and 
-                         sim.net.cells[int(sim.allSimData['spkid'][i])].tags.get('pop') == pop]
-            pop_cells = cfg.cellNumber[pop]
-            pop_rate = len(pop_spikes) / (duration_sec * pop_cells) if pop_cells > 0 else 0
-            print(f"  {pop}: {pop_rate:.2f} Hz ({len(pop_spikes)} spikes)")
+    if live:
+        summary = live.summary()
     else:
-        print("No spike data available")
+        gidPop = spike_stats.gid_pop_index(netParams)
+        moments = spike_stats.cell_moments(sim.simData['spkt'], sim.simData['spkid'], len(gidPop))
+        if nhost > 1:
+            moments = spike_stats.reduce_moments(pc, moments)
+        duration_ms = cfg.duration - (cfg.warmupDuration if cfg.useCheckpoint else 0)
+        summary = spike_stats.summarize(moments, gidPop, list(netParams.popParams), duration_ms)
     
-    print("\n" + "="*70)
-    print("🎉 SUCCESS! Check the output/ folder for results!")
-    print("="*70 + "\n")
+    log(f"Total spikes: {summary['totalSpikes']}")
+    log(f"Average firing rate: {summary['rate']:.2f} Hz")
+    log(f"Simulation time: {cfg.duration} ms")
+    log(f"Number of cells: {num_cells}")
+    
+    log("\nPer-population firing rates:")
+    for pop, stats in summary['pops'].items():
+        log(f"  {pop}: {stats['rate']:.2f} Hz ({stats['spikes']} spikes, "
+            f"{stats['active']}/{stats['cells']} active, ISI CV {stats['cv']:.2f})")
+    
+    # Windowed rates and synchrony on the gathered spikes
+    if cfg.networkMetrics and rank == 0:
+        import network_metrics
+        spkt, spkid = sim.allSimData.get('spkt', []), sim.allSimData.get('spkid', [])
+        if len(spkt):
+            t_start = cfg.warmupDuration if cfg.useCheckpoint else 0.0
+            metrics = network_metrics.compute_metrics(
+                spkt, spkid, spike_stats.gid_pop_index(netParams), list(netParams.popParams),
+                t_start, cfg.duration, cfg.metricsBinSize)
+            table = network_metrics.summary_table(metrics)
+            with open(os.path.join(cfg.saveFolder, cfg.simLabel + '_metrics.json'), 'w') as f:
+                json.dump({'binSize': cfg.metricsBinSize, 'pops': table}, f, indent=2)
+
+            log(f"\nSynchrony ({cfg.metricsBinSize} ms bins):")
+            for pop, m in table.items():
+                log(f"  {pop}: peak rate {m['rate_peak']:.1f} Hz, count corr {m['count_corr']:.3f}, "
+                    f"Fano {m['fano']:.2f}, Golomb chi {m['golomb_chi']:.3f}")
+        else:
+            log("\n⚠ No gathered spikes (cfg.keepSpikes = False?), skipping synchrony metrics")
+    
+    log("\n" + "="*70)
+    log("🎉 SUCCESS! Check the output/ folder for results!")
+    log("="*70 + "\n")
     
 except KeyboardInterrupt:
-    print("\n\n" + "="*70)
-    print("⚠ SIMULATION INTERRUPTED BY USER")
-    print("="*70 + "\n")
+    log("\n\n" + "="*70)
+    log("⚠ SIMULATION INTERRUPTED BY USER")
+    log("="*70 + "\n")
     sys.exit(0)
     
 except Exception as e:
     print("\n" + "="*70)
-    print("❌ SIMULATION FAILED!")
+    print(f"❌ SIMULATION FAILED! (rank {rank})")
     print("="*70)
     print(f"\nError: {e}")
     print("\nTroubleshooting steps:")
@@ -177,103 +308,3 @@ except Exception as e:
     traceback.print_exc()
     print("="*70 + "\n")
     sys.exit(1)
-    """
-init.py
-Main simulation runner for Yao et al. L2/3 human microcircuit
-100-cell replica using NetPyNE
-
-Usage:
-    python init.py
-    
-Output:
-    - output/Yao_L23_100cell_data.json
-    - output/Yao_L23_100cell_raster.png
-    - output/Yao_L23_100cell_traces.png
-"""
-
-import os
-import sys
-from neuron import h
-import neuron
-
-# Load NEURON mechanisms
-print("\n" + "="*70)
-print("YAOER AL. L2/3 HUMAN CORTICAL MICROCIRCUIT - 100 CELLS")
-print("="*70)
-
-print("\n[1/5] Loading NEURON mechanisms...")
-if os.path.exists('x86_64'):
-    neuron.load_mechanisms('x86_64')
-    print("✓ Loaded mechanisms from x86_64/")
-elif os.path.exists('mod'):
-    print("ERROR: mod/ folder exists but not compiled!")
-    print("Run: nrnivmodl mod/")
-    sys.exit(1)
-else:
-    print("WARNING: No mechanism folder found, using default NEURON mechanisms")
-
-# Import NetPyNE
-print("\n[2/5] Importing NetPyNE...")
-from netpyne import sim
-
-# Import configuration and network parameters
-print("\n[3/5] Loading configuration...")
-from cfg import cfg
-print(f"✓ Simulation duration: {cfg.duration} ms")
-print(f"✓ Time step: {cfg.dt} ms")
-print(f"✓ Cell populations: {cfg.allpops}")
-print(f"✓ Total cells: {sum(cfg.cellNumber.values())}")
-
-print("\n[4/5] Loading network parameters...")
-from netParams import netParams
-
-# Create output directory
-if not os.path.exists(cfg.saveFolder):
-    os.makedirs(cfg.saveFolder)
-    print(f"✓ Created output directory: {cfg.saveFolder}/")
-
-# Run simulation
-print("\n[5/5] Running simulation...")
-print("-" * 70)
-
-try:
-    sim.createSimulateAnalyze(netParams=netParams, simConfig=cfg)
-    
-    print("\n" + "="*70)
-    print("SIMULATION COMPLETE!")
-    print("="*70)
-    print(f"\nResults saved to: {cfg.saveFolder}/")
-    print("\nGenerated files:")
-    print(f"  - {cfg.simLabel}_data.json")
-    print(f"  - {cfg.simLabel}_raster.png")
-    print(f"  - {cfg.simLabel}_traces.png")
-    print(f"  - {cfg.simLabel}_net.png")
-    print(f"  - {cfg.simLabel}_conn.png")
-    
-    # Print summary statistics
-    print("\nSummary:")
-    if hasattr(sim, 'allSimData'):
-        if 'spkt' in sim.allSimData:
-            total_spikes = len(sim.allSimData['spkt'])
-            duration_sec = cfg.duration / 1000.0
-            num_cells = sum(cfg.cellNumber.values())
-            avg_rate = total_spikes / (duration_sec * num_cells)
-            print(f"  Total spikes: {total_spikes}")
-            print(f"  Average firing rate: {avg_rate:.2f} Hz")
-    
-    print("\n" + "="*70)
-    
-except Exception as e:
-    print("\n" + "="*70)
-    print("SIMULATION FAILED!")
-    print("="*70)
-    print(f"Error: {e}")
-    print("\nTroubleshooting:")
-    print("1. Check that all HOC files exist in models/")
-    print("2. Check that all SWC files exist in morphologies/")
-    print("3. Check that Circuit_param.xls exists")
-    print("4. Verify mechanisms compiled: ls x86_64/")
-    print("5. Check cellwrapper.py functions load correctly")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
\ No newline at end of file
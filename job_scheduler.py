@@ -0,0 +1,364 @@
+"""
+job_scheduler.py
+Resumable, deduplicating local job scheduler for sweeps
+
+Jobs live in a SQLite table keyed by the hash of the (cfg, netParams) pair
+they simulate, so submitting the same point twice creates one job, and
+re-launching a sweep after a crash runs only the jobs that are not done.
+
+Each job runs in its own child process:
+    {'cmd': [...]}                                  a command (e.g. init.py with cfg overrides)
+    {'module': m, 'function': f, 'args': [...]}     m.f(*args), result stored as JSON
+
+Workers claim jobs with a lease (LEASE_SECONDS) that they renew while the
+child runs. If a worker or the whole scheduler dies, the lease expires and
+the job is claimed again; failed or timed-out jobs are retried up to their
+max_attempts, after which they stay failed until retried explicitly
+(retry_failed(), or --retry below). Per-job limits (rlimits, Linux only; wall-clock
+timeout; a timed-out job is killed with its whole process group, e.g. mpiexec
+and its ranks):
+    {'timeout': s, 'memoryMB': MB, 'cpuSeconds': s}
+
+Job keys hash the cfg together with every file the result depends on: the
+model sources and data in MODEL_INPUTS, the compiled mechanisms, and the
+code of the job itself (modules=...).
+
+Usage:
+    jobs = JobScheduler('output/sweeps/ei/jobs.sqlite')
+    jobs.submit(job_key(cfgDict, modules=['init.py']), {'cmd': [...]}, label='...', limits={'timeout': 3600})
+    jobs.run_workers(n_workers=4)
+    jobs.results()                                  # {key: result} of the done jobs
+
+    python job_scheduler.py output/sweeps/ei/jobs.sqlite            # status of a job table
+    python job_scheduler.py output/sweeps/ei/jobs.sqlite --retry    # failed jobs back to pending
+"""
+
+import glob
+import json
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from cache_utils import CELL_SOURCES, hash_files, hash_params, hash_mod_files
+
+LEASE_SECONDS = 120.0
+POLL_SECONDS = 2.0
+MAX_ATTEMPTS = 3
+
+# Files the model is built from (cfg helpers, buildNetParams(cfg), cell templates,
+# biophysics, morphologies, connectivity tables); glob patterns, hashed into every job key
+MODEL_INPUTS = ['cfg.py', 'netParams.py'] + CELL_SOURCES + ['circuit_params.py', 'Circuit_param.xls',
+                                                            'models/*.hoc', 'morphologies/*.swc']
+
+# cfg entries that only name the output, not the simulated model
+OUTPUT_CFG_KEYS = ['simLabel', 'saveFolder', 'timingFile', 'coredatFolder']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key           TEXT PRIMARY KEY,
+    label         TEXT,
+    payload       TEXT NOT NULL,
+    limits        TEXT,
+    status        TEXT NOT NULL DEFAULT 'pending',   -- pending, running, done, failed
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    result        TEXT,
+    error         TEXT,
+    created       REAL,
+    updated       REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+"""
+
+
+def input_files(patterns):
+    """Existing files matching the glob patterns, in a stable order"""
+    return [path for pattern in patterns for path in sorted(glob.glob(pattern))]
+
+
+def job_key(cfg, netParams=None, modules=()):
+    """
+    Hash of the (cfg, netParams) pair of a job and of the files its result depends on
+
+    cfg:       dict of cfg entries (output names in OUTPUT_CFG_KEYS are ignored)
+    netParams: NetPyNE netParams or a dict of netParams inputs, or None (built from cfg)
+    modules:   source files of the code the job runs (e.g. init.py and the modules it uses)
+    """
+    cfg = {key: value for key, value in dict(cfg).items() if key not in OUTPUT_CFG_KEYS}
+    if netParams is not None:
+        netParams = hash_params(netParams.todict() if hasattr(netParams, 'todict') else netParams)
+    return hash_params({
+        'cfg': cfg,
+        'netParams': netParams,
+        'inputs': hash_files(input_files(MODEL_INPUTS + list(modules))),
+        'mod': hash_mod_files(),
+    })
+
+
+def _set_limits(pid, limits):
+    """Apply resource limits to a running child (Linux prlimit; no-op elsewhere)"""
+    import resource
+
+    if not hasattr(resource, 'prlimit'):
+        return
+    if limits.get('memoryMB'):
+        size = int(limits['memoryMB']) * 1024 * 1024
+        resource.prlimit(pid, resource.RLIMIT_AS, (size, size))
+    if limits.get('cpuSeconds'):
+        seconds = int(limits['cpuSeconds'])
+        resource.prlimit(pid, resource.RLIMIT_CPU, (seconds, seconds))
+
+
+class JobScheduler:
+    """SQLite-backed job table with leases and retries"""
+
+    def __init__(self, path, lease=LEASE_SECONDS):
+        self.path = path
+        self.lease = lease
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        # One connection per call: workers run in threads, sqlite3 connections are per thread
+        db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute('PRAGMA journal_mode=WAL')
+        return db
+
+    def submit(self, key, payload, label=None, limits=None, max_attempts=MAX_ATTEMPTS):
+        """Add a job unless a job with the same key exists; returns True if added"""
+        now = time.time()
+        with self._connect() as db:
+            cur = db.execute(
+                'INSERT OR IGNORE INTO jobs (key, label, payload, limits, max_attempts, created, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, label, json.dumps(payload), json.dumps(limits or {}), max_attempts, now, now))
+            return cur.rowcount == 1
+
+    def retry_failed(self, keys=None):
+        """Give failed jobs (only those in keys if given) another max_attempts, e.g. after fixing the cause"""
+        with self._connect() as db:
+            if keys is None:
+                return db.execute("UPDATE jobs SET status = 'pending', attempts = 0, error = NULL "
+                                  "WHERE status = 'failed'").rowcount
+            return sum(db.execute("UPDATE jobs SET status = 'pending', attempts = 0, error = NULL "
+                                  "WHERE status = 'failed' AND key = ?", (key,)).rowcount for key in keys)
+
+    def claim(self, owner):
+        """Lease the next pending job, or a running job whose lease expired; None if there is none"""
+        now = time.time()
+        db = self._connect()
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            # Expired leases that used up their attempts are failed, the rest are claimable again
+            db.execute("UPDATE jobs SET status = 'failed', error = 'lease expired', updated = ? "
+                       "WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                       (now, now))
+            row = db.execute("SELECT * FROM jobs WHERE status = 'pending' "
+                             "OR (status = 'running' AND lease_expires < ?) "
+                             "ORDER BY created LIMIT 1", (now,)).fetchone()
+            if row is not None:
+                db.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, "
+                           "lease_owner = ?, lease_expires = ?, updated = ? WHERE key = ?",
+                           (owner, now + self.lease, now, row['key']))
+            db.execute('COMMIT')
+        finally:
+            db.close()
+        return dict(row) if row is not None else None
+
+    def heartbeat(self, key, owner):
+        """Renew the lease; False if the job was taken over by another worker"""
+        with self._connect() as db:
+            return db.execute('UPDATE jobs SET lease_expires = ? WHERE key = ? AND lease_owner = ?',
+                              (time.time() + self.lease, key, owner)).rowcount == 1
+
+    def complete(self, key, owner, result):
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_owner = NULL, "
+                       "updated = ? WHERE key = ? AND lease_owner = ?",
+                       (json.dumps(result, default=_to_json), time.time(), key, owner))
+
+    def fail(self, key, owner, error):
+        """Record a failed attempt: back to pending, or failed after max_attempts"""
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' "
+                       "ELSE 'pending' END, error = ?, lease_owner = NULL, updated = ? "
+                       "WHERE key = ? AND lease_owner = ?", (error, time.time(), key, owner))
+
+    def counts(self):
+        """Number of jobs per status"""
+        with self._connect() as db:
+            return {row['status']: row['n'] for row in
+                    db.execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status')}
+
+    def jobs(self, status=None):
+        """All jobs (dicts), optionally only those with the given status"""
+        with self._connect() as db:
+            if status:
+                rows = db.execute('SELECT * FROM jobs WHERE status = ? ORDER BY created', (status,))
+            else:
+                rows = db.execute('SELECT * FROM jobs ORDER BY created')
+            return [dict(row) for row in rows]
+
+    def job(self, key):
+        """One job (dict), None if there is no job with this key"""
+        with self._connect() as db:
+            row = db.execute('SELECT * FROM jobs WHERE key = ?', (key,)).fetchone()
+            return dict(row) if row is not None else None
+
+    def results(self, keys=None):
+        """{key: result} of the done jobs (restricted to keys if given)"""
+        done = {job['key']: json.loads(job['result']) for job in self.jobs('done')}
+        return done if keys is None else {key: done[key] for key in keys if key in done}
+
+    def execute(self, job, owner):
+        """Run one claimed job in a child process, renewing its lease; returns (ok, result or error)"""
+        payload = json.loads(job['payload'])
+        limits = json.loads(job['limits'] or '{}')
+
+        resultFile = None
+        if 'cmd' in payload:
+            cmd = payload['cmd']
+        else:
+            fd, resultFile = tempfile.mkstemp(suffix='.json', prefix='job_')
+            os.close(fd)
+            cmd = [sys.executable, os.path.abspath(__file__), '--exec', job['payload'], resultFile]
+
+        try:
+            return self._run_child(job, owner, cmd, limits, payload.get('log'), resultFile)
+        finally:
+            if resultFile and os.path.exists(resultFile):
+                os.remove(resultFile)
+
+    def _run_child(self, job, owner, cmd, limits, logPath, resultFile):
+        t0 = time.time()
+        with open(logPath or os.devnull, 'a') as log:
+            posix = os.name == 'posix'
+            # Own process group, so a kill also reaches grandchildren (mpiexec and its ranks)
+            proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, start_new_session=posix)
+            # Limits set from here rather than with preexec_fn, which is unsafe with worker threads;
+            # processes the child starts later (mpiexec ranks) inherit them
+            if limits:
+                try:
+                    _set_limits(proc.pid, limits)
+                except ProcessLookupError:
+                    pass            # already exited, poll() below returns its exit code
+            lastBeat = t0
+            while proc.poll() is None:
+                time.sleep(min(POLL_SECONDS, self.lease / 4))
+                if limits.get('timeout') and time.time() - t0 > limits['timeout']:
+                    _kill(proc)
+                    return False, f"timeout after {limits['timeout']} s"
+                if time.time() - lastBeat > self.lease / 4:
+                    if not self.heartbeat(job['key'], owner):
+                        _kill(proc)
+                        return False, 'lease lost'
+                    lastBeat = time.time()
+
+        wall = time.time() - t0
+        if proc.returncode != 0:
+            return False, f"exit code {proc.returncode}"
+        if resultFile is None:
+            return True, {'wall': wall}
+        with open(resultFile) as f:
+            return True, json.load(f)
+
+    def run_workers(self, n_workers=1, verbose=True, onFinished=None):
+        """
+        Run jobs on n_workers threads (one child process each) until none is left to run.
+        onFinished(job) is called from the worker thread with every job that ends done
+        or finally failed (not on attempts that will be retried).
+        """
+        host = socket.gethostname()
+
+        def worker(i):
+            owner = f'{host}:{os.getpid()}:{i}'
+            while True:
+                job = self.claim(owner)
+                if job is None:
+                    counts = self.counts()
+                    if not counts.get('pending') and not counts.get('running'):
+                        return
+                    time.sleep(POLL_SECONDS)    # jobs leased elsewhere: wait for them or their lease
+                    continue
+                ok, value = self.execute(job, owner)
+                if ok:
+                    self.complete(job['key'], owner, value)
+                else:
+                    self.fail(job['key'], owner, value)
+                if verbose:
+                    mark = '✓' if ok else '✗'
+                    note = '' if ok else f": {value} (attempt {job['attempts'] + 1}/{job['max_attempts']})"
+                    print(f"  {mark} {job['label'] or job['key'][:12]}{note}")
+                if onFinished:
+                    finished = self.job(job['key'])
+                    if finished['status'] in ('done', 'failed'):
+                        onFinished(finished)
+
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(n_workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.counts()
+
+
+def _kill(proc):
+    """Kill a child started by _run_child together with its process group"""
+    if os.name == 'posix':
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    else:
+        proc.kill()
+    proc.wait()
+
+
+def _to_json(obj):
+    """json default for numpy arrays and scalars"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def _exec_function(payload, resultFile):
+    """Child side of a function job: import module, call function(*args), write the result"""
+    import importlib
+
+    module = importlib.import_module(payload['module'])
+    result = getattr(module, payload['function'])(*payload.get('args', []))
+    with open(resultFile, 'w') as f:
+        json.dump(result, f, default=_to_json)
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--exec':
+        _exec_function(json.loads(sys.argv[2]), sys.argv[3])
+        return
+
+    if len(sys.argv) < 2:
+        print("Usage: python job_scheduler.py <jobs.sqlite> [--retry]")
+        sys.exit(1)
+
+    jobs = JobScheduler(sys.argv[1])
+    if '--retry' in sys.argv[2:]:
+        print(f"✓ {jobs.retry_failed()} failed jobs reset to pending")
+    print(f"Jobs in {sys.argv[1]}: {jobs.counts()}")
+    for job in jobs.jobs('failed'):
+        print(f"  ✗ {job['label'] or job['key'][:12]}: {job['error']} ({job['attempts']} attempts)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+live_stats.py
+Online spike statistics during the run
+
+Every cfg.liveStatsInterval ms a CVode.event hook moves the spikes recorded
+since the previous tick (NetPyNE's pc.spike_record vectors) into a
+spike_stats.SpikeAccumulator: per-cell counts, last spike time and running
+ISI moments in preallocated arrays of length numCells. On a single rank the
+population rates of the last interval are printed at every tick; with MPI the
+ticks only accumulate locally (no collective inside the event callback) and the
+ranks are reduced once, in summary(). With cfg.keepSpikes = False the spike
+vectors are emptied after every tick, so long runs never hold or gather the
+full spike list; the end-of-run summary comes from the accumulators.
+
+Usage (after sim.create, before the run):
+    live = live_stats.LiveSpikeStats(sim, netParams)
+    sim.runSim()
+    summary = live.summary()            # collective: per-cell moments summed over ranks
+"""
+
+import numpy as np
+from neuron import h
+
+import spike_stats
+
+
+class LiveSpikeStats:
+    """Spike statistics accumulated during the run on every rank"""
+
+    def __init__(self, sim, netParams, interval=None, keepSpikes=None, verbose=True):
+        cfg = sim.cfg
+        self.sim = sim
+        self.interval = float(interval or cfg.liveStatsInterval)
+        self.keepSpikes = cfg.keepSpikes if keepSpikes is None else keepSpikes
+        self.verbose = verbose
+        self.tStart = cfg.warmupDuration if cfg.useCheckpoint else 0.0
+
+        self.pops = list(netParams.popParams)
+        self.gidPop = spike_stats.gid_pop_index(netParams)
+        self.popCells = np.bincount(self.gidPop, minlength=len(self.pops))
+        self.acc = spike_stats.SpikeAccumulator(self.gidPop, len(self.pops))
+        self._read = 0          # spikes of the record vectors already accumulated
+        self._lastTick = self.tStart
+
+        sim.fih.append(h.FInitializeHandler(1, self.restart))
+        if verbose and sim.nhosts > 1 and sim.rank == 0:
+            print("  live rates are printed with 1 rank only; spike statistics are reduced at the end")
+
+    def restart(self):
+        """Schedule the next tick from the current time (also call after a SaveState restore)"""
+        self._lastTick = max(h.t, self.tStart)
+        self.sim.cvode.event(h.t + self.interval, self._tick)
+
+    def flush(self):
+        """Accumulate the spikes recorded since the last flush; returns spikes per population"""
+        spkt = self.sim.simData['spkt']
+        spkid = self.sim.simData['spkid']
+        if len(spkt) < self._read:      # record vectors were reset (e.g. after the warm-up)
+            self._read = 0
+        t = spkt.as_numpy()[self._read:].copy()
+        gid = spkid.as_numpy()[self._read:].astype(np.int64)
+        keep = (t >= self.tStart) & (gid >= 0) & (gid < len(self.gidPop))
+        t, gid = t[keep], gid[keep]
+
+        if self.keepSpikes:
+            self._read = len(spkt)
+        else:
+            spkt.resize(0)
+            spkid.resize(0)
+            self._read = 0
+
+        # Chunks are in time order per cell, which is what the ISI moments need
+        order = np.argsort(t, kind='stable')
+        self.acc.add(t[order], gid[order])
+        return np.bincount(self.gidPop[gid], minlength=len(self.pops)).astype(float)
+
+    def _tick(self):
+        popSpikes = self.flush()
+
+        # Other ranks' spikes are not known here: live rates only on a single rank
+        window_s = (h.t - self._lastTick) / 1000.0
+        if self.verbose and self.sim.nhosts == 1 and window_s > 0:
+            rates = ', '.join(f"{pop} {popSpikes[i] / (self.popCells[i] * window_s):.2f}"
+                              for i, pop in enumerate(self.pops) if self.popCells[i])
+            print(f"  t = {h.t:.0f} ms: rates (Hz) {rates}")
+        self._lastTick = h.t
+
+        if h.t + self.interval <= self.sim.cfg.duration:
+            self.sim.cvode.event(h.t + self.interval, self._tick)
+
+    def summary(self):
+        """
+        Final flush and spike_stats.summarize() of the run, per-cell moments
+        summed over ranks (collective)
+        """
+        self.flush()
+        moments = self.acc.cell
+        if self.sim.nhosts > 1:
+            moments = spike_stats.reduce_moments(self.sim.pc, moments)
+        duration_ms = self.sim.cfg.duration - self.tStart
+        return spike_stats.summarize(moments, self.gidPop, self.pops, duration_ms)
@@ -0,0 +1,156 @@
+"""
+load_balance.py
+Compartment-complexity load balancing of gids across MPI ranks
+
+NetPyNE distributes the cells of each population round-robin, which ignores
+that HL23PV/HL23SST cells (large SWCs, nseg = 1 + 2*int(L/40)) cost several
+times more than HL23PYR/HL23VIP cells. This module estimates a cost per cell
+type, assigns gids to ranks with a longest-processing-time greedy partition,
+and reports predicted vs measured per-rank imbalance.
+
+Cost methods:
+    'segmech'  sum over sections of nseg * (1 + number of mechanisms),
+               read from netParams.cellParams (no cell instantiation)
+    'loadbal'  NEURON's LoadBalance.cell_complexity (MultiSplit-style
+               complexity) of one cell per type built by cellwrapper.py
+
+Usage (before sim.create):
+    import load_balance
+    plan = load_balance.install(netParams, cfg, sim.nhosts)
+    sim.create(netParams, cfg)
+    load_balance.uninstall()            # restore NetPyNE's distribution
+    ...
+    load_balance.report(sim, plan)      # after sim.simulate
+"""
+
+from partition_utils import imbalance, lpt_partition
+
+_original = None     # NetPyNE Pop._distributeCells while install() is active
+
+
+def segmech_complexity(cellRule):
+    """Segments x (1 + mechanisms), summed over the sections of a cellParams rule"""
+    cost = 0
+    for sec in cellRule['secs'].values():
+        nseg = sec.get('geom', {}).get('nseg', 1)
+        cost += nseg * (1 + len(sec.get('mechs', {})))
+    return cost
+
+
+def loadbal_complexity(cellName, experimentalMechComplex=False):
+    """NEURON LoadBalance complexity of one cellwrapper.py instance of cellName"""
+    from neuron import h
+    import cellwrapper
+
+    h.load_file('loadbal.hoc')
+    lb = h.LoadBalance()
+    if experimentalMechComplex:
+        lb.ExperimentalMechComplex()    # measure per-mechanism cost instead of using defaults
+
+    cell = getattr(cellwrapper, 'loadCell_' + cellName)(cellName)
+    return lb.cell_complexity(sec=cell.soma[0])
+
+
+def cell_type_costs(netParams, method='segmech'):
+    """Estimated cost of one cell of each population, keyed by population"""
+    costs = {}
+    for pop, popParams in netParams.popParams.items():
+        cellType = popParams['cellType']
+        if method == 'loadbal':
+            costs[pop] = loadbal_complexity(cellType)
+        else:
+            costs[pop] = segmech_complexity(netParams.cellParams[cellType])
+    return costs
+
+
+def balance_gids(netParams, nhosts, typeCosts):
+    """
+    Assign all cells to ranks by LPT on their type cost
+
+    Gids follow NetPyNE's creation order (populations in popParams order,
+    consecutive gids within a population). Returns a plan dict:
+        'hostCells': {pop: {rank: [cell index within pop]}}
+        'predicted': [predicted load per rank]
+    """
+    cells = []      # (pop, index within pop)
+    costs = []
+    for pop, popParams in netParams.popParams.items():
+        numCells = int(netParams.scale * popParams['numCells'])
+        cells.extend((pop, i) for i in range(numCells))
+        costs.extend([typeCosts[pop]] * numCells)
+
+    parts, loads = lpt_partition(costs, nhosts)
+
+    hostCells = {pop: {rank: [] for rank in range(nhosts)} for pop in netParams.popParams}
+    for rank, part in enumerate(parts):
+        for idx in part:
+            pop, i = cells[idx]
+            hostCells[pop][rank].append(i)
+    for pop in hostCells:
+        for rank in hostCells[pop]:
+            hostCells[pop][rank].sort()
+
+    return {'hostCells': hostCells, 'predicted': loads, 'typeCosts': typeCosts}
+
+
+def round_robin_loads(netParams, nhosts, typeCosts):
+    """Per-rank load of NetPyNE's default round-robin distribution (for comparison)"""
+    loads = [0] * nhosts
+    nextHost = 0
+    for pop, popParams in netParams.popParams.items():
+        for _ in range(int(netParams.scale * popParams['numCells'])):
+            loads[nextHost] += typeCosts[pop]
+            nextHost = (nextHost + 1) % nhosts
+    return loads
+
+
+def install(netParams, cfg, nhosts, method=None):
+    """
+    Replace NetPyNE's round-robin cell distribution with the balanced plan.
+    Must be called before sim.create, and undone with uninstall() after it.
+    Returns the plan.
+    """
+    global _original
+    from netpyne.network.pop import Pop
+
+    method = method or cfg.loadBalance
+    typeCosts = cell_type_costs(netParams, method)
+    plan = balance_gids(netParams, nhosts, typeCosts)
+    plan['roundRobin'] = round_robin_loads(netParams, nhosts, typeCosts)
+
+    def _distributeCells(self, numCellsPop):
+        return plan['hostCells'][self.tags['pop']]
+
+    if _original is None:
+        _original = Pop._distributeCells
+    Pop._distributeCells = _distributeCells
+    return plan
+
+
+def uninstall():
+    """Restore NetPyNE's own cell distribution (after sim.create)"""
+    global _original
+    from netpyne.network.pop import Pop
+
+    if _original is not None:
+        Pop._distributeCells = _original
+        _original = None
+
+
+def report(sim, plan):
+    """Print predicted vs measured per-rank imbalance (rank 0); returns the measured loads"""
+    # Integration time excluding spike-exchange waits, per rank
+    measured = sim.pc.py_allgather(sim.pc.step_time())
+
+    if sim.rank == 0:
+        print("\n" + "="*70)
+        print("LOAD BALANCE")
+        print("="*70)
+        print(f"Cell type costs: {plan['typeCosts']}")
+        print(f"Predicted imbalance (max/mean): balanced {imbalance(plan['predicted']):.3f}, "
+              f"round-robin {imbalance(plan['roundRobin']):.3f}")
+        print(f"Measured imbalance (max/mean step time): {imbalance(measured):.3f}")
+        print(f"{'rank':>6} {'predicted':>10} {'measured (s)':>13}")
+        for rank, (pred, meas) in enumerate(zip(plan['predicted'], measured)):
+            print(f"{rank:>6} {pred:>10.0f} {meas:>13.3f}")
+    return measured
@@ -7,6 +7,7 @@ NEURON	{
 	SUFFIX Ca_LVA
 	USEION ca READ eca WRITE ica
 	RANGE gbar, g, ica
+	THREADSAFE
 }
 
 UNITS	{
@@ -95,7 +95,7 @@ NEURON {
 	RANGE new_seed
 	NONSPECIFIC_CURRENT i
 	THREADSAFE
-    POINTER donotuse
+    BBCOREPOINTER donotuse
 }
 
 UNITS {
@@ -134,9 +134,23 @@ ASSIGNED {
 	amp_e	(umho)
 	amp_i	(umho)
     donotuse
+    usingR123
 }
 
+VERBATIM
+#ifndef CORENEURON_BUILD
+#include "nrnran123.h"
+double nrn_random_pick(void* r);
+void* nrn_random_arg(int argpos);
+#endif
+ENDVERBATIM
+
 INITIAL {
+VERBATIM
+	if (usingR123) {
+		nrnran123_setseq((nrnran123_State*)_p_donotuse, 0, 0);
+	}
+ENDVERBATIM
 	g_e1 = 0
 	g_i1 = 0
 	if(tau_e != 0) {
@@ -178,19 +192,21 @@ PROCEDURE oup() {		: use grand()
 
 
 PROCEDURE new_seed(seed) {		: procedure to set the seed
-	set_seed(seed)
 	VERBATIM
+#ifndef CORENEURON_BUILD
+	  set_seed(_lseed);
 	  printf("Setting random generator with seed = %g\n", _lseed);
+#endif
 	ENDVERBATIM
 }
 
-VERBATIM
-double nrn_random_pick(void* r);
-void* nrn_random_arg(int argpos);
-ENDVERBATIM
-
 FUNCTION grand() {
 VERBATIM
+    if (usingR123) {
+        /* per-instance Random123 stream: thread safe and CoreNEURON compatible */
+        return nrnran123_normal((nrnran123_State*)_p_donotuse);
+    }
+#ifndef CORENEURON_BUILD
     if (_p_donotuse) {
         /*
          : Supports separate independent but reproducible streams for
@@ -201,29 +217,103 @@ VERBATIM
     }else{
         /* only can be used in main thread */
         if (_nt != nrn_threads) {
-hoc_execerror("multithread random in InUnif"," only via hoc Random");
+hoc_execerror("multithread random in InUnif"," only via hoc Random or noiseFromRandom123");
         }
-ENDVERBATIM
-        : the old standby. Cannot use if reproducible parallel sim
-        : independent of nhost or which host this instance is on
-        : is desired, since each instance on this cpu draws from
-        : the same stream
-        grand = normrand(0,1)
-VERBATIM
+        /* the old standby. Cannot use if reproducible parallel sim
+         * independent of nhost or which host this instance is on
+         * is desired, since each instance on this cpu draws from
+         * the same stream
+         */
+        _lgrand = normrand(0.0, 1.0);
     }
+#endif
 ENDVERBATIM
 }
 
 PROCEDURE noiseFromRandom() {
 VERBATIM
+#ifndef CORENEURON_BUILD
  {
     void** pv = (void**)(&_p_donotuse);
+    if (usingR123 && _p_donotuse) {
+        nrnran123_deletestream((nrnran123_State*)_p_donotuse);
+    }
+    usingR123 = 0;
     if (ifarg(1)) {
         *pv = nrn_random_arg(1);
     }else{
         *pv = (void*)0;
     }
  }
+#endif
+ENDVERBATIM
+}
+
+PROCEDURE noiseFromRandom123() {	: noiseFromRandom123(id1, id2, id3): per-instance Random123 stream
+VERBATIM
+#ifndef CORENEURON_BUILD
+ {
+    void** pv = (void**)(&_p_donotuse);
+    uint32_t id2 = ifarg(2) ? (uint32_t)*getarg(2) : 0;
+    uint32_t id3 = ifarg(3) ? (uint32_t)*getarg(3) : 0;
+    if (usingR123 && _p_donotuse) {
+        nrnran123_deletestream((nrnran123_State*)_p_donotuse);
+    }
+    *pv = (void*)nrnran123_newstream3((uint32_t)*getarg(1), id2, id3);
+    usingR123 = 1;
+ }
+#endif
+ENDVERBATIM
+}
+
+FUNCTION rngSeq() {	: position of the Random123 stream (as Random.seq()), -1 without noiseFromRandom123(id1, id2, id3)
+VERBATIM
+    _lrngSeq = -1;
+#ifndef CORENEURON_BUILD
+    if (usingR123 && _p_donotuse) {
+        uint32_t seq;
+        char which;
+        nrnran123_getseq((nrnran123_State*)_p_donotuse, &seq, &which);
+        _lrngSeq = (double)seq * 4 + which;
+    }
+#endif
+ENDVERBATIM
+}
+
+PROCEDURE setRngSeq(seq) {	: restore a position returned by rngSeq() (e.g. after SaveState.restore)
+VERBATIM
+#ifndef CORENEURON_BUILD
+    if (usingR123 && _p_donotuse && _lseq >= 0) {
+        nrnran123_setseq((nrnran123_State*)_p_donotuse, (uint32_t)(_lseq / 4), (char)((uint64_t)_lseq % 4));
+    }
+#endif
 ENDVERBATIM
 }
 
+VERBATIM
+/* Serialize the Random123 stream identifiers and sequence position for CoreNEURON (5 ints per instance) */
+static void bbcore_write(double* x, int* d, int* xx, int* offset, _threadargsproto_) {
+    if (d) {
+        uint32_t* di = ((uint32_t*)d) + *offset;
+        if (!usingR123 || !_p_donotuse) {
+            hoc_execerror("Gfluct2: CoreNEURON requires noiseFromRandom123(id1, id2, id3)", 0);
+        }
+        nrnran123_State** pv = (nrnran123_State**)(&_p_donotuse);
+        char which;
+        nrnran123_getids3(*pv, di, di + 1, di + 2);
+        nrnran123_getseq(*pv, di + 3, &which);
+        di[4] = (int)which;
+    }
+    *offset += 5;
+}
+
+static void bbcore_read(double* x, int* d, int* xx, int* offset, _threadargsproto_) {
+    uint32_t* di = ((uint32_t*)d) + *offset;
+    nrnran123_State** pv = (nrnran123_State**)(&_p_donotuse);
+    *pv = nrnran123_newstream3(di[0], di[1], di[2]);
+    nrnran123_setseq(*pv, di[3], (char)di[4]);
+    usingR123 = 1;
+    *offset += 5;
+}
+ENDVERBATIM
+
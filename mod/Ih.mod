@@ -5,6 +5,7 @@ NEURON	{
 	SUFFIX Ih
 	NONSPECIFIC_CURRENT ihcn
 	RANGE gbar, g, ihcn, shift1, shift2, shift3, shift4, shift5, shift6
+	THREADSAFE
 }
 
 UNITS	{
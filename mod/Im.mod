@@ -5,6 +5,7 @@ NEURON	{
 	SUFFIX Im
 	USEION k READ ek WRITE ik
 	RANGE gbar, g, ik
+	THREADSAFE
 }
 
 UNITS	{
@@ -8,6 +8,7 @@ NEURON	{
 	SUFFIX K_P
 	USEION k READ ek WRITE ik
 	RANGE gbar, g, ik
+	THREADSAFE
 }
 
 UNITS	{
@@ -7,6 +7,7 @@ NEURON	{
 	SUFFIX K_T
 	USEION k READ ek WRITE ik
 	RANGE gbar, g, ik
+	THREADSAFE
 }
 
 UNITS	{
@@ -5,6 +5,7 @@ NEURON	{
 	SUFFIX Kv3_1
 	USEION k READ ek WRITE ik
 	RANGE gbar, g, ik 
+	THREADSAFE
 }
 
 UNITS	{
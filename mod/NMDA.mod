@@ -17,6 +17,7 @@ NEURON {
         RANGE Use
         RANGE i,  i_NMDA,  g_NMDA, e, gmax
         NONSPECIFIC_CURRENT i
+        THREADSAFE
 }
 
 PARAMETER {
@@ -29,7 +30,6 @@ PARAMETER {
 
         e = 0     (mV)  : AMPA and NMDA reversal potential
 	    mg = 1   (mM)  : initial concentration of mg2+
-        mggate
     	:gmax = .001 (uS) :1nS weight conversion factor (from nS to uS)
     	u0 = 0 :initial value of u, which is the running value of Use
 }
@@ -45,6 +45,7 @@ ENDCOMMENT
 ASSIGNED {
 
         v (mV)
+        mggate
         i (nA)
 	i_NMDA (nA)
 	g_NMDA (uS)
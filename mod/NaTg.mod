@@ -4,6 +4,7 @@ NEURON	{
 	SUFFIX NaTg
 	USEION na READ ena WRITE ina
 	RANGE gbar, g, ina, vshifth, vshiftm, slopeh, slopem
+	THREADSAFE
 }
 
 UNITS	{
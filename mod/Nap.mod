@@ -7,6 +7,7 @@ NEURON	{
 	SUFFIX Nap
 	USEION na READ ena WRITE ina
 	RANGE gbar, g, ina
+	THREADSAFE
 }
 
 UNITS	{
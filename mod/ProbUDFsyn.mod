@@ -17,7 +17,8 @@ NEURON {
         RANGE Use, u, Dep, Fac, u0
         RANGE i, g, e, gmax
         NONSPECIFIC_CURRENT i
-	POINTER rng
+	BBCOREPOINTER rng
+        THREADSAFE
 }
 
 PARAMETER {
@@ -43,8 +44,11 @@ VERBATIM
 #include<stdio.h>
 #include<math.h>
 
+#ifndef CORENEURON_BUILD
+#include "nrnran123.h"
 double nrn_random_pick(void* r);
 void* nrn_random_arg(int argpos);
+#endif
 
 ENDVERBATIM
   
@@ -56,6 +60,7 @@ ASSIGNED {
 	g (uS)
         factor
 	rng
+	usingR123
 	weight_NMDA
 }
 
@@ -67,6 +72,12 @@ STATE {
 INITIAL{
 
   LOCAL tp
+
+VERBATIM
+        if (usingR123) {
+                nrnran123_setseq((nrnran123_State*)_p_rng, 0, 0);
+        }
+ENDVERBATIM
         
 	A = 0
   B = 0
@@ -129,19 +140,31 @@ NET_RECEIVE (weight, Pv, Pv_tmp, Pr, u, tsyn (ms)){
 
 PROCEDURE setRNG() {
 VERBATIM
+#ifndef CORENEURON_BUILD
     {
         /**
-         * This function takes a NEURON Random object declared in hoc and makes it usable by this mod file.
-         * Note that this method is taken from Brett paper as used by netstim.hoc and netstim.mod
-         * which points out that the Random must be in negexp(1) mode
+         * setRNG(id1, id2, id3): per-instance Random123 stream (thread safe, CoreNEURON compatible)
+         * setRNG(hocRandom):     NEURON Random object, which MUST be in negexp(1) mode
+         *                        (method from Brett paper as used by netstim.hoc and netstim.mod)
+         * setRNG():              clear, fall back to the global exprand stream (main thread only)
          */
         void** pv = (void**)(&_p_rng);
-        if( ifarg(1)) {
+        if (usingR123 && _p_rng) {
+            nrnran123_deletestream((nrnran123_State*)_p_rng);
+        }
+        usingR123 = 0;
+        if (ifarg(1) && hoc_is_double_arg(1)) {
+            uint32_t id2 = ifarg(2) ? (uint32_t)*getarg(2) : 0;
+            uint32_t id3 = ifarg(3) ? (uint32_t)*getarg(3) : 0;
+            *pv = (void*)nrnran123_newstream3((uint32_t)*getarg(1), id2, id3);
+            usingR123 = 1;
+        } else if (ifarg(1)) {
             *pv = nrn_random_arg(1);
         } else {
             *pv = (void*)0;
         }
     }
+#endif
 ENDVERBATIM
 }
 
@@ -149,6 +172,10 @@ FUNCTION erand() {
 VERBATIM
 	    //FILE *fi;
         double value;
+        if (usingR123) {
+                return nrnran123_negexp((nrnran123_State*)_p_rng);
+        }
+#ifndef CORENEURON_BUILD
         if (_p_rng) {
                 /*
                 :Supports separate independent but reproducible streams for
@@ -161,22 +188,71 @@ VERBATIM
                 //printf("random stream for this simulation = %lf\n",value);
                 return value;
         }else{
-ENDVERBATIM
-                : the old standby. Cannot use if reproducible parallel sim
-                : independent of nhost or which host this instance is on
-                : is desired, since each instance on this cpu draws from
-                : the same stream
-                erand = exprand(1)
-VERBATIM
+                /* only can be used in main thread */
+                if (_nt != nrn_threads) {
+hoc_execerror("ProbUDFsyn: multithread random requires setRNG(id1, id2, id3) or a hoc Random", 0);
+                }
+                /* the old standby. Cannot use if reproducible parallel sim
+                 * independent of nhost or which host this instance is on
+                 * is desired, since each instance on this cpu draws from
+                 * the same stream
+                 */
+                return exprand(1.0);
         }
+#endif
 ENDVERBATIM
         :erand = value :This line must have been a mistake in Hay et al.'s code, it would basically set the return value to a non-initialized double value.
                        :The reason it sometimes works could be that the memory allocated for the non-initialized happened to contain the random value
                        :previously generated (or if _p_rng is always a null pointer). However, here we commented this line out.
 }
 
+FUNCTION rngSeq() {	: position of the Random123 stream (as Random.seq()), -1 without setRNG(id1, id2, id3)
+VERBATIM
+        _lrngSeq = -1;
+#ifndef CORENEURON_BUILD
+        if (usingR123 && _p_rng) {
+                uint32_t seq;
+                char which;
+                nrnran123_getseq((nrnran123_State*)_p_rng, &seq, &which);
+                _lrngSeq = (double)seq * 4 + which;
+        }
+#endif
+ENDVERBATIM
+}
 
+PROCEDURE setRngSeq(seq) {	: restore a position returned by rngSeq() (e.g. after SaveState.restore)
+VERBATIM
+#ifndef CORENEURON_BUILD
+        if (usingR123 && _p_rng && _lseq >= 0) {
+                nrnran123_setseq((nrnran123_State*)_p_rng, (uint32_t)(_lseq / 4), (char)((uint64_t)_lseq % 4));
+        }
+#endif
+ENDVERBATIM
+}
 
+VERBATIM
+/* Serialize the Random123 stream identifiers and sequence position for CoreNEURON (5 ints per instance) */
+static void bbcore_write(double* x, int* d, int* xx, int* offset, _threadargsproto_) {
+        if (d) {
+                uint32_t* di = ((uint32_t*)d) + *offset;
+                if (!usingR123 || !_p_rng) {
+                        hoc_execerror("ProbUDFsyn: CoreNEURON requires setRNG(id1, id2, id3) (Random123)", 0);
+                }
+                nrnran123_State** pv = (nrnran123_State**)(&_p_rng);
+                char which;
+                nrnran123_getids3(*pv, di, di + 1, di + 2);
+                nrnran123_getseq(*pv, di + 3, &which);
+                di[4] = (int)which;
+        }
+        *offset += 5;
+}
 
-
-
+static void bbcore_read(double* x, int* d, int* xx, int* offset, _threadargsproto_) {
+        uint32_t* di = ((uint32_t*)d) + *offset;
+        nrnran123_State** pv = (nrnran123_State**)(&_p_rng);
+        *pv = nrnran123_newstream3(di[0], di[1], di[2]);
+        nrnran123_setseq(*pv, di[3], (char)di[4]);
+        usingR123 = 1;
+        *offset += 5;
+}
+ENDVERBATIM
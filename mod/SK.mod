@@ -6,6 +6,7 @@ NEURON {
        USEION k READ ek WRITE ik
        USEION ca READ cai
        RANGE gbar, g, ik
+       THREADSAFE
 }
 
 UNITS {
@@ -20,6 +20,7 @@ NEURON {
 	POINT_PROCESS epsp
 	RANGE onset, tau0, tau1, imax, i, myv
 	NONSPECIFIC_CURRENT i
+	THREADSAFE
 }
 UNITS {
 	(nA) = (nanoamp)
@@ -37,11 +38,6 @@ PARAMETER {
 
 ASSIGNED { i (nA)  myv (mV)}
 
-LOCAL   a[2]
-LOCAL   tpeak
-LOCAL   adjust
-LOCAL   amp
-
 BREAKPOINT {
 	myv = v
         i = curr(t)
@@ -56,14 +52,15 @@ FUNCTION myexp(x) {
 }
 
 FUNCTION curr(x) {				
+	LOCAL a0, a1, tpeak, adjust, amp	: function locals, not shared file-scope statics (THREADSAFE)
 	tpeak=tau0*tau1*log(tau0/tau1)/(tau0-tau1)
 	adjust=1/((1-myexp(-tpeak/tau0))-(1-myexp(-tpeak/tau1)))
 	amp=adjust*imax
 	if (x < onset) {
 		curr = 0
 	}else{
-		a[0]=1-myexp(-(x-onset)/tau0)
-		a[1]=1-myexp(-(x-onset)/tau1)
-		curr = -amp*(a[0]-a[1])
+		a0=1-myexp(-(x-onset)/tau0)
+		a1=1-myexp(-(x-onset)/tau1)
+		curr = -amp*(a0-a1)
 	}
 }
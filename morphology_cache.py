@@ -0,0 +1,151 @@
+"""
+morphology_cache.py
+Compiled morphology cache for the HOC cell templates
+
+NeuronTemplate*.hoc builds each cell by parsing its SWC file with Import3d,
+setting nseg (geom_nseg) and replacing the axon. The resulting section tree
+(topology, 3D points, diameters, nseg, section lists) is stored once in
+.cache/morphologies/<cell>_<hash>.npz, keyed by the template and SWC contents.
+Later instantiations call the template with its cache flag (init($s1, 1)), which
+skips the SWC import, and rebuild the sections straight from the .npz.
+"""
+
+import os
+import re
+
+import numpy as np
+from neuron import h
+
+from cache_utils import cache_path, hash_files
+
+SECTION_ARRAYS = ['soma', 'dend', 'apic', 'axon', 'myelin']
+SECTION_LISTS = ['all', 'somatic', 'basal', 'apical', 'axonal']
+CELL_SCALARS = ['pA', 'nSecAll', 'nSecSoma', 'nSecApical', 'nSecBasal']
+
+_SEC_NAME = re.compile(r'\.(\w+)\[(\d+)\]$')
+
+
+def _cell_sections(cell):
+    """Sections owned by a template instance, as {name: (array, index, section)}"""
+
+    secs = {}
+    for sec in h.allsec():
+        if sec.cell() == cell:
+            array, index = _SEC_NAME.search(sec.name()).groups()
+            secs[sec.name()] = (array, int(index), sec)
+    return secs
+
+
+def save_morphology(cell, path):
+    """Store the instantiated section tree of `cell` in an .npz file"""
+
+    secs = _cell_sections(cell)
+    names = sorted(secs, key=lambda n: (SECTION_ARRAYS.index(secs[n][0]), secs[n][1]))
+    sec_id = {name: i for i, name in enumerate(names)}
+
+    array = np.array([SECTION_ARRAYS.index(secs[n][0]) for n in names], dtype=np.int32)
+    index = np.array([secs[n][1] for n in names], dtype=np.int32)
+    nseg = np.array([secs[n][2].nseg for n in names], dtype=np.int32)
+    length = np.array([secs[n][2].L for n in names])
+    parent = np.full(len(names), -1, dtype=np.int32)
+    parent_x = np.zeros(len(names))
+    orientation = np.zeros(len(names))
+
+    n3d = np.zeros(len(names), dtype=np.int32)
+    pt3d = []
+    seg_diam = []   # per-segment diameters of sections without 3D points
+    for i, name in enumerate(names):
+        sec = secs[name][2]
+        pseg = sec.parentseg()
+        if pseg is not None:
+            parent[i] = sec_id[pseg.sec.name()]
+            parent_x[i] = pseg.x
+            orientation[i] = sec.orientation()
+        n3d[i] = sec.n3d()
+        for j in range(sec.n3d()):
+            pt3d.append((sec.x3d(j), sec.y3d(j), sec.z3d(j), sec.diam3d(j)))
+        if sec.n3d() == 0:
+            seg_diam.extend(seg.diam for seg in sec)
+
+    arrays = {
+        'array': array, 'index': index, 'nseg': nseg, 'L': length,
+        'parent': parent, 'parent_x': parent_x, 'orientation': orientation,
+        'n3d': n3d, 'pt3d': np.array(pt3d).reshape(-1, 4), 'seg_diam': np.array(seg_diam),
+        'scalars': np.array([getattr(cell, key) for key in CELL_SCALARS]),
+    }
+    for list_name in SECTION_LISTS:
+        arrays['list_' + list_name] = np.array(
+            [sec_id[sec.name()] for sec in getattr(cell, list_name)], dtype=np.int32)
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_morphology(cell, path):
+    """Rebuild the section tree of a template instance created with init(morph, 1)"""
+
+    data = np.load(path, allow_pickle=False)
+    array, index = data['array'], data['index']
+
+    # Create the section arrays inside the template instance
+    for a, array_name in enumerate(SECTION_ARRAYS):
+        count = int(index[array == a].max()) + 1 if np.any(array == a) else 0
+        if count > 0:
+            h.execute(f'create {array_name}[{count}]', cell)
+    secs = [getattr(cell, SECTION_ARRAYS[a])[int(i)] for a, i in zip(array, index)]
+
+    # Geometry
+    pt3d = data['pt3d']
+    seg_diam = data['seg_diam']
+    p, d = 0, 0
+    for i, sec in enumerate(secs):
+        sec.pt3dclear()
+        n = int(data['n3d'][i])
+        if n > 0:
+            for x, y, z, diam in pt3d[p:p+n]:
+                sec.pt3dadd(x, y, z, diam)
+            p += n
+        else:
+            sec.L = data['L'][i]
+        sec.nseg = int(data['nseg'][i])
+        if n == 0:
+            for seg in sec:
+                seg.diam = seg_diam[d]
+                d += 1
+
+    # Topology
+    for i, sec in enumerate(secs):
+        if data['parent'][i] >= 0:
+            sec.connect(secs[data['parent'][i]](data['parent_x'][i]), data['orientation'][i])
+
+    # Section lists (in their original order) and template scalars
+    for list_name in SECTION_LISTS:
+        sec_list = getattr(cell, list_name)
+        for i in data['list_' + list_name]:
+            sec_list.append(sec=secs[i])
+    for key, value in zip(CELL_SCALARS, data['scalars']):
+        setattr(cell, key, float(value))
+
+    cell.soma[0](0.5).area()  # make sure diam reflects 3d points
+
+
+def instantiate(templateName, templatepath, morphpath):
+    """
+    Create a template instance for `morphpath`, from the morphology cache when
+    available; on a cache miss the SWC is imported normally and then cached.
+    """
+
+    key = hash_files([templatepath, morphpath])[:16]
+    cellName = os.path.splitext(os.path.basename(morphpath))[0]
+    path = cache_path('morphologies', f'{cellName}_{key}.npz')
+
+    if os.path.exists(path):
+        cell = getattr(h, templateName)(morphpath, 1)
+        load_morphology(cell, path)
+    else:
+        cell = getattr(h, templateName)(morphpath)
+        save_morphology(cell, path)
+
+    return cell
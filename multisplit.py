@@ -0,0 +1,212 @@
+"""
+multisplit.py
+Optional multisplit of the largest cells (HL23PV/HL23SST) across MPI ranks
+
+When the rank count approaches the cell count, a single large interneuron
+becomes the critical path. This module moves the largest soma-attached
+subtrees of those cells to helper ranks and joins the pieces back together
+with ParallelContext.multisplit, so strong scaling can go past one cell per
+rank.
+
+For each split cell:
+    - all pieces meet at one split node, the soma end of the largest subtree:
+      only subtrees attached there are moved, and every piece (owner and
+      helpers) has exactly one split point, sharing the cell's sid
+    - the owner rank (NetPyNE's) keeps the soma, the spike source gid and the
+      remaining subtrees
+    - each moved subtree is created on a helper rank from the NetPyNE cell rule
+      (netParams.cellParams), with only the sections of that subtree
+    - synapses on the moved subtree are recreated on the helper rank with the
+      same synMech, location, weight and delay; NetStim inputs are given a
+      gid on the owner rank so they can drive the remote synapse
+
+Helper ranks are chosen greedily by segment load. Multisplit is fixed-step,
+NEURON-only (no CoreNEURON, no threads).
+
+Usage (after sim.create, before sim.simulate):
+    import multisplit
+    multisplit.setup(sim, netParams, cfg)
+
+check_multisplit.py compares the spike times of a multisplit run with a
+single-rank run of the same network.
+"""
+
+from neuron import h
+
+_pieces = []    # helper-rank cells, synapses and NetCons (kept alive for the run)
+_sources = []   # owner-rank NetCons registering NetStims as spike sources
+
+
+def _somaName(cell):
+    return 'soma_0' if 'soma_0' in cell.secs else next(name for name in cell.secs if 'soma' in name)
+
+
+def soma_subtrees(cell):
+    """
+    Subtrees attached to the soma of a NetPyNE cell, largest first:
+        [(rootName, parentx, [section names], nseg), ...]
+    """
+    secName = {sec['hObj']: name for name, sec in cell.secs.items() if 'hObj' in sec}
+    soma = cell.secs[_somaName(cell)]['hObj']
+
+    subtrees = []
+    for child in soma.children():
+        sl = h.SectionList()
+        sl.subtree(sec=child)
+        names = [secName[sec] for sec in sl]
+        nseg = sum(sec.nseg for sec in sl)
+        subtrees.append((secName[child], child.parentseg().x, names, nseg))
+    subtrees.sort(key=lambda subtree: subtree[3], reverse=True)
+    return subtrees
+
+
+def plan_splits(cellInfo, rankLoads, nPieces):
+    """
+    Assign the moved subtrees of every split cell to helper ranks
+
+    cellInfo:  [(gid, pop, owner, [(rootName, parentx, names, nseg), ...]), ...] (all ranks)
+    rankLoads: segments per rank before splitting
+    Returns [(sid, gid, pop, owner, helper, rootName, parentx, names), ...],
+    identical on every rank.
+
+    Each cell is split at a single node, the soma end (parentx) of its largest
+    subtree, so only the subtrees attached at that node are candidates; every
+    helper gets one subtree, and all pieces of a cell share one sid.
+    """
+    nhost = len(rankLoads)
+    loads = list(rankLoads)
+    splits = []
+    sid = 0
+    for gid, pop, owner, subtrees in sorted(cellInfo):
+        if not subtrees:
+            continue
+        splitx = subtrees[0][1]
+        used = {owner}
+        for rootName, parentx, names, nseg in [s for s in subtrees if s[1] == splitx][:nPieces - 1]:
+            candidates = [(loads[rank], rank) for rank in range(nhost) if rank not in used]
+            if not candidates:
+                break
+            _, helper = min(candidates)
+            used.add(helper)
+            loads[owner] -= nseg
+            loads[helper] += nseg
+            splits.append((sid, gid, pop, owner, helper, rootName, parentx, names))
+        if len(used) > 1:
+            sid += 1
+    return splits
+
+
+def _detach_piece(sim, cell, names, nextGid):
+    """
+    Owner side: remove the subtree sections (and their synapses) from cell.
+    Returns the connection specs to recreate on the helper rank.
+    """
+    moved = set(names)
+    conns = []
+    for conn in cell.conns:
+        if conn.get('sec') not in moved or not conn.get('hObj'):
+            continue
+        nc = conn['hObj']
+        preGid = conn['preGid']
+        if preGid == 'NetStim':
+            # Give the local NetStim a gid so the remote synapse can receive its events
+            preGid = next(nextGid)
+            sim.pc.set_gid2node(preGid, sim.rank)
+            source = h.NetCon(nc.pre(), None)
+            sim.pc.cell(preGid, source)
+            _sources.append(source)
+        conns.append({'preGid': preGid, 'sec': conn['sec'], 'loc': conn['loc'],
+                      'synMech': conn['synMech'], 'weight': nc.weight[0], 'delay': nc.delay})
+        conn['hObj'] = None
+
+    for name in names:
+        sec = cell.secs.pop(name)
+        h.delete_section(sec=sec['hObj'])
+    return conns
+
+
+def _build_piece(sim, netParams, piece):
+    """Helper side: create the subtree sections from the cell rule and reconnect its synapses"""
+    from netpyne.cell import CompartCell
+
+    # Only the moved sections, with the root detached from the (remote) soma
+    cellType = piece['tags']['cellType']
+    ruleSecs = netParams.cellParams[cellType]['secs']
+    secs = {name: {key: value for key, value in ruleSecs[name].items()
+                   if not (name == piece['rootName'] and key == 'topol')}
+            for name in piece['names']}
+
+    cell = CompartCell(piece['gid'], dict(piece['tags']), create=False, associateGid=False)
+    cell.createPyStruct({'secs': secs})
+    cell.createNEURONObj({'secs': secs}, cellType)
+    byName = {name: sec['hObj'] for name, sec in cell.secs.items()}
+
+    root = byName[piece['rootName']]
+    sim.pc.multisplit(root.orientation(), piece['sid'], sec=root)
+
+    objs = [cell]
+    for conn in piece['conns']:
+        synParams = netParams.synMechParams[conn['synMech']]
+        syn = getattr(h, synParams['mod'])(byName[conn['sec']](conn['loc']))
+        for param, value in synParams.items():
+            if param != 'mod':
+                setattr(syn, param, value)
+        nc = sim.pc.gid_connect(conn['preGid'], syn)
+        nc.weight[0] = conn['weight']
+        nc.delay = conn['delay']
+        objs.extend([syn, nc])
+    _pieces.append(objs)
+
+
+def setup(sim, netParams, cfg, pops=None, nPieces=None):
+    """Split the cells of cfg.multisplitPops into cfg.multisplitPieces pieces across ranks"""
+    pops = pops or cfg.multisplitPops
+    nPieces = nPieces or cfg.multisplitPieces
+    nhost = sim.nhosts
+
+    if nhost < 2 or nPieces < 2:
+        if sim.rank == 0:
+            print("⚠ multisplit needs at least 2 ranks and 2 pieces, skipping")
+        return []
+    if cfg.nthreads > 1:
+        raise ValueError("cfg.multisplit does not support cfg.nthreads > 1")
+
+    # Gather split candidates and per-rank segment loads from all ranks
+    cellByGid = {cell.gid: cell for cell in sim.net.cells if cell.secs}
+    localInfo = [(gid, cell.tags['pop'], sim.rank, soma_subtrees(cell))
+                 for gid, cell in cellByGid.items() if cell.tags['pop'] in pops]
+    localLoad = sum(sec['hObj'].nseg for cell in cellByGid.values() for sec in cell.secs.values())
+    cellInfo = [info for rankInfo in sim.pc.py_allgather(localInfo) for info in rankInfo]
+    rankLoads = sim.pc.py_allgather(localLoad)
+
+    splits = plan_splits(cellInfo, rankLoads, nPieces)
+
+    # Owner side: detach the subtrees, split once at the soma node, send the pieces to their helpers
+    virtualGids = iter(range(sim.net.lastGid + sim.rank, 2**31 - 1, nhost))
+    outgoing = [[] for _ in range(nhost)]
+    splitSids = set()
+    for sid, gid, pop, owner, helper, rootName, parentx, names in splits:
+        if owner != sim.rank:
+            continue
+        cell = cellByGid[gid]
+        conns = _detach_piece(sim, cell, names, virtualGids)
+        if sid not in splitSids:
+            soma = cell.secs[_somaName(cell)]['hObj']
+            sim.pc.multisplit(parentx, sid, sec=soma)
+            splitSids.add(sid)
+        outgoing[helper].append({'sid': sid, 'gid': gid, 'pop': pop, 'tags': dict(cell.tags),
+                                 'rootName': rootName, 'names': names, 'conns': conns})
+
+    # Helper side: create the received pieces
+    incoming = sim.pc.py_alltoall(outgoing)
+    for pieces in incoming:
+        for piece in pieces:
+            _build_piece(sim, netParams, piece)
+
+    sim.pc.multisplit()     # finish the multisplit setup on all ranks
+    sim.pc.set_maxstep(10)
+
+    if sim.rank == 0:
+        print(f"✓ multisplit: {len(splits)} subtrees of {len({s[1] for s in splits})} cells "
+              f"({', '.join(pops)}) moved to helper ranks")
+    return splits
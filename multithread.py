@@ -0,0 +1,46 @@
+"""
+multithread.py
+Threaded integration for the Yao L2/3 microcircuit
+
+Splits the cells of each rank over cfg.nthreads NEURON threads
+(ParallelContext.nthread), assigning whole cells to threads with a
+longest-processing-time greedy partition weighted by compartment count.
+Requires all mechanisms in mod/ to be THREADSAFE.
+
+Usage (after sim.create, before sim.simulate):
+    import multithread
+    multithread.setup_threads(sim, cfg.nthreads)
+"""
+
+from neuron import h
+
+from partition_utils import imbalance, lpt_partition
+
+
+def cell_nseg(cell):
+    """Number of compartments (segments) of a NetPyNE cell; 0 for point cells"""
+    return sum(sec['hObj'].nseg for sec in cell.secs.values() if 'hObj' in sec)
+
+
+def setup_threads(sim, nthreads, cost=cell_nseg, verbose=True):
+    """
+    Enable nthreads NEURON threads on this rank and assign whole cells to
+    threads by LPT on cost(cell). Returns the per-thread loads.
+    """
+    sim.pc.nthread(nthreads)
+
+    cells = [cell for cell in sim.net.cells if cell.secs]
+    costs = [cost(cell) for cell in cells]
+    parts, loads = lpt_partition(costs, nthreads)
+
+    for thread, part in enumerate(parts):
+        roots = h.SectionList()
+        for idx in part:
+            anySec = next(iter(cells[idx].secs.values()))['hObj']
+            roots.append(sec=h.SectionRef(sec=anySec).root)
+        sim.pc.partition(thread, roots)
+
+    if verbose and sim.rank == 0:
+        print(f"✓ {nthreads} threads on rank 0: {len(cells)} cells, "
+              f"load per thread {loads}, imbalance {imbalance(loads):.3f}")
+    return loads
@@ -0,0 +1,217 @@
+"""
+network_metrics.py
+Windowed rates and synchrony metrics of the Yao L2/3 microcircuit
+
+Bins the spike raster into per-cell spike counts in uniform time bins and
+derives all metrics from them for every population:
+
+    rate_t       population rate per bin (Hz)
+    count_corr   mean pairwise Pearson correlation of the binned spike
+                 counts of the active cells (exact, without the n x n matrix)
+    fano         Fano factor of the population spike count per bin
+    fano_cell    mean single-cell Fano factor
+    golomb_chi   Golomb synchrony: sqrt(var(pop mean count) / mean(cell count var))
+
+The counts are kept sparse: only the (cell, bin) pairs that received a spike
+are stored (np.unique of the flat cell * nBins + bin index), so memory grows
+with the number of spikes, not with cells x bins, and the metrics are computed
+from per-cell sums and per-population count vectors. Spikes can be added in
+chunks, so the same SpikeBinner works on the gathered data in init.py and on
+streamed or memory-mapped output offline (see analyze_network_results.py).
+
+Usage:
+    binner = SpikeBinner(gid_pop, t_start, t_stop, bin_ms=5.0)
+    binner.add(spkt, spkid)                 # any number of chunks, any order
+    metrics = binner.metrics(pops)
+"""
+
+import numpy as np
+
+
+class SpikeBinner:
+    """Per-cell spike counts in uniform time bins, stored for the non-empty (cell, bin) pairs only"""
+
+    def __init__(self, gid_pop, t_start, t_stop, bin_ms=5.0):
+        self.gid_pop = np.asarray(gid_pop)
+        self.n_cells = len(self.gid_pop)
+        self.t_start = float(t_start)
+        self.bin_ms = float(bin_ms)
+        self.n_bins = max(1, int(np.ceil((t_stop - t_start) / bin_ms)))
+        self.t_stop = self.t_start + self.n_bins * self.bin_ms
+        self.keys = np.empty(0, dtype=np.int64)     # sorted flat indices cell * n_bins + bin
+        self.values = np.empty(0, dtype=np.int64)   # spike count of each key
+
+    def add(self, spkt, spkid):
+        """Add a chunk of spikes (spikes outside the window or the gid range are ignored)"""
+        spkt = np.asarray(spkt, dtype=float)
+        spkid = np.asarray(spkid, dtype=np.int64)
+        keep = (spkid >= 0) & (spkid < self.n_cells) & (spkt >= self.t_start) & (spkt < self.t_stop)
+        bins = ((spkt[keep] - self.t_start) / self.bin_ms).astype(np.int64)
+        flat = spkid[keep] * self.n_bins + bins
+        if not len(flat):
+            return
+
+        # Merge the chunk into the touched pairs
+        keys, inverse = np.unique(np.concatenate([self.keys, flat]), return_inverse=True)
+        values = np.zeros(len(keys), dtype=np.int64)
+        np.add.at(values, inverse[:len(self.keys)], self.values)
+        np.add.at(values, inverse[len(self.keys):], 1)
+        self.keys, self.values = keys, values
+
+    def count_matrix(self):
+        """Dense spike counts [n_cells, n_bins] (cells x bins memory, for small networks and checks)"""
+        counts = np.zeros(self.n_cells * self.n_bins, dtype=np.int64)
+        counts[self.keys] = self.values
+        return counts.reshape(self.n_cells, self.n_bins)
+
+    def bin_times(self):
+        """Bin start times (ms)"""
+        return self.t_start + self.bin_ms * np.arange(self.n_bins)
+
+    def metrics(self, pops):
+        """Metrics of every population (pops in gid_pop index order)"""
+        cells = self.keys // self.n_bins
+        bins = self.keys % self.n_bins
+        entryPop = self.gid_pop[cells]
+        results = {}
+        for i, pop in enumerate(pops):
+            gids = np.flatnonzero(self.gid_pop == i)
+            entries = entryPop == i
+            # Cell index within the population for each entry
+            local = np.searchsorted(gids, cells[entries])
+            results[pop] = sparse_population_metrics(local, bins[entries], self.values[entries],
+                                                     len(gids), self.n_bins, self.bin_ms)
+        return results
+
+
+def mean_pairwise_correlation(counts):
+    """
+    Mean Pearson correlation over all pairs of rows of counts
+
+    With z-scored rows scaled to unit norm, sum_ij z_i.z_j = |sum_i z_i|^2, so
+    the mean over i != j is (|sum z|^2 - n) / (n (n - 1)). Rows with zero
+    variance (silent or constant cells) are left out.
+    """
+    counts = np.asarray(counts, dtype=float)
+    centered = counts - counts.mean(axis=1, keepdims=True)
+    norm = np.sqrt((centered ** 2).sum(axis=1))
+    valid = norm > 0
+    n = int(valid.sum())
+    if n < 2:
+        return float('nan')
+    z = centered[valid] / norm[valid, None]
+    total = z.sum(axis=0)
+    return float((total @ total - n) / (n * (n - 1)))
+
+
+def population_metrics(counts, bin_ms):
+    """Rates and synchrony metrics of one population from its count matrix [cells, bins]"""
+    n_cells, n_bins = counts.shape
+    if n_cells == 0:
+        return {'n_cells': 0, 'rate_t': np.zeros(n_bins), 'count_corr': float('nan'),
+                'fano': float('nan'), 'fano_cell': float('nan'), 'golomb_chi': float('nan')}
+
+    counts = counts.astype(float)
+    pop_counts = counts.sum(axis=0)
+    rate_t = pop_counts / (n_cells * bin_ms / 1000.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pop_mean = pop_counts.mean()
+        fano = pop_counts.var() / pop_mean if pop_mean > 0 else float('nan')
+
+        cell_mean = counts.mean(axis=1)
+        cell_var = counts.var(axis=1)
+        active = cell_mean > 0
+        fano_cell = float(np.mean(cell_var[active] / cell_mean[active])) if active.any() else float('nan')
+
+        # Golomb (2007) chi on binned counts: 1 = fully synchronous, ~1/sqrt(N) = asynchronous
+        mean_cell_var = cell_var.mean()
+        chi = np.sqrt(counts.mean(axis=0).var() / mean_cell_var) if mean_cell_var > 0 else float('nan')
+
+    return {
+        'n_cells': n_cells,
+        'rate_t': rate_t,
+        'count_corr': mean_pairwise_correlation(counts),
+        'fano': float(fano),
+        'fano_cell': fano_cell,
+        'golomb_chi': float(chi),
+    }
+
+
+def sparse_population_metrics(cells, bins, counts, n_cells, n_bins, bin_ms):
+    """
+    population_metrics() from the non-empty entries of the count matrix:
+    counts[k] spikes of cell cells[k] (0..n_cells-1) in bin bins[k]
+
+    Only per-cell sums and sums of squares and per-bin sums are formed; the
+    correlation uses sum_i z_i = sum_i c_i / |c_i - m_i| - sum_i m_i / |c_i - m_i|
+    (row means m_i), so it needs the non-empty entries plus one constant.
+    """
+    if n_cells == 0:
+        return {'n_cells': 0, 'rate_t': np.zeros(n_bins), 'count_corr': float('nan'),
+                'fano': float('nan'), 'fano_cell': float('nan'), 'golomb_chi': float('nan')}
+
+    counts = np.asarray(counts, dtype=float)
+    pop_counts = np.bincount(bins, weights=counts, minlength=n_bins)
+    rate_t = pop_counts / (n_cells * bin_ms / 1000.0)
+
+    cell_sum = np.bincount(cells, weights=counts, minlength=n_cells)
+    cell_sq = np.bincount(cells, weights=counts ** 2, minlength=n_cells)
+    cell_mean = cell_sum / n_bins
+    ss = np.maximum(cell_sq - cell_sum * cell_mean, 0)      # sum over bins of (c - mean)^2
+    cell_var = ss / n_bins
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pop_mean = pop_counts.mean()
+        fano = pop_counts.var() / pop_mean if pop_mean > 0 else float('nan')
+
+        active = cell_mean > 0
+        fano_cell = float(np.mean(cell_var[active] / cell_mean[active])) if active.any() else float('nan')
+
+        # Golomb (2007) chi on binned counts: 1 = fully synchronous, ~1/sqrt(N) = asynchronous
+        mean_cell_var = cell_var.mean()
+        chi = np.sqrt((pop_counts / n_cells).var() / mean_cell_var) if mean_cell_var > 0 else float('nan')
+
+    # Mean pairwise correlation of the rows with non-zero variance (see mean_pairwise_correlation)
+    norm = np.sqrt(ss)
+    valid = norm > 0
+    n = int(valid.sum())
+    if n < 2:
+        corr = float('nan')
+    else:
+        entries = valid[cells]
+        total = np.bincount(bins[entries], weights=counts[entries] / norm[cells[entries]], minlength=n_bins)
+        total -= np.sum(cell_mean[valid] / norm[valid])
+        corr = float((total @ total - n) / (n * (n - 1)))
+
+    return {
+        'n_cells': n_cells,
+        'rate_t': rate_t,
+        'count_corr': corr,
+        'fano': float(fano),
+        'fano_cell': fano_cell,
+        'golomb_chi': float(chi),
+    }
+
+
+def compute_metrics(spkt, spkid, gid_pop, pops, t_start, t_stop, bin_ms=5.0):
+    """Metrics of every population from one (spkt, spkid) raster"""
+    binner = SpikeBinner(gid_pop, t_start, t_stop, bin_ms)
+    binner.add(spkt, spkid)
+    return binner.metrics(pops)
+
+
+def summary_table(metrics):
+    """Scalar metrics per population (rate_t reduced to mean and peak), e.g. for JSON output"""
+    table = {}
+    for pop, m in metrics.items():
+        table[pop] = {
+            'n_cells': m['n_cells'],
+            'rate_mean': float(np.mean(m['rate_t'])) if len(m['rate_t']) else 0.0,
+            'rate_peak': float(np.max(m['rate_t'])) if len(m['rate_t']) else 0.0,
+            'count_corr': m['count_corr'],
+            'fano': m['fano'],
+            'fano_cell': m['fano_cell'],
+            'golomb_chi': m['golomb_chi'],
+        }
+    return table
@@ -0,0 +1,33 @@
+"""
+partition_utils.py
+Greedy partitioning of weighted items (cells) over ranks or threads
+
+Shared by load_balance.py (gids over MPI ranks) and multithread.py (cells over
+the NEURON threads of a rank).
+"""
+
+import heapq
+
+
+def lpt_partition(costs, nparts):
+    """
+    Longest-processing-time greedy partition
+
+    Assigns each item (largest cost first) to the currently lightest part.
+    Returns (parts, loads): parts[i] is the list of item indices of part i.
+    """
+    parts = [[] for _ in range(nparts)]
+    loads = [0] * nparts
+    heap = [(0, i) for i in range(nparts)]
+    for idx in sorted(range(len(costs)), key=lambda j: costs[j], reverse=True):
+        load, part = heapq.heappop(heap)
+        parts[part].append(idx)
+        loads[part] = load + costs[idx]
+        heapq.heappush(heap, (loads[part], part))
+    return parts, loads
+
+
+def imbalance(loads):
+    """Load imbalance: max / mean (1.0 = perfect balance)"""
+    mean = sum(loads) / len(loads) if loads else 0
+    return max(loads) / mean if mean > 0 else 1.0
@@ -0,0 +1,168 @@
+"""
+recording.py
+Recording profiles for the Yao L2/3 microcircuit
+
+A profile sets what is recorded, at which resolution, and what is gathered and
+saved. At scale, output size and gather time are dominated by somatic traces at
+recordStep and by the cell morphologies/connections gathered to rank 0, which
+the analysis does not need.
+
+Profiles (cfg.recordingProfile):
+    'spikes-only'  spikes only; no traces, cell sections or connections gathered
+    'sparse-soma'  spikes + soma voltage of cfg.recordCellsPerPop cells per
+                   population, as a min/max envelope in cfg.recordEnvelopeStep
+                   bins (or decimated samples); no cell sections or connections
+    'full-debug'   the settings of cfg.py: NetPyNE traces of cfg.recordCells at
+                   cfg.recordStep, cell sections and connections saved
+
+Profile traces are recorded by this module rather than by NetPyNE:
+    'decimate'  Vector.record(ref, tvec) samples only at the times in tvec
+    'envelope'  Vector.record at dt on each rank, reduced to per-bin min/max
+                before the gather, so only 2 values per bin leave the rank
+and are stored in sim.simData like NetPyNE traces ({'cell_<gid>': values}),
+e.g. 'V_soma_min'/'V_soma_max', with their time base in
+sim.simData['recordingTimes'].
+
+Usage:
+    recording.apply_profile(cfg)        # before sim.create (after cfg overrides)
+    recording.setup(sim, cfg)           # after sim.create
+    sim.runSim()
+    recording.finalize(sim)             # before sim.gatherData
+    sim.gatherData()
+"""
+
+import numpy as np
+
+from spike_stats import pop_ranges
+
+PROFILES = {
+    'spikes-only': {
+        'traces': {},
+        'saveCellSecs': False,
+        'saveCellConns': False,
+        'gatherOnlySimData': True,
+        'saveDataInclude': ['simData', 'simConfig', 'netParams'],
+        'analysis': ['plotRaster'],
+    },
+    'sparse-soma': {
+        'traces': {
+            'V_soma': {'sec': 'soma_0', 'loc': 0.5, 'var': 'v', 'mode': 'envelope'},
+        },
+        'saveCellSecs': False,
+        'saveCellConns': False,
+        'gatherOnlySimData': True,
+        'saveDataInclude': ['simData', 'simConfig', 'netParams'],
+        'analysis': ['plotRaster'],
+    },
+    'full-debug': None,     # cfg.py settings unchanged
+}
+
+_records = []   # (name, mode, gid, h.Vector) of this rank
+
+
+def apply_profile(cfg, name=None):
+    """Set the recording, gather and save options of cfg from a profile"""
+    name = name or cfg.recordingProfile
+    if name not in PROFILES:
+        raise ValueError(f"Unknown recording profile {name!r}, choose from {list(PROFILES)}")
+    profile = PROFILES[name]
+    cfg.recordingProfile = name
+    cfg.profileTraces = {}
+    if profile is None:
+        return cfg
+
+    # NetPyNE records no traces; profile traces are recorded by setup()
+    cfg.recordCells = []
+    cfg.recordTraces = {}
+    cfg.profileTraces = dict(profile['traces'])
+    for key in ['saveCellSecs', 'saveCellConns', 'gatherOnlySimData', 'saveDataInclude']:
+        setattr(cfg, key, profile[key])
+    for plot in list(cfg.analysis):
+        if plot not in profile['analysis']:
+            del cfg.analysis[plot]
+    return cfg
+
+
+def _sample_times(cfg, step):
+    """Recording window [analysis start, cfg.duration] sampled every step ms"""
+    start = cfg.warmupDuration if cfg.useCheckpoint else 0.0
+    return np.arange(start, cfg.duration + step / 2, step)
+
+
+def setup(sim, cfg):
+    """Start the profile trace recordings of the local cells (after sim.create)"""
+    from neuron import h
+
+    _records.clear()
+    if not getattr(cfg, 'profileTraces', None):
+        return 0
+
+    # First cfg.recordCellsPerPop gids of every population (from the gid ranges,
+    # since pop.cellGids only holds the gids of this rank)
+    gids = set()
+    for start, stop in pop_ranges(sim.net.params).values():
+        gids.update(range(start, min(stop, start + cfg.recordCellsPerPop)))
+
+    tvec = h.Vector(_sample_times(cfg, cfg.recordEnvelopeStep))
+    for cell in sim.net.cells:
+        if cell.gid not in gids or not cell.secs:
+            continue
+        for name, trace in cfg.profileTraces.items():
+            sec = cell.secs.get(trace['sec'])
+            if not sec:
+                continue
+            ref = getattr(sec['hObj'](trace['loc']), '_ref_' + trace['var'])
+            vec = h.Vector()
+            if trace['mode'] == 'decimate':
+                vec.record(ref, tvec)
+            else:
+                vec.record(ref)                 # every dt, reduced in finalize()
+            _records.append((name, trace['mode'], cell.gid, vec))
+    _records.append(('_tvec', None, None, tvec))     # keep the sample times alive
+    return len(_records) - 1
+
+
+def envelope(values, samplesPerBin):
+    """Per-bin (min, max) of values in bins of samplesPerBin samples (last bin may be shorter)"""
+    values = np.asarray(values)
+    edges = np.arange(0, len(values), samplesPerBin)
+    if not len(edges):
+        return np.empty(0), np.empty(0)
+    return np.minimum.reduceat(values, edges), np.maximum.reduceat(values, edges)
+
+
+def finalize(sim):
+    """
+    Move the profile traces into sim.simData as lists (after the run, before
+    sim.gatherData), reducing the envelope recordings to per-bin min/max
+    """
+    cfg = sim.cfg
+    if not getattr(cfg, 'profileTraces', None):
+        return
+
+    step = cfg.recordEnvelopeStep
+    start = float(_sample_times(cfg, step)[0])
+    samplesPerBin = max(1, int(round(step / cfg.dt)))
+
+    # Every rank needs every key: gatherData initializes allSimData from rank 0's keys
+    times = {}
+    for name, trace in cfg.profileTraces.items():
+        if trace['mode'] == 'decimate':
+            times[name] = {'start': start, 'step': step}
+        else:
+            times[name + '_min'] = times[name + '_max'] = {'start': start, 'step': samplesPerBin * cfg.dt}
+    for key in times:
+        sim.simData[key] = {}
+
+    for name, mode, gid, vec in _records:
+        if mode is None:
+            continue
+        values = vec.as_numpy()
+        if mode == 'decimate':
+            sim.simData[name][f'cell_{gid}'] = values.tolist()
+        else:
+            low, high = envelope(values, samplesPerBin)
+            sim.simData[name + '_min'][f'cell_{gid}'] = low.tolist()
+            sim.simData[name + '_max'][f'cell_{gid}'] = high.tolist()
+    sim.simData['recordingTimes'] = times
+    _records.clear()
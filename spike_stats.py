@@ -0,0 +1,197 @@
+"""
+spike_stats.py
+Vectorized spike-raster summary for the Yao L2/3 microcircuit
+
+Builds a gid -> population index array once and reduces the spike raster
+with np.bincount into per-cell and per-population rates, ISI CV and active
+cell counts. Works on gathered data (rank 0, or offline) and on the local
+spikes of each MPI rank, reduced with ParallelContext.allreduce, so the
+cost is linear in the number of spikes.
+
+Usage:
+    gidPop = gid_pop_index(netParams)
+    moments = cell_moments(spkt, spkid, len(gidPop))
+    moments = reduce_moments(sim.pc, moments)            # MPI: sum over ranks
+    summary = summarize(moments, gidPop, pops, duration_ms)
+"""
+
+import numpy as np
+
+MOMENT_KEYS = ['count', 'isiSum', 'isiSqSum', 'isiCount']
+
+
+def gid_pop_index(netParams):
+    """
+    Population index of every cell gid (int array of length numCells)
+
+    NetPyNE assigns consecutive gids per population in popParams order,
+    independent of how cells are distributed over ranks.
+    """
+    sizes = [int(netParams.scale * popParams['numCells']) for popParams in netParams.popParams.values()]
+    return np.repeat(np.arange(len(sizes), dtype=np.int32), sizes)
+
+
+def pop_ranges(netParams):
+    """Gid range [start, stop) of each population, keyed by population"""
+    ranges = {}
+    start = 0
+    for pop, popParams in netParams.popParams.items():
+        stop = start + int(netParams.scale * popParams['numCells'])
+        ranges[pop] = (start, stop)
+        start = stop
+    return ranges
+
+
+def cell_moments(spkt, spkid, nCells):
+    """
+    Per-cell spike count and ISI sums (all float arrays of length nCells)
+
+    Spikes from gids >= nCells (e.g. stimulation sources) are ignored.
+    """
+    spkt = np.asarray(spkt, dtype=float)
+    spkid = np.asarray(spkid, dtype=np.int64)
+    keep = (spkid >= 0) & (spkid < nCells)
+    spkt, spkid = spkt[keep], spkid[keep]
+
+    count = np.bincount(spkid, minlength=nCells).astype(float)
+
+    # ISIs: sort by (gid, time) and difference consecutive spikes of the same gid
+    order = np.lexsort((spkt, spkid))
+    spkt, spkid = spkt[order], spkid[order]
+    same = spkid[1:] == spkid[:-1]
+    isi = np.diff(spkt)[same]
+    isiGid = spkid[1:][same]
+
+    return {
+        'count': count,
+        'isiSum': np.bincount(isiGid, weights=isi, minlength=nCells),
+        'isiSqSum': np.bincount(isiGid, weights=isi * isi, minlength=nCells),
+        'isiCount': np.bincount(isiGid, minlength=nCells).astype(float),
+    }
+
+
+def reduce_moments(pc, moments):
+    """Sum per-cell moments over MPI ranks (collective; every rank gets the total)"""
+    from neuron import h
+
+    reduced = {}
+    for key in MOMENT_KEYS:
+        vec = h.Vector(moments[key])
+        pc.allreduce(vec, 1)    # 1 = sum
+        reduced[key] = vec.as_numpy().copy()
+    return reduced
+
+
+def summarize(moments, gidPop, pops, duration_ms):
+    """
+    Per-cell and per-population statistics from per-cell moments
+
+    Returns:
+        {'cellRate': array, 'cellCV': array (nan for < 2 ISIs),
+         'pops': {pop: {'rate', 'spikes', 'cells', 'active', 'cv'}},
+         'totalSpikes', 'rate'}
+    """
+    duration_s = duration_ms / 1000.0
+    count = moments['count']
+    n = moments['isiCount']
+
+    cellRate = count / duration_s if duration_s > 0 else np.zeros_like(count)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = moments['isiSum'] / n
+        var = moments['isiSqSum'] / n - mean * mean
+        cellCV = np.where(n >= 2, np.sqrt(np.maximum(var, 0)) / mean, np.nan)
+
+    nPops = len(pops)
+    popCells = np.bincount(gidPop, minlength=nPops)
+    popSpikes = np.bincount(gidPop, weights=count, minlength=nPops)
+    popActive = np.bincount(gidPop, weights=count > 0, minlength=nPops)
+    validCV = ~np.isnan(cellCV)
+    popCVSum = np.bincount(gidPop[validCV], weights=cellCV[validCV], minlength=nPops)
+    popCVCount = np.bincount(gidPop[validCV], minlength=nPops)
+
+    popStats = {}
+    for i, pop in enumerate(pops):
+        cells = int(popCells[i])
+        popStats[pop] = {
+            'rate': popSpikes[i] / (duration_s * cells) if cells > 0 and duration_s > 0 else 0.0,
+            'spikes': int(popSpikes[i]),
+            'cells': cells,
+            'active': int(popActive[i]),
+            'cv': popCVSum[i] / popCVCount[i] if popCVCount[i] > 0 else float('nan'),
+        }
+
+    totalSpikes = int(count.sum())
+    return {
+        'cellRate': cellRate,
+        'cellCV': cellCV,
+        'pops': popStats,
+        'totalSpikes': totalSpikes,
+        'rate': totalSpikes / (duration_s * len(count)) if len(count) > 0 and duration_s > 0 else 0.0,
+    }
+
+
+class SpikeAccumulator:
+    """
+    Incremental per-cell and per-population spike statistics in bounded memory
+
+    Feed time-ordered chunks of (spkt, spkid) with add(); memory is O(cells),
+    independent of the number of spikes. Keeps per-cell counts and ISI sums
+    (same keys as cell_moments) and the pooled ISI sums of each population.
+    """
+
+    def __init__(self, gidPop, nPops):
+        self.gidPop = np.asarray(gidPop)
+        self.nCells = len(self.gidPop)
+        self.nPops = nPops
+        self.cell = {key: np.zeros(self.nCells) for key in MOMENT_KEYS}
+        self.pop = {key: np.zeros(nPops) for key in MOMENT_KEYS}
+        self._lastCell = np.full(self.nCells, np.nan)
+        self._lastPop = np.full(nPops, np.nan)
+
+    @staticmethod
+    def _update(moments, last, t, group, size):
+        """Accumulate counts and ISIs of time-ordered spikes t grouped by group"""
+        moments['count'] += np.bincount(group, minlength=size)
+        if not len(t):
+            return
+
+        order = np.lexsort((t, group))
+        t, group = t[order], group[order]
+        first = np.empty(len(t), dtype=bool)
+        first[0] = True
+        first[1:] = group[1:] != group[:-1]
+        lastOfGroup = np.empty(len(t), dtype=bool)
+        lastOfGroup[-1] = True
+        lastOfGroup[:-1] = first[1:]
+
+        prev = np.empty(len(t))
+        prev[1:] = t[:-1]
+        prev[first] = last[group[first]]     # previous chunk's last spike (nan if none)
+        isi = t - prev
+        valid = ~np.isnan(isi)
+
+        moments['isiSum'] += np.bincount(group[valid], weights=isi[valid], minlength=size)
+        moments['isiSqSum'] += np.bincount(group[valid], weights=isi[valid] ** 2, minlength=size)
+        moments['isiCount'] += np.bincount(group[valid], minlength=size)
+        last[group[lastOfGroup]] = t[lastOfGroup]
+
+    def add(self, spkt, spkid):
+        """Add a chunk of spikes (chunks must arrive in time order)"""
+        spkt = np.asarray(spkt, dtype=float)
+        spkid = np.asarray(spkid, dtype=np.int64)
+        keep = (spkid >= 0) & (spkid < self.nCells)
+        spkt, spkid = spkt[keep], spkid[keep]
+        self._update(self.cell, self._lastCell, spkt, spkid, self.nCells)
+        self._update(self.pop, self._lastPop, spkt, self.gidPop[spkid], self.nPops)
+
+    def summarize(self, pops, duration_ms):
+        """summarize() of the accumulated cell moments, plus pooled population ISI CV ('poolCV')"""
+        summary = summarize(self.cell, self.gidPop, pops, duration_ms)
+        n = self.pop['isiCount']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.pop['isiSum'] / n
+            cv = np.sqrt(np.maximum(self.pop['isiSqSum'] / n - mean * mean, 0)) / mean
+        for i, pop in enumerate(pops):
+            summary['pops'][pop]['poolCV'] = float(cv[i]) if n[i] >= 2 and mean[i] > 0 else 0.0
+        return summary
@@ -0,0 +1,46 @@
+"""
+Make the repository modules (flat layout) importable from the tests, plus a
+shared synthetic spike raster for the analysis tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+POPS = [{'name': 'A', 'start': 0, 'stop': 40}, {'name': 'B', 'start': 40, 'stop': 55},
+        {'name': 'C', 'start': 55, 'stop': 60}]     # C stays silent
+DURATION = 1000.0
+
+
+@pytest.fixture
+def raster():
+    """Time-sorted random raster over the A and B cells, plus one cell firing in every 5 ms bin"""
+    rng = np.random.default_rng(1)
+    spkt = np.r_[rng.uniform(0, DURATION, 3000), np.arange(0, DURATION, 5.0) + 1.0]
+    spkid = np.r_[rng.integers(0, 55, 3000), np.full(200, 7)]
+    order = np.argsort(spkt, kind='stable')
+    return spkt[order], spkid[order]
+
+
+@pytest.fixture
+def gid_pop():
+    from analyze_network_results import index_from_pops
+
+    return index_from_pops(POPS, (0, DURATION))['gid_pop']
+
+
+def chunks(spkt, spkid, size):
+    return [(spkt[i:i + size], spkid[i:i + size]) for i in range(0, len(spkt), size)]
+
+
+def assert_same(a, b):
+    assert a.keys() == b.keys()
+    for key in a:
+        if isinstance(a[key], dict):
+            assert_same(a[key], b[key])
+        else:
+            np.testing.assert_allclose(a[key], b[key], equal_nan=True, err_msg=key)
@@ -0,0 +1,36 @@
+"""
+test_analyze_network_results.py
+Chunked spike input and chunk-invariant population analysis (analyze_network_results.py)
+"""
+
+import numpy as np
+
+from analyze_network_results import analyze_population_activity, index_from_pops, iter_spike_chunks
+from conftest import DURATION, POPS, assert_same
+
+
+def test_iter_spike_chunks_sources(raster, tmp_path):
+    import columnar_io
+
+    spkt, spkid = raster
+    folder = tmp_path / 'run_columnar'
+    columnar_io._save(str(folder), 'spikes', 'spkt', spkt.astype(np.float32))
+    columnar_io._save(str(folder), 'spikes', 'spkid', spkid.astype(np.int32))
+    (folder / 'meta.json').write_text('{"format": "columnar"}')
+
+    data = {'simData': {'spkt': spkt.tolist(), 'spkid': spkid.tolist()}}
+    for source in [data, str(folder)]:
+        parts = list(iter_spike_chunks(source, chunk_size=500))
+        assert [len(t) for t, _ in parts] == [500] * 6 + [200]
+        np.testing.assert_allclose(np.concatenate([t for t, _ in parts]), spkt, rtol=1e-6)
+        np.testing.assert_array_equal(np.concatenate([g for _, g in parts]), spkid)
+
+
+def test_population_activity_is_chunk_invariant(raster):
+    index = index_from_pops(POPS, (0, DURATION))
+    data = {'simData': {'spkt': raster[0].tolist(), 'spkid': raster[1].tolist()}}
+
+    small = analyze_population_activity(data, index=index, chunk_size=50, metrics=True)
+    large = analyze_population_activity(data, index=index, chunk_size=100000, metrics=True)
+    assert_same(small, large)
+    assert 'rate_t' not in analyze_population_activity(data, index=index)['A']
@@ -0,0 +1,131 @@
+"""
+test_job_scheduler.py
+Claims, retries and lease expiry of the SQLite job table (job_scheduler.py)
+"""
+
+import resource
+import sys
+import time
+
+import pytest
+
+import job_scheduler
+from job_scheduler import JobScheduler
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_scheduler, 'POLL_SECONDS', 0.05)
+    monkeypatch.chdir(tmp_path)
+    return JobScheduler(str(tmp_path / 'jobs.sqlite'), lease=60)
+
+
+def command(code):
+    return {'cmd': [sys.executable, '-c', code]}
+
+
+def test_submit_is_deduplicated(jobs):
+    assert jobs.submit('a', command('pass'))
+    assert not jobs.submit('a', command('pass'))
+    assert jobs.counts() == {'pending': 1}
+
+
+def test_claim_leases_each_job_once(jobs):
+    jobs.submit('a', command('pass'))
+    jobs.submit('b', command('pass'))
+
+    first = jobs.claim('w1')
+    second = jobs.claim('w2')
+    assert {first['key'], second['key']} == {'a', 'b'}
+    assert jobs.claim('w3') is None
+    assert jobs.counts() == {'running': 2}
+
+    owner = 'w1' if first['key'] == 'a' else 'w2'
+    assert jobs.heartbeat('a', owner)
+    assert not jobs.heartbeat('a', 'someone else')
+
+
+def test_fail_after_max_attempts(jobs):
+    jobs.submit('a', command('raise SystemExit(1)'), max_attempts=2)
+
+    for attempt in range(2):
+        job = jobs.claim('w')
+        assert job is not None
+        jobs.fail('a', 'w', 'exit code 1')
+    assert jobs.claim('w') is None
+    failed = jobs.jobs('failed')
+    assert len(failed) == 1 and failed[0]['attempts'] == 2 and failed[0]['error'] == 'exit code 1'
+
+
+def test_retry_failed(jobs):
+    jobs.submit('a', command('pass'), max_attempts=1)
+    jobs.submit('b', command('pass'), max_attempts=1)
+    for key in ['a', 'b']:
+        jobs.claim('w')
+        jobs.fail(key, 'w', 'boom')
+
+    assert jobs.retry_failed(['a']) == 1
+    assert jobs.counts() == {'pending': 1, 'failed': 1}
+    assert jobs.retry_failed() == 1
+    assert jobs.counts() == {'pending': 2}
+
+
+def test_expired_lease_is_reclaimed(jobs):
+    jobs.lease = 0.05
+    jobs.submit('a', command('pass'), max_attempts=2)
+
+    assert jobs.claim('dead worker')['key'] == 'a'
+    assert jobs.claim('w') is None          # lease still valid
+    time.sleep(0.1)
+    job = jobs.claim('w')
+    assert job['key'] == 'a'
+    jobs.complete('a', 'w', {'value': 1})
+    jobs.complete('a', 'dead worker', {'value': 2})     # stale owner is ignored
+    assert jobs.results() == {'a': {'value': 1}}
+
+
+def test_expired_lease_after_max_attempts_fails(jobs):
+    jobs.lease = 0.05
+    jobs.submit('a', command('pass'), max_attempts=1)
+    jobs.claim('dead worker')
+    time.sleep(0.1)
+    assert jobs.claim('w') is None
+    assert jobs.jobs('failed')[0]['error'] == 'lease expired'
+
+
+def test_run_workers(jobs):
+    jobs.submit('ok', command('pass'))
+    jobs.submit('crash', command('raise SystemExit(3)'), max_attempts=2)
+    finished = []
+
+    counts = jobs.run_workers(2, verbose=False, onFinished=lambda job: finished.append(job['key']))
+    assert counts == {'done': 1, 'failed': 1}
+    assert sorted(finished) == ['crash', 'ok']
+    assert 'wall' in jobs.results()['ok']
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='process groups are POSIX only')
+def test_timeout_kills_the_process_group(jobs, tmp_path):
+    # The child starts a grandchild that would write a file after the timeout
+    marker = tmp_path / 'grandchild_survived'
+    grandchild = tmp_path / 'grandchild.py'
+    grandchild.write_text(f"import time\ntime.sleep(1.5)\nopen({str(marker)!r}, 'w').close()\n")
+    code = f"import subprocess, sys, time; subprocess.Popen([sys.executable, {str(grandchild)!r}]); time.sleep(30)"
+    jobs.submit('slow', command(code), limits={'timeout': 0.5}, max_attempts=1)
+
+    counts = jobs.run_workers(1, verbose=False)
+    assert counts == {'failed': 1}
+    assert jobs.jobs('failed')[0]['error'].startswith('timeout')
+    time.sleep(2)
+    assert not marker.exists()
+
+
+@pytest.mark.skipif(not hasattr(resource, 'prlimit'), reason='needs resource.prlimit (Linux)')
+def test_limits_reach_the_child(jobs, tmp_path):
+    # The child reads its CPU limit once the scheduler had time to set it
+    out = tmp_path / 'cpu_limit'
+    code = f"import resource, time; time.sleep(0.5); open({str(out)!r}, 'w').write(str(resource.getrlimit(resource.RLIMIT_CPU)[0]))"
+    jobs.submit('limited', command(code), limits={'cpuSeconds': 100})
+
+    assert jobs.run_workers(1, verbose=False) == {'done': 1}
+    assert out.read_text() == '100'
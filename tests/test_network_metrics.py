@@ -0,0 +1,42 @@
+"""
+test_network_metrics.py
+Binned rate and synchrony metrics: chunked vs one-shot, sparse vs dense (network_metrics.py)
+"""
+
+import numpy as np
+import pytest
+
+import network_metrics
+from conftest import DURATION, POPS, assert_same, chunks
+
+
+@pytest.mark.parametrize('size', [1, 97, 10000])
+def test_binner_chunked_matches_one_shot(raster, gid_pop, size):
+    pops = [pop['name'] for pop in POPS]
+    oneShot = network_metrics.compute_metrics(*raster, gid_pop, pops, 0, DURATION, bin_ms=5.0)
+
+    binner = network_metrics.SpikeBinner(gid_pop, 0, DURATION, bin_ms=5.0)
+    for spkt, spkid in reversed(chunks(*raster, size)):     # any chunk order
+        binner.add(spkt, spkid)
+    assert_same(oneShot, binner.metrics(pops))
+
+
+def test_sparse_metrics_match_dense(raster, gid_pop):
+    pops = [pop['name'] for pop in POPS]
+    binner = network_metrics.SpikeBinner(gid_pop, 0, DURATION, bin_ms=5.0)
+    binner.add(*raster)
+    counts = binner.count_matrix()
+    assert counts.sum() == len(raster[0])
+
+    sparse = binner.metrics(pops)
+    for i, pop in enumerate(pops):
+        dense = network_metrics.population_metrics(counts[gid_pop == i], binner.bin_ms)
+        assert_same(dense, sparse[pop])
+    assert np.isnan(sparse['C']['count_corr'])
+
+
+def test_mean_pairwise_correlation():
+    counts = np.array([[0, 1, 0, 2], [0, 2, 0, 4], [2, 0, 2, 0], [1, 1, 1, 1]])
+    full = np.corrcoef(counts[:3])
+    expected = full[np.triu_indices(3, 1)].mean()      # constant row left out
+    assert network_metrics.mean_pairwise_correlation(counts) == pytest.approx(expected)
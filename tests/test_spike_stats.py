@@ -0,0 +1,34 @@
+"""
+test_spike_stats.py
+Per-cell spike moments, their population summary and the online
+accumulator (spike_stats.py)
+"""
+
+import numpy as np
+import pytest
+
+import spike_stats
+from conftest import DURATION, POPS, assert_same, chunks
+
+
+def test_cell_moments_counts_and_isis():
+    moments = spike_stats.cell_moments([1.0, 3.0, 7.0, 2.0, 99.0], [0, 0, 0, 1, 5], nCells=2)
+    np.testing.assert_array_equal(moments['count'], [3, 1])
+    np.testing.assert_array_equal(moments['isiSum'], [6, 0])
+    np.testing.assert_array_equal(moments['isiSqSum'], [20, 0])
+    np.testing.assert_array_equal(moments['isiCount'], [2, 0])
+
+
+@pytest.mark.parametrize('size', [1, 97, 10000])
+def test_accumulator_chunked_matches_one_shot(raster, gid_pop, size):
+    pops = [pop['name'] for pop in POPS]
+    oneShot = spike_stats.summarize(spike_stats.cell_moments(*raster, len(gid_pop)), gid_pop, pops, DURATION)
+
+    acc = spike_stats.SpikeAccumulator(gid_pop, len(pops))
+    for spkt, spkid in chunks(*raster, size):
+        acc.add(spkt, spkid)
+    chunked = acc.summarize(pops, DURATION)
+
+    for pop in pops:
+        chunked['pops'][pop].pop('poolCV')
+    assert_same(oneShot, chunked)